@@ -0,0 +1,349 @@
+import Board
+
+# A batch holds a number of boards of the same dimension, that are all changed
+# in lockstep. All the boards are packed in a single integer number, in which
+# the board with index I occupies the lane of bits I*W up to (I+1)*W-1, with
+# W the dimension squared plus 1. The lower bits of a lane are the filled mask
+# of the board (see Board.get_filled_mask). The highest bit of each lane is a
+# guard bit, that is always 0 in the batch itself. Guard bits absorb borrows,
+# such that a single subtraction tests all lanes at once for being 0.
+# A batch is a dict with keys "dim" (the dimension of its boards), "size" (the
+# number of boards) and "bits" (the packed filled masks).
+
+
+def make_batch(boards):
+    """
+        Return a new batch holding a copy of each of the given boards.
+        - The board at index I in the given sequence is the board at index I
+          in the batch.
+        ASSUMPTIONS
+        - The given sequence of boards is not empty and all its boards are
+          proper boards with the same dimension.
+    """
+    board_dimension = Board.dimension(boards[0])
+    lanes = [Board.get_filled_mask(board) for board in boards]
+    return {"dim": board_dimension, "size": len(boards), "bits": _pack(board_dimension, lanes)}
+
+
+def make_empty_batch(dimension=10, size=1):
+    """
+        Return a new batch of the given size, holding empty boards of the
+        given dimension.
+        ASSUMPTIONS
+        - The given dimension and size are positive integer numbers.
+    """
+    return {"dim": dimension, "size": size, "bits": 0}
+
+
+def copy_batch(batch):
+    """
+        Return a copy of the given batch.
+        ASSUMPTIONS
+        - The given batch is a proper batch.
+    """
+    return batch.copy()
+
+
+def dimension(batch):
+    return batch["dim"]
+
+
+def get_size(batch):
+    return batch["size"]
+
+
+def get_board(batch, index):
+    """
+        Return a new board with the same filled cells as the board at the given
+        index in the given batch.
+        ASSUMPTIONS
+        - The given batch is a proper batch.
+        - The given index is not negative and below the size of the batch.
+    """
+    lane_width = _lane_width(dimension(batch))
+    filled_mask = (batch["bits"] >> (index * lane_width)) & ((1 << (lane_width - 1)) - 1)
+    return Board.make_board(dimension(batch), Board.get_positions_in_mask(dimension(batch), filled_mask))
+
+
+def get_filled_masks(batch):
+    """
+        Return a list with the filled mask of each board in the given batch
+        (see Board.get_filled_mask).
+        ASSUMPTIONS
+        - The given batch is a proper batch.
+    """
+    return _unpack(batch, batch["bits"])
+
+
+def can_be_dropped_at(batch, blocks, positions):
+    """
+        Check for each board in the given batch whether the block at the same
+        index in the given sequence of blocks can be dropped at the position at
+        the same index in the given sequence of positions.
+        - The function returns a list of booleans, one for each board.
+        - False is returned for boards whose block or position is None.
+        ASSUMPTIONS
+        - The given batch is a proper batch.
+        - The given sequences have the same length as the size of the batch, and
+          contain proper blocks and proper positions (or None).
+    """
+    return _get_flags(batch, _get_droppable_lanes(batch, blocks, positions)[0])
+
+
+def drop_at(batch, blocks, positions):
+    """
+        Drop, for each board in the given batch, the block at the same index in
+        the given sequence of blocks at the position at the same index in the
+        given sequence of positions.
+        - Nothing happens to boards on which their block cannot be dropped at
+          their position, or whose block or position is None.
+        - The function returns a list of booleans, indicating for each board
+          whether its block has been dropped.
+        ASSUMPTIONS
+        - The given batch is a proper batch.
+        - The given sequences have the same length as the size of the batch, and
+          contain proper blocks and proper positions (or None).
+    """
+    (droppable_lanes, placement, dots_counts) = _get_droppable_lanes(batch, blocks, positions)
+    batch["bits"] |= placement & _expand(batch, droppable_lanes)
+    return _get_flags(batch, droppable_lanes)
+
+
+def get_full_line_counts(batch):
+    """
+        Return a list with the number of full rows and full columns on each
+        board of the given batch.
+        ASSUMPTIONS
+        - The given batch is a proper batch.
+    """
+    return _unpack(batch, _get_full_lines(batch)[1])
+
+
+def clear_full_rows_and_columns(batch):
+    """
+        Clear all full rows and all full columns on all the boards of the given batch.
+        ASSUMPTIONS
+        - The given batch is a proper batch.
+    """
+    batch["bits"] &= ~_get_full_lines(batch)[0]
+
+
+def game_move(batch, blocks, positions):
+    """
+        Drop, for each board in the given batch, the block at the same index in
+        the given sequence of blocks at the position at the same index in the
+        given sequence of positions, and clear all full rows and columns on all
+        boards after the drop.
+        - The function returns a list with the score obtained on each board, as
+          computed by Game.game_move. The score is None for boards on which
+          the block could not be dropped; these boards are left untouched.
+        ASSUMPTIONS
+        - The given batch is a proper batch.
+        - The given sequences have the same length as the size of the batch, and
+          contain proper blocks and proper positions (or None).
+    """
+    (droppable_lanes, placement, dots_counts) = _get_droppable_lanes(batch, blocks, positions)
+    batch["bits"] |= placement & _expand(batch, droppable_lanes)
+    (full_lines_mask, line_counts) = _get_full_lines(batch)
+    batch["bits"] &= ~(full_lines_mask & _expand(batch, droppable_lanes))
+    scores = []
+    for (dropped, dots_count, nb_filled_seqs) in \
+            zip(_get_flags(batch, droppable_lanes), dots_counts, _unpack(batch, line_counts)):
+        if dropped:
+            scores.append(dots_count + 10 * ((nb_filled_seqs + 1) * nb_filled_seqs) // 2)
+        else:
+            scores.append(None)
+    return scores
+
+
+def get_droppable_masks(batch, blocks):
+    """
+        Return a list with, for each board in the given batch, the mask of all
+        positions at which the lower left corner of the bounding box of the block
+        at the same index in the given sequence of blocks can be put (see
+        Board.get_droppable_mask).
+        - The mask is 0 for boards whose block is None.
+        - Boards sharing the same block are handled in a single pass of
+          shifts over the entire batch.
+        ASSUMPTIONS
+        - The given batch is a proper batch.
+        - The given sequence has the same length as the size of the batch, and
+          contains proper blocks (or None).
+    """
+    board_dimension = dimension(batch)
+    lane_width = _lane_width(board_dimension)
+    constants = _get_constants(board_dimension, get_size(batch))
+    free_mask = constants["cells"] & ~batch["bits"]
+
+    lanes_per_block = dict()
+    for (index, block) in enumerate(blocks):
+        if block is not None:
+            lanes_per_block.setdefault(frozenset(block), (block, []))[1].append(index)
+
+    droppable_masks = 0
+    for (block, lanes) in lanes_per_block.values():
+        (mask, corner, width, height, corner_mask, dots_shifts) = _get_footprint(board_dimension, block)
+        droppable_mask = corner_mask * constants["ones"]
+        for shift in dots_shifts:
+            # Corners are restricted to the ones for which the block stays
+            # inside its own lane, so no bits leak in from the next board.
+            droppable_mask &= free_mask >> shift
+        selected_lanes = 0
+        for index in lanes:
+            selected_lanes |= 1 << (index * lane_width + lane_width - 1)
+        droppable_masks |= droppable_mask & _expand(batch, selected_lanes)
+    return _unpack(batch, droppable_masks)
+
+
+def _lane_width(board_dimension):
+    return board_dimension * board_dimension + 1
+
+
+# Constants for batches with a given dimension and size, keyed by both.
+_constants = dict()
+
+
+def _get_constants(board_dimension, size):
+    """
+        Return a dict with masks having in each lane of a batch with the given
+        dimension and size the lowest bit ("ones"), the guard bit ("guards") or
+        all the bits for cells ("cells") set.
+    """
+    key = (board_dimension, size)
+    if key not in _constants:
+        lane_width = _lane_width(board_dimension)
+        ones = ((1 << (size * lane_width)) - 1) // ((1 << lane_width) - 1)
+        _constants[key] = {"ones": ones,
+                           "guards": ones << (lane_width - 1),
+                           "cells": ones * ((1 << (lane_width - 1)) - 1)}
+    return _constants[key]
+
+
+def _pack(board_dimension, lanes):
+    """
+        Return the integer number in which the given values are put in successive
+        lanes for boards of the given dimension.
+    """
+    lane_format = "0{}b".format(_lane_width(board_dimension))
+    return int("".join([format(lane, lane_format) for lane in reversed(lanes)]) or "0", 2)
+
+
+def _unpack(batch, packed):
+    """
+        Return a list with the value in each lane of the given packed integer
+        number for the given batch.
+    """
+    lane_width = _lane_width(dimension(batch))
+    digits = format(packed, "0{}b".format(lane_width * get_size(batch)))
+    end = len(digits)
+    return [int(digits[end - (index + 1) * lane_width: end - index * lane_width], 2)
+            for index in range(get_size(batch))]
+
+
+def _get_flags(batch, lanes):
+    """
+        Return a list of booleans indicating for each board of the given batch
+        whether its guard bit is set in the given mask of lanes.
+    """
+    lane_width = _lane_width(dimension(batch))
+    digits = format(lanes >> (lane_width - 1), "0{}b".format(lane_width * get_size(batch)))
+    end = len(digits)
+    return [digits[end - 1 - index * lane_width] == "1" for index in range(get_size(batch))]
+
+
+def _expand(batch, lanes):
+    """
+        Return a mask in which all the bits for cells are set in each lane whose
+        guard bit is set in the given mask of lanes.
+    """
+    lane_width = _lane_width(dimension(batch))
+    return (lanes >> (lane_width - 1)) * ((1 << (lane_width - 1)) - 1)
+
+
+def _get_zero_lanes(batch, values):
+    """
+        Return a mask in which the guard bit is set for each lane that is 0 in
+        the given values. The guard bits of the given values must all be 0.
+    """
+    guards = _get_constants(dimension(batch), get_size(batch))["guards"]
+    return (guards - values) & guards
+
+
+# Footprints of blocks, keyed by the dimension and the dots of the block.
+_footprints = dict()
+
+
+def _get_footprint(board_dimension, block):
+    """
+        Return a tuple with the mask of the given block with the lower left
+        corner of its bounding box at position (1,1), followed by that corner
+        relative towards the anchor of the block, by the width and height of
+        its bounding box, by the mask of all positions for that corner at which
+        the block fits on an empty board of the given dimension and by the
+        shifts of its dots relative towards that corner.
+    """
+    key = (board_dimension, frozenset(block))
+    if key not in _footprints:
+        left = min([dot[0] for dot in block])
+        bottom = min([dot[1] for dot in block])
+        width = max([dot[0] for dot in block]) - left + 1
+        height = max([dot[1] for dot in block]) - bottom + 1
+        shifts = tuple((dot[0] - left) * board_dimension + dot[1] - bottom for dot in block)
+        mask = 0
+        for shift in shifts:
+            mask |= 1 << shift
+        corner_mask = Board.get_droppable_mask(Board.make_board(board_dimension), block)
+        _footprints[key] = (mask, (left, bottom), width, height, corner_mask, shifts)
+    return _footprints[key]
+
+
+def _get_droppable_lanes(batch, blocks, positions):
+    """
+        Return a tuple consisting of the mask with the guard bit set for each lane
+        in which the block can be dropped at the position, followed by the packed
+        masks of all blocks at their position and by a list with the number of
+        dots of each block.
+    """
+    board_dimension = dimension(batch)
+    lanes = []
+    dots_counts = []
+    outside_lanes = []
+    for (block, position) in zip(blocks, positions):
+        block_mask = None
+        if block is not None and position is not None:
+            (mask, corner, width, height, corner_mask, shifts) = _get_footprint(board_dimension, block)
+            column = position[0] + corner[0]
+            row = position[1] + corner[1]
+            if 0 < column <= board_dimension - width + 1 and 0 < row <= board_dimension - height + 1:
+                block_mask = mask << ((column - 1) * board_dimension + row - 1)
+        if block_mask is None:
+            lanes.append(0)
+            dots_counts.append(0)
+            outside_lanes.append(1 << (_lane_width(board_dimension) - 1))
+        else:
+            lanes.append(block_mask)
+            dots_counts.append(len(block))
+            outside_lanes.append(0)
+    placement = _pack(board_dimension, lanes)
+    free_lanes = _get_zero_lanes(batch, placement & batch["bits"])
+    droppable_lanes = free_lanes & ~_pack(board_dimension, outside_lanes)
+    return droppable_lanes, placement, dots_counts
+
+
+def _get_full_lines(batch):
+    """
+        Return a tuple consisting of the mask of all cells in full rows and full
+        columns of all boards in the given batch, followed by the packed number
+        of full rows and columns on each board.
+    """
+    (row_masks, column_masks) = Board.get_line_masks(dimension(batch))
+    ones = _get_constants(dimension(batch), get_size(batch))["ones"]
+    lane_width = _lane_width(dimension(batch))
+    full_lines_mask = 0
+    line_counts = 0
+    for line_mask in row_masks[1:] + column_masks[1:]:
+        lines = line_mask * ones
+        full_lanes = _get_zero_lanes(batch, (batch["bits"] & lines) ^ lines)
+        full_lines_mask |= _expand(batch, full_lanes) & lines
+        line_counts += full_lanes >> (lane_width - 1)
+    return full_lines_mask, line_counts
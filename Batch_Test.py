@@ -0,0 +1,135 @@
+import Batch
+import Block
+import Board
+import Game
+
+import random
+
+
+def make_random_boards(generator, dimension, size):
+    all_positions = [(column, row) for column in range(1, dimension + 1) for row in range(1, dimension + 1)]
+    return [Board.make_board(dimension, generator.sample(all_positions, generator.randint(0, len(all_positions))))
+            for index in range(size)]
+
+
+# tests for make_batch and get_board
+
+def test_Make_Batch__Single_Case(score, max_score):
+    """Function make_batch: single case."""
+    max_score.value += 3
+    try:
+        boards = make_random_boards(random.Random(1), 4, 7)
+        the_batch = Batch.make_batch(boards)
+        assert Batch.get_size(the_batch) == 7
+        assert Batch.dimension(the_batch) == 4
+        for index in range(7):
+            assert Board.get_all_filled_positions(Batch.get_board(the_batch, index)) == \
+                   Board.get_all_filled_positions(boards[index])
+        assert Batch.get_filled_masks(the_batch) == [Board.get_filled_mask(board) for board in boards]
+        assert Batch.get_filled_masks(Batch.make_empty_batch(5, 3)) == [0, 0, 0]
+        score.value += 3
+    except:
+        pass
+
+
+# tests for can_be_dropped_at
+
+def test_Can_Be_Dropped_At__Per_Board_Blocks(score, max_score):
+    """Function can_be_dropped_at (batch): different block and position per board."""
+    max_score.value += 4
+    try:
+        generator = random.Random(2)
+        boards = make_random_boards(generator, 5, 60)
+        blocks = [generator.choice(Block.standard_blocks) for board in boards]
+        positions = [(generator.randint(-3, 8), generator.randint(-3, 8)) for board in boards]
+        blocks[3] = None
+        positions[4] = None
+        expected = [block is not None and position is not None and Board.can_be_dropped_at(board, block, position)
+                    for (board, block, position) in zip(boards, blocks, positions)]
+        assert Batch.can_be_dropped_at(Batch.make_batch(boards), blocks, positions) == expected
+        assert True in expected and False in expected
+        score.value += 4
+    except:
+        pass
+
+
+# tests for game_move
+
+def test_Game_Move__Per_Board_Blocks(score, max_score):
+    """Function game_move (batch): same result as game_move for each board."""
+    max_score.value += 6
+    try:
+        generator = random.Random(3)
+        boards = make_random_boards(generator, 4, 50)
+        the_batch = Batch.make_batch(boards)
+        for turn in range(8):
+            blocks = [generator.choice(Block.standard_blocks) for board in boards]
+            positions = []
+            for (board, block) in zip(boards, blocks):
+                droppable_positions = Board.get_droppable_positions(board, block)
+                if len(droppable_positions) > 0 and generator.random() < 0.9:
+                    positions.append(generator.choice(droppable_positions))
+                else:
+                    positions.append((1, 1))
+            expected_scores = []
+            for (board, block, position) in zip(boards, blocks, positions):
+                if Board.can_be_dropped_at(board, block, position):
+                    expected_scores.append(Game.game_move(board, block, position))
+                else:
+                    expected_scores.append(None)
+            assert Batch.game_move(the_batch, blocks, positions) == expected_scores
+            assert Batch.get_filled_masks(the_batch) == [Board.get_filled_mask(board) for board in boards]
+        score.value += 6
+    except:
+        pass
+
+
+def test_Drop_At__And_Clear(score, max_score):
+    """Functions drop_at, get_full_line_counts and clear_full_rows_and_columns (batch)."""
+    max_score.value += 4
+    try:
+        boards = [Board.make_board(3, {(1, 1), (2, 1), (1, 2), (1, 3)}),
+                  Board.make_board(3, {(2, 2)}),
+                  Board.make_board(3)]
+        the_batch = Batch.make_batch(boards)
+        line = Block.make_block({(0, 0), (1, 0)})
+        assert Batch.drop_at(the_batch, [Block.make_block({(0, 0)}), line, line], [(3, 1), (2, 2), (2, 3)]) == \
+               [True, False, True]
+        assert Batch.get_full_line_counts(the_batch) == [2, 0, 0]
+        Batch.clear_full_rows_and_columns(the_batch)
+        assert Board.get_all_filled_positions(Batch.get_board(the_batch, 0)) == set()
+        assert Board.get_all_filled_positions(Batch.get_board(the_batch, 1)) == {(2, 2)}
+        assert Board.get_all_filled_positions(Batch.get_board(the_batch, 2)) == {(2, 3), (3, 3)}
+        score.value += 4
+    except:
+        pass
+
+
+# tests for get_droppable_masks
+
+def test_Get_Droppable_Masks__Per_Board_Blocks(score, max_score):
+    """Function get_droppable_masks: same masks as get_droppable_mask for each board."""
+    max_score.value += 4
+    try:
+        generator = random.Random(4)
+        boards = make_random_boards(generator, 6, 80)
+        blocks = [generator.choice(Block.standard_blocks) for board in boards]
+        blocks[0] = None
+        expected = [0] + [Board.get_droppable_mask(board, block) for (board, block) in zip(boards[1:], blocks[1:])]
+        assert Batch.get_droppable_masks(Batch.make_batch(boards), blocks) == expected
+        score.value += 4
+    except:
+        pass
+
+
+batch_test_functions = \
+    {
+        test_Make_Batch__Single_Case,
+
+        test_Can_Be_Dropped_At__Per_Board_Blocks,
+
+        test_Game_Move__Per_Board_Blocks,
+        test_Drop_At__And_Clear,
+
+        test_Get_Droppable_Masks__Per_Board_Blocks,
+    }
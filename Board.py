@@ -1,6 +1,38 @@
 import Block
 import Position
+import itertools
 import random
+import struct
+
+# Keys under which data derived from the filled cells of a board is cached, or
+# changes to them are recorded. Boards made by this module keep this data apart
+# from their items (see _get_derived), so two boards with the same dimension and
+# filled cells are equal. Other mappings accepted as boards keep it as keys of
+# their own.
+DERIVED_KEYS = ("bits", "cells", "sat", "runs", "anchors", "log", "observers")
+
+
+class _Board(dict):
+    """
+        A board: a dict with a key "dim" and a key for each filled position,
+        that is pickled in its compact binary encoding (see to_bytes).
+        - Data derived from the filled cells is kept in the dict at _derived,
+          outside the items of the board.
+    """
+
+    __slots__ = ("_derived",)
+
+    def __init__(self, *arguments):
+        super().__init__(*arguments)
+        self._derived = dict()
+
+    def copy(self):
+        return _Board(self)
+
+    def __reduce__(self):
+        # Only the dimension and the filled cells are pickled. Derived data is
+        # rebuilt when it is needed again, observers and transactions are dropped.
+        return from_bytes, (to_bytes(self),)
 
 
 def make_board(dimension=10, positions_to_fill=frozenset()):
@@ -14,7 +46,7 @@ def make_board(dimension=10, positions_to_fill=frozenset()):
           of the new board.
     """
     # Board is a dict with a key "dim"(value = dimension) and other keys are the filled positions (value = True)
-    board = dict()
+    board = _Board()
     for position in positions_to_fill:
         if 0 < position[0] <= dimension and 0 < position[1] <= dimension:
             board[position] = True
@@ -22,13 +54,85 @@ def make_board(dimension=10, positions_to_fill=frozenset()):
     return board
 
 
+def make_board_from_mask(dimension, mask):
+    """
+        Return a new board of the given dimension for which all cells whose bits
+        are set in the given mask are already filled (see get_filled_mask).
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+        - The given mask is a non-negative integer number without bits set beyond
+          the cells of the new board.
+    """
+    board = _Board.fromkeys(get_positions_in_mask(dimension, mask), True)
+    board["dim"] = dimension
+    _get_derived(board)["bits"] = mask
+    return board
+
+
+# Binary digit for each value of a byte per cell: "0" for 0, "1" otherwise.
+_DIGIT_OF_BYTE = b"0" + b"1" * 255
+
+
+def make_board_from_buffer(dimension, data, bitpacked=False):
+    """
+        Return a new board of the given dimension whose filled cells are given
+        by the given buffer, which is any object supporting the buffer protocol
+        (bytes, bytearray, memoryview, array.array, a NumPy array, ...).
+        - If the buffer is not bitpacked, it has a byte per cell, in the order of
+          the bits of masks (see get_filled_mask), and cells with a non-zero byte
+          are filled. A NumPy array of booleans of shape (D,D) in C order thus
+          describes the cell at position (C,R) at index [C-1,R-1].
+        - If the buffer is bitpacked, its bytes form a mask in little-endian order.
+        - The buffer is converted into a mask without inspecting its cells one at
+          a time. Only filled cells take a step to be stored in the board.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+        - The given buffer is contiguous, and has exactly D*D bytes if it is not
+          bitpacked, or (D*D+7)//8 bytes without bits set beyond the cells of the
+          board if it is bitpacked.
+    """
+    data = memoryview(data).cast("B")
+    if bitpacked:
+        return make_board_from_mask(dimension, int.from_bytes(data, "little"))
+    # The bit for the first cell is the last digit of the binary notation of the mask.
+    digits = data.tobytes().translate(_DIGIT_OF_BYTE)[::-1]
+    return make_board_from_mask(dimension, int(digits, 2) if len(digits) > 0 else 0)
+
+
 def copy_board(board):
     """
         Return a copy of the given board.
         ASSUMPTIONS
         - The given board is a proper board.
     """
-    return board.copy()
+    the_copy = board.copy()
+    derived = _get_derived(board)
+    copied_derived = _get_derived(the_copy)
+    if copied_derived is derived:
+        # Boards that cannot be changed are their own copy.
+        return the_copy
+    for key in ("bits", "cells", "sat"):
+        if key in derived:
+            copied_derived[key] = derived[key]
+    if "runs" in derived:
+        copied_derived["runs"] = {"rows": list(derived["runs"]["rows"]),
+                                  "columns": list(derived["runs"]["columns"])}
+    if "anchors" in derived:
+        copied_derived["anchors"] = {shape: set(anchors) for (shape, anchors) in derived["anchors"].items()}
+    if "observers" in derived:
+        copied_derived["observers"] = [observer["copy"](observer) for observer in derived["observers"]]
+    # Transactions on the given board do not apply to its copy.
+    copied_derived.pop("log", None)
+    return the_copy
+
+
+def _get_derived(board):
+    """
+        Return the dict in which data derived from the filled cells of the given
+        board is kept under the keys in DERIVED_KEYS: the board itself, unless it
+        is made by this module.
+    """
+    return getattr(board, "_derived", board)
 
 
 def is_proper_board(board):
@@ -43,16 +147,19 @@ def is_proper_board(board):
         - You need to complete the conditions
         (as they depend on the internal representation you have chosen for the board)
     """
-    if type(board) != dict:
+    if not isinstance(board, dict):
         return False
     if not 0 < board["dim"]:
         return False
-    if len(board) > board["dim"]**2+1:
+    nb_derived_keys = len([key for key in DERIVED_KEYS if key in board])
+    if len(board) > board["dim"]**2+1+nb_derived_keys:
         return False
     for elem in board:
         if elem == "dim":
             if type(board[elem]) is not int:
                 return False
+        elif elem in DERIVED_KEYS:
+            continue
         else:
             if type(elem) != tuple:
                 return False
@@ -144,10 +251,12 @@ def get_all_filled_rows(board):
         NOTE
         - You are not allowed to use for statements in the body of this function.
     """
+    filled_mask = get_filled_mask(board)
+    row_masks = get_line_masks(dimension(board))[0]
     filled_rows = []
     row = 1
     while row <= dimension(board):
-        if is_filled_row(board, row):
+        if filled_mask & row_masks[row] == row_masks[row]:
             filled_rows.append(row)
         row += 1
 
@@ -164,9 +273,11 @@ def get_all_filled_columns(board):
         NOTE
         - You are not allowed to use while statements in the body of this function.
     """
+    filled_mask = get_filled_mask(board)
+    column_masks = get_line_masks(dimension(board))[1]
     filled_columns = tuple()
     for col in range(1, dimension(board)+1):
-        if is_filled_column(board, col):
+        if filled_mask & column_masks[col] == column_masks[col]:
             filled_columns = (col,) + filled_columns
 
     return filled_columns
@@ -190,6 +301,7 @@ def fill_cell(board, position):
     """
     if not is_filled_at(board, position) and inside_board(board, position):
         board[position] = True
+        _cells_changed(board, (position,))
 
 
 def fill_all_cells(board, positions):
@@ -218,6 +330,7 @@ def free_cell(board, position):
     if position in board:
         if board[position] is True:
             del board[position]
+            _cells_changed(board, (position,))
 
 
 def free_all_cells(board, positions):
@@ -238,6 +351,45 @@ def free_all_cells(board, positions):
         return free_all_cells(board, positions[1:])
 
 
+def _free_all_cells_in_mask(board, mask):
+    """
+        Free all the cells of the given board whose bits are set in the given mask.
+    """
+    freed_positions = get_positions_in_mask(dimension(board), get_filled_mask(board) & mask)
+    for position in freed_positions:
+        del board[position]
+    if len(freed_positions) > 0:
+        _cells_changed(board, freed_positions)
+
+
+# Masks of all the rows and of all the columns, keyed by the dimension.
+_line_masks = dict()
+
+
+def get_line_masks(board_dimension):
+    """
+        Return the bitmasks of all rows and of all columns of a board with the
+        given dimension (see get_filled_mask).
+        - The function returns a tuple consisting of a tuple with the mask of
+          each row, followed by a tuple with the mask of each column. Both tuples
+          are indexed by the number of the row or column; their element at
+          index 0 is 0.
+        - The masks are computed only once for each dimension.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+    """
+    if board_dimension not in _line_masks:
+        first_row_mask = 0
+        for column in range(0, board_dimension):
+            first_row_mask |= 1 << (column * board_dimension)
+        first_column_mask = (1 << board_dimension) - 1
+        row_masks = (0,) + tuple(first_row_mask << row for row in range(0, board_dimension))
+        column_masks = (0,) + tuple(first_column_mask << (column * board_dimension)
+                                    for column in range(0, board_dimension))
+        _line_masks[board_dimension] = (row_masks, column_masks)
+    return _line_masks[board_dimension]
+
+
 def free_row(board, row):
     """
         Free all the cells of the given row on the given board.
@@ -247,8 +399,7 @@ def free_row(board, row):
         - The given board is a proper board.
     """
     if type(row) == int and 0 < row <= dimension(board):
-        for col in range(1, dimension(board) + 1):
-            free_cell(board, (col, row))
+        _free_all_cells_in_mask(board, get_line_masks(dimension(board))[0][row])
 
 
 def free_column(board, column):
@@ -260,8 +411,473 @@ def free_column(board, column):
         - The given board is a proper board.
     """
     if type(column) == int and 0 < column <= dimension(board):
-        for row in range(1, dimension(board) + 1):
-            free_cell(board, (column, row))
+        _free_all_cells_in_mask(board, get_line_masks(dimension(board))[1][column])
+
+
+def _get_cell_index(board_dimension, position):
+    """
+        Return the index of the bit for the cell at the given position in masks
+        of boards with the given dimension.
+    """
+    return (position[0] - 1) * board_dimension + position[1] - 1
+
+
+def get_filled_mask(board):
+    """
+        Return a bitmask of all the filled cells on the given board.
+        - The bit for the cell at position (C,R) has index (C-1)*D+(R-1), in which
+          D is the dimension of the given board. Each column thus occupies D
+          successive bits, and bits are ordered in the same way as positions.
+        - The mask is kept up to date with each change of the board.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    derived = _get_derived(board)
+    if "bits" not in derived:
+        derived["bits"] = get_mask_of_positions(dimension(board), get_all_filled_positions(board))
+    return derived["bits"]
+
+
+# Byte per cell for each binary digit of a mask.
+_BYTE_OF_DIGIT = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def get_cells_buffer(board):
+    """
+        Return a read-only memoryview of shape (D,D) with a byte per cell of the
+        given board, in which D is the dimension of the given board.
+        - The byte at index [C-1][R-1] is 1 if the cell at position (C,R) is
+          filled, and 0 otherwise. The bytes are in the same order as the bits
+          of masks (see get_filled_mask).
+        - The view is built from the filled mask without inspecting cells one at
+          a time, and is only rebuilt if the board has changed since the previous
+          call. Consumers of the buffer protocol, such as numpy.asarray, use the
+          bytes of the view without copying them.
+        - Boards keep their filled cells as positions in a dict, so the view is a
+          snapshot: it does not follow later changes of the board.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    derived = _get_derived(board)
+    if "cells" not in derived:
+        board_dimension = dimension(board)
+        digits = format(get_filled_mask(board), "0{}b".format(board_dimension * board_dimension))[::-1]
+        derived["cells"] = memoryview(digits.encode().translate(_BYTE_OF_DIGIT)).cast(
+            "B", (board_dimension, board_dimension))
+    return derived["cells"]
+
+
+def get_packed_bytes(board):
+    """
+        Return the filled mask of the given board (see get_filled_mask) as bytes
+        in little-endian order, with (D*D+7)//8 bytes for a board of dimension D.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    board_dimension = dimension(board)
+    return get_filled_mask(board).to_bytes((board_dimension * board_dimension + 7) // 8, "little")
+
+
+# Encodings of boards in the first byte of their binary encoding.
+_PACKED_ENCODING = 0
+_RUN_LENGTH_ENCODING = 1
+
+
+def to_bytes(board, run_length=False):
+    """
+        Return the binary encoding of the dimension and the filled cells of the
+        given board.
+        - The encoding starts with a byte for the kind of encoding, followed by
+          the dimension D in 2 bytes (little-endian).
+        - Without run-length compression, the filled mask follows as (D*D+7)//8
+          bytes (see get_packed_bytes), so a board of dimension 10 takes 16 bytes.
+        - With run-length compression, the lengths of the alternating runs of free
+          and filled cells follow in the order of the bits of masks (see
+          get_filled_mask), starting with a run of free cells, each length taking
+          7 bits per byte (LEB128). The final run of free cells is left out. This
+          is shorter for large boards with few runs.
+        - Derived data, observers and transactions of the board are not encoded.
+        ASSUMPTIONS
+        - The given board is a proper board, or a persistent board.
+        - The dimension of the given board is less than 65536.
+    """
+    board_dimension = dimension(board)
+    if not run_length:
+        return struct.pack("<BH", _PACKED_ENCODING, board_dimension) + get_packed_bytes(board)
+    data = bytearray(struct.pack("<BH", _RUN_LENGTH_ENCODING, board_dimension))
+    mask = get_filled_mask(board)
+    while mask != 0:
+        nb_free_cells = (mask & -mask).bit_length() - 1
+        mask >>= nb_free_cells
+        # Adding 1 to the mask clears its trailing filled cells and sets the next bit.
+        nb_filled_cells = (mask ^ (mask + 1)).bit_length() - 1
+        mask >>= nb_filled_cells
+        for length in (nb_free_cells, nb_filled_cells):
+            while length >= 0x80:
+                data.append(length & 0x7F | 0x80)
+                length >>= 7
+            data.append(length)
+    return bytes(data)
+
+
+def from_bytes(data):
+    """
+        Return a new board from the given binary encoding (see to_bytes).
+        - The given encoding can be any object supporting the buffer protocol.
+        - A ValueError is raised if the given bytes are not a valid encoding
+          of a board.
+        ASSUMPTIONS
+        - None
+    """
+    data = memoryview(data).cast("B")
+    if len(data) < 3:
+        raise ValueError("encoding of a board too short")
+    (encoding, board_dimension) = struct.unpack_from("<BH", data)
+    nb_cells = board_dimension * board_dimension
+    if board_dimension == 0:
+        raise ValueError("encoding of a board without cells")
+    if encoding == _PACKED_ENCODING:
+        if len(data) != 3 + (nb_cells + 7) // 8:
+            raise ValueError("packed encoding of a board of the wrong length")
+        mask = int.from_bytes(data[3:], "little")
+    elif encoding == _RUN_LENGTH_ENCODING:
+        mask = 0
+        index = 0
+        length = 0
+        shift = 0
+        nb_runs = 0
+        for byte in data[3:]:
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if byte & 0x80 == 0:
+                if index + length > nb_cells:
+                    raise ValueError("encoding of a board with cells beyond its dimension")
+                if nb_runs % 2 == 1:
+                    mask |= ((1 << length) - 1) << index
+                index += length
+                nb_runs += 1
+                (length, shift) = (0, 0)
+        if shift != 0 or nb_runs % 2 == 1:
+            raise ValueError("run-length encoding of a board ends in the middle of a run")
+    else:
+        raise ValueError("unknown encoding of a board: {}".format(encoding))
+    if mask >> nb_cells != 0:
+        raise ValueError("encoding of a board with cells beyond its dimension")
+    return make_board_from_mask(board_dimension, mask)
+
+
+def get_mask_of_positions(board_dimension, positions):
+    """
+        Return a bitmask for a board with the given dimension in which the bits
+        for all the given positions are set (see get_filled_mask).
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+        - Each of the given positions is a proper position for a board with the
+          given dimension.
+    """
+    mask = 0
+    for position in positions:
+        mask |= 1 << _get_cell_index(board_dimension, position)
+    return mask
+
+
+def get_positions_in_mask(board_dimension, mask):
+    """
+        Return a list of all positions whose bits are set in the given bitmask
+        for a board with the given dimension (see get_filled_mask).
+        - The positions in the resulting list are in ascending order.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+        - The given mask has no bits set beyond the cells of the board.
+    """
+    positions = []
+    while mask != 0:
+        lowest_bit = mask & -mask
+        index = lowest_bit.bit_length() - 1
+        positions.append((index // board_dimension + 1, index % board_dimension + 1))
+        mask ^= lowest_bit
+    return positions
+
+
+def get_block_mask(board_dimension, block, position):
+    """
+        Return a bitmask of all the cells covered by the given block when dropped
+        at the given position on a board with the given dimension.
+        - None is returned if part of the block is outside the boundaries of the board.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+        - The given block is a proper block.
+        - The given position is a proper position.
+    """
+    mask = 0
+    for dot in block:
+        column = dot[0] + position[0]
+        row = dot[1] + position[1]
+        if not (0 < column <= board_dimension and 0 < row <= board_dimension):
+            return None
+        mask |= 1 << _get_cell_index(board_dimension, (column, row))
+    return mask
+
+
+def get_summed_area_table(board):
+    """
+        Return the summed-area table of the filled cells on the given board.
+        - The table is a list of lists of integer numbers, such that
+          table[column][row] is the number of filled cells at positions (c,r)
+          with 1 <= c <= column and 1 <= r <= row. The entries for column 0
+          and for row 0 are all 0.
+        - The table is only rebuilt if the board has changed since the
+          previous call. The resulting table may not be changed.
+        - The table is built from the masks of the columns (see get_filled_mask),
+          without inspecting cells one at a time.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    derived = _get_derived(board)
+    if "sat" not in derived:
+        board_dimension = dimension(board)
+        filled_mask = get_filled_mask(board)
+        column_mask = (1 << board_dimension) - 1
+        column_format = "0{}b".format(board_dimension)
+        table = [[0] * (board_dimension + 1)]
+        for column in range(board_dimension):
+            column_bits = (filled_mask >> (column * board_dimension)) & column_mask
+            if column_bits == 0:
+                table.append(table[-1])
+            else:
+                # Counts of filled cells in the column up to each row.
+                counts = itertools.accumulate(map(int, reversed(format(column_bits, column_format))))
+                table.append([0] + [previous + count for (previous, count) in zip(table[-1][1:], counts)])
+        derived["sat"] = table
+    return derived["sat"]
+
+
+def _count_filled(table, left, bottom, right, top):
+    """
+        Return the number of filled cells in the rectangle with the given
+        boundaries, using the given summed-area table.
+        - Boundaries are inclusive and must be within the board.
+    """
+    return table[right][top] - table[left - 1][top] - table[right][bottom - 1] + table[left - 1][bottom - 1]
+
+
+def is_free_rectangle(board, lower_left, upper_right):
+    """
+        Check whether all the cells in the rectangle with the given lower left
+        and upper right corner on the given board are free.
+        - False if part of the rectangle is outside the boundaries of the given board.
+        - The check takes constant time, independent of the size of the rectangle.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given corners are proper positions, with the lower left corner at
+          the left of and below the upper right corner (or at the same position).
+    """
+    if not (inside_board(board, lower_left) and inside_board(board, upper_right)):
+        return False
+    table = get_summed_area_table(board)
+    return _count_filled(table, lower_left[0], lower_left[1], upper_right[0], upper_right[1]) == 0
+
+
+def _cells_changed(board, positions):
+    """
+        Bring the data derived from the filled cells of the given board up to date
+        after the state of the cells at the given positions has changed.
+    """
+    derived = _get_derived(board)
+    if "log" in derived:
+        derived["log"]["changes"].append(tuple(positions))
+    if "bits" in derived:
+        for position in positions:
+            derived["bits"] ^= 1 << _get_cell_index(dimension(board), position)
+    derived.pop("cells", None)
+    derived.pop("sat", None)
+    if "runs" in derived:
+        for row in {position[1] for position in positions}:
+            derived["runs"]["rows"][row] = \
+                _free_runs(board, [(column, row) for column in range(1, dimension(board) + 1)])
+        for column in {position[0] for position in positions}:
+            derived["runs"]["columns"][column] = \
+                _free_runs(board, [(column, row) for row in range(1, dimension(board) + 1)])
+    if "anchors" in derived:
+        for (shape, anchors) in derived["anchors"].items():
+            # Only anchors for which the block covers one of the changed cells
+            # can have changed their state.
+            for (column, row) in positions:
+                for dot in shape:
+                    anchor = (column - dot[0], row - dot[1])
+                    if _fits_at(board, shape, anchor):
+                        anchors.add(anchor)
+                    else:
+                        anchors.discard(anchor)
+    if "observers" in derived:
+        for observer in derived["observers"]:
+            observer["changed"](board, observer, positions)
+
+
+def add_observer(board, observer):
+    """
+        Let the given observer follow all changes to the filled cells of the
+        given board.
+        - An observer is a dict with at least the keys "changed" and "copy".
+          Each time the state of the cells at some positions of the board has
+          changed, the function at "changed" is invoked with the board, the
+          observer and those positions. When the board is copied, the function
+          at "copy" is invoked with the observer, and must return the observer
+          for the copy.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given observer is an observer as described above.
+    """
+    _get_derived(board).setdefault("observers", []).append(observer)
+
+
+def get_observers(board):
+    """
+        Return a list of all the observers of the given board.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    return list(_get_derived(board).get("observers", ()))
+
+
+def remove_observer(board, observer):
+    """
+        Stop the given observer from following the changes of the given board.
+        - Nothing happens if the given observer does not observe the board.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    derived = _get_derived(board)
+    if "observers" in derived:
+        derived["observers"] = [other for other in derived["observers"] if other is not observer]
+        if len(derived["observers"]) == 0:
+            del derived["observers"]
+
+
+def _fits_at(board, block, position):
+    """
+        Check whether the given block can be dropped at the given position on the
+        given board, by checking each of its dots separately.
+    """
+    for dot in block:
+        dot_in_board = (dot[0] + position[0], dot[1] + position[1])
+        if not inside_board(board, dot_in_board) or is_filled_at(board, dot_in_board):
+            return False
+    return True
+
+
+def register_block(board, block):
+    """
+        Register the given block on the given board, such that the positions at
+        which it can be dropped are kept up to date with each change of the board.
+        - After a change of the board, only positions at which the block would
+          cover one of the changed cells are checked again.
+        - Nothing happens if an equal block is already registered on the given board.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given block is a proper block.
+    """
+    anchors = _get_derived(board).setdefault("anchors", dict())
+    shape = frozenset(block)
+    if shape not in anchors:
+        anchors[shape] = set(get_droppable_positions(board, block))
+
+
+def unregister_block(board, block):
+    """
+        Stop keeping track of the positions at which the given block can be dropped
+        on the given board.
+        - Nothing happens if the given block is not registered on the given board.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given block is a proper block.
+    """
+    derived = _get_derived(board)
+    anchors = derived.get("anchors", dict())
+    anchors.pop(frozenset(block), None)
+    if len(anchors) == 0:
+        derived.pop("anchors", None)
+
+
+def _free_runs(board, line):
+    """
+        Return a tuple of all maximal runs of free cells in the given line of
+        positions on the given board.
+        - Each run is a tuple consisting of the index in the line (starting from 1)
+          of its first cell, followed by its length.
+    """
+    runs = []
+    start = None
+    for index in range(len(line) + 1):
+        if index < len(line) and not is_filled_at(board, line[index]):
+            if start is None:
+                start = index
+        elif start is not None:
+            runs.append((start + 1, index - start))
+            start = None
+    return tuple(runs)
+
+
+def _get_free_runs(board):
+    """
+        Return the index of free runs of the given board, building it if the
+        board does not have one yet.
+    """
+    derived = _get_derived(board)
+    if "runs" not in derived:
+        all_rows = [()]
+        all_columns = [()]
+        for index in range(1, dimension(board) + 1):
+            all_rows.append(_free_runs(board, [(column, index) for column in range(1, dimension(board) + 1)]))
+            all_columns.append(_free_runs(board, [(index, row) for row in range(1, dimension(board) + 1)]))
+        derived["runs"] = {"rows": all_rows, "columns": all_columns}
+    return derived["runs"]
+
+
+def get_free_runs_in_row(board, row):
+    """
+        Return all maximal runs of free cells in the given row on the given board.
+        - The function returns a tuple of tuples (C,L) in ascending order, in which
+          C is the column of the leftmost cell of the run and L its length.
+        - The index is kept up to date with each change of the board, by only
+          recomputing the rows and columns that were touched.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given row is within the boundaries of the given board.
+    """
+    return _get_free_runs(board)["rows"][row]
+
+
+def get_free_runs_in_column(board, column):
+    """
+        Return all maximal runs of free cells in the given column on the given board.
+        - The function returns a tuple of tuples (R,L) in ascending order, in which
+          R is the row of the lowest cell of the run and L its length.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given column is within the boundaries of the given board.
+    """
+    return _get_free_runs(board)["columns"][column]
+
+
+def get_longest_free_row_run(board):
+    """
+        Return the length of the longest horizontal run of free cells on the
+        given board.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    return max([length for runs in _get_free_runs(board)["rows"] for (start, length) in runs], default=0)
+
+
+def get_longest_free_column_run(board):
+    """
+        Return the length of the longest vertical run of free cells on the
+        given board.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    return max([length for runs in _get_free_runs(board)["columns"] for (start, length) in runs], default=0)
 
 
 def can_be_dropped_at(board, block, position):
@@ -279,17 +895,8 @@ def can_be_dropped_at(board, block, position):
         - The given block is a proper block.
         - The given position is a proper position.
     """
-    # get the positions of the dots in the board with given position
-    block_in_board = list()
-    for dot in block:
-        block_in_board.append((dot[0] + position[0], dot[1] + position[1]))
-
-    for dot_in_board in block_in_board:
-        if dot_in_board in get_all_filled_positions(board):  # checks if pos is already filled
-            return False
-        if not inside_board(board, dot_in_board):  # check if pos in board
-            return False
-    return True
+    block_mask = get_block_mask(dimension(board), block, position)
+    return block_mask is not None and block_mask & get_filled_mask(board) == 0
 
 
 def get_droppable_positions(board, block):
@@ -303,20 +910,148 @@ def get_droppable_positions(board, block):
         NOTE
         - The function should only examine positions at which the given block
           fully fits within the boundaries of the given board.
+        - For blocks registered on the given board, the positions are taken from
+          the index that is kept up to date with each change of the board.
+    """
+    anchors = _get_derived(board).get("anchors")
+    if anchors is not None and frozenset(block) in anchors:
+        return sorted(anchors[frozenset(block)])
+
+    horizontal_offsets = Block.get_horizontal_offsets_from_anchor(block)
+    vertical_offsets = Block.get_vertical_offsets_from_anchor(block)
+
+    # Bits in the mask are ordered by column first, so the positions come out sorted.
+    return [(column - horizontal_offsets[0], row - vertical_offsets[0])
+            for (column, row) in get_positions_in_mask(dimension(board), get_droppable_mask(board, block))]
+
+
+# Function returning the mask of the standard blocks that fit on a board, or
+# None if it does not know it (see set_fit_lookup).
+_fit_lookup = None
+
+
+def set_fit_lookup(lookup):
+    """
+        Let get_fitting_blocks_mask consult the given lookup function before
+        checking each standard block.
+        - The lookup function takes a board, and returns the mask of the standard
+          blocks that fit on it, or None if it does not know it (see for instance
+          the module Tablebase).
+        - If the given lookup function is None, each standard block is checked.
+        ASSUMPTIONS
+        - The given lookup function is None or a function as described above.
+    """
+    global _fit_lookup
+    _fit_lookup = lookup
+
+
+def get_fitting_blocks_mask(board):
+    """
+        Return a mask of all the standard blocks that can be dropped somewhere on
+        the given board.
+        - Bit I of the mask is set if the block at index I in Block.standard_blocks
+          can be dropped on the given board.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    if _fit_lookup is not None:
+        fitting_mask = _fit_lookup(board)
+        if fitting_mask is not None:
+            return fitting_mask
+    fitting_mask = 0
+    for (index, block) in enumerate(Block.standard_blocks):
+        if get_droppable_mask(board, block) != 0:
+            fitting_mask |= 1 << index
+    return fitting_mask
+
+
+def get_fitting_blocks(board):
+    """
+        Return a list of all the standard blocks that can be dropped somewhere on
+        the given board, in the order of Block.standard_blocks.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    fitting_mask = get_fitting_blocks_mask(board)
+    return [block for (index, block) in enumerate(Block.standard_blocks) if fitting_mask & (1 << index) != 0]
+
+
+def is_fitting_block(board, block):
+    """
+        Check whether the given block can be dropped somewhere on the given board.
+        - For a block registered on the given board, the positions are taken from
+          the index that is kept up to date with each change of the board.
+        - For a standard block, the lookup function installed with set_fit_lookup
+          is consulted first, if any. Otherwise only the given block is checked,
+          instead of all the standard blocks as in get_fitting_blocks_mask.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given block is a proper block.
+    """
+    anchors = _get_derived(board).get("anchors")
+    if anchors is not None and frozenset(block) in anchors:
+        return len(anchors[frozenset(block)]) > 0
+    if _fit_lookup is not None and block in Block.standard_blocks:
+        fitting_mask = _fit_lookup(board)
+        if fitting_mask is not None:
+            return fitting_mask & (1 << Block.standard_blocks.index(block)) != 0
+    return get_droppable_mask(board, block) != 0
+
+
+def get_droppable_mask(board, block, filled_mask=None):
+    """
+        Return a bitmask of all positions at which the lower left corner of the
+        bounding box of the given block can be put when dropping the block on the
+        given board.
+        - If a filled mask is given, it replaces the filled cells of the given
+          board, so several states can be examined without changing the board.
+        - The bit for the cell at position (C,R) has index (C-1)*D+(R-1), in which
+          D is the dimension of the given board (see get_filled_mask).
+        - The mask is computed by shifting the mask of free cells over the offset
+          of each dot and intersecting the results, so it takes one operation on
+          the mask per dot of the block instead of a check per position and dot.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given block is a proper block.
     """
-    block_copy = block.copy()
-    droppable_positions = []
+    board_dimension = dimension(board)
+    horizontal_offsets = Block.get_horizontal_offsets_from_anchor(block)
+    vertical_offsets = Block.get_vertical_offsets_from_anchor(block)
+    width = horizontal_offsets[1] - horizontal_offsets[0] + 1
+    height = vertical_offsets[1] - vertical_offsets[0] + 1
+    if width > board_dimension or height > board_dimension:
+        return 0
+
+    if filled_mask is None:
+        filled_mask = get_filled_mask(board)
+    free_mask = filled_mask ^ ((1 << board_dimension * board_dimension) - 1)
+    # Restricting corners to the ones for which the bounding box is inside the
+    # board, prevents dots from wrapping around to the next column.
+    droppable_mask = _get_corner_mask(board_dimension, width, height)
+    for dot in block:
+        droppable_mask &= free_mask >> \
+            ((dot[0] - horizontal_offsets[0]) * board_dimension + dot[1] - vertical_offsets[0])
+    return droppable_mask
 
-    horizontal_offsets = Block.get_horizontal_offsets_from_anchor(block_copy)
-    vertical_offsets = Block.get_vertical_offsets_from_anchor(block_copy)
 
-    # check every position where block fully fits within the boundaries of the given board
-    for x_value in range(1-horizontal_offsets[0], dimension(board)-horizontal_offsets[1] + 1):
-        for y_value in range(1-vertical_offsets[0], dimension(board)-vertical_offsets[1] + 1):
-            possible_position = (x_value, y_value)
-            if can_be_dropped_at(board, block, possible_position):
-                droppable_positions.append(possible_position)
-    return droppable_positions
+# Masks of all cells at which the lower left corner of a box with a given width
+# and height can be put, keyed by the dimension, the width and the height.
+_corner_masks = dict()
+
+
+def _get_corner_mask(board_dimension, width, height):
+    """
+        Return the mask of all cells on a board with the given dimension at which
+        the lower left corner of a box with the given width and height can be put.
+    """
+    key = (board_dimension, width, height)
+    if key not in _corner_masks:
+        column_mask = (1 << (board_dimension - height + 1)) - 1
+        corner_mask = 0
+        for column in range(0, board_dimension - width + 1):
+            corner_mask |= column_mask << (column * board_dimension)
+        _corner_masks[key] = corner_mask
+    return _corner_masks[key]
 
 
 def block_pos_in_board(block, position):
@@ -346,6 +1081,7 @@ def drop_at(board, block, position):
         block_in_board = block_pos_in_board(block, position)
         for dot_in_board in block_in_board:
             board[dot_in_board] = True
+        _cells_changed(board, block_in_board)
 
 
 def clear_full_rows_and_columns(board):
@@ -354,14 +1090,87 @@ def clear_full_rows_and_columns(board):
         ASSUMPTIONS
         - The given board is a proper board.
     """
-    full_columns = get_all_filled_columns(board)
-    full_rows = get_all_filled_rows(board)
+    filled_mask = get_filled_mask(board)
+    (row_masks, column_masks) = get_line_masks(dimension(board))
+    full_lines_mask = 0
+    for line_mask in row_masks + column_masks:
+        if filled_mask & line_mask == line_mask:
+            full_lines_mask |= line_mask
+    _free_all_cells_in_mask(board, full_lines_mask)
 
-    for full_column in full_columns:
-        free_column(board, full_column)
 
-    for full_row in full_rows:
-        free_row(board, full_row)
+class _Transaction:
+    """
+        A scope in which all changes to a board are recorded, such that they can
+        be undone when the scope is left.
+    """
+
+    def __init__(self, board):
+        self._board = board
+        self._start = None
+        self._committed = False
+
+    def __enter__(self):
+        log = _get_derived(self._board).setdefault("log", {"changes": [], "nb_open": 0})
+        log["nb_open"] += 1
+        self._start = len(log["changes"])
+        return self
+
+    def commit(self):
+        """
+            Keep all changes made in this transaction when it ends. If this
+            transaction is nested in another one, its changes are still undone
+            if that other transaction is rolled back.
+        """
+        self._committed = True
+
+    def __exit__(self, exception_type, exception, traceback):
+        if not self._committed:
+            _undo_changes(self._board, self._start)
+        derived = _get_derived(self._board)
+        log = derived["log"]
+        log["nb_open"] -= 1
+        if log["nb_open"] == 0:
+            del derived["log"]
+        return False
+
+
+def transaction(board):
+    """
+        Return a transaction on the given board, to be used in a with statement.
+        - All changes made to the given board through the functions of this module
+          while the transaction is open, are undone when the with statement ends,
+          unless the method commit has been invoked on the transaction.
+        - Transactions can be nested. Undoing the changes of a transaction takes
+          time proportional to the number of changes, not to the size of the board.
+        - Example:
+            with Board.transaction(board) as changes:
+                Board.drop_at(board, block, position)
+                if Board.get_all_filled_rows(board) != []:
+                    changes.commit()
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    return _Transaction(board)
+
+
+def _undo_changes(board, start):
+    """
+        Undo all changes to the given board that have been recorded in its log
+        after the given number of changes.
+    """
+    derived = _get_derived(board)
+    log = derived.pop("log")
+    changes = log["changes"]
+    while len(changes) > start:
+        positions = changes.pop()
+        for position in positions:
+            if is_filled_at(board, position):
+                del board[position]
+            else:
+                board[position] = True
+        _cells_changed(board, positions)
+    derived["log"] = log
 
 
 def adjacent_positions_in_block(positions, block):
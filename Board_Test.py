@@ -1,5 +1,9 @@
 import Board
 import Block
+import PersistentBoard
+
+import array
+import pickle
 
 # tests for make_board
 
@@ -450,6 +454,261 @@ def test_Free_Column__Single_Case(score, max_score):
         pass
 
 
+# tests for get_filled_mask
+
+def test_Get_Filled_Mask__Changed_Board(score, max_score):
+    """Function get_filled_mask: mask follows changes of the board."""
+    max_score.value += 3
+    try:
+        the_board = Board.make_board(3, {(1, 1), (2, 3)})
+        assert Board.get_filled_mask(the_board) == 0b000100001
+        Board.fill_cell(the_board, (3, 2))
+        assert Board.get_filled_mask(the_board) == 0b010100001
+        Board.free_cell(the_board, (1, 1))
+        assert Board.get_filled_mask(the_board) == 0b010100000
+        assert Board.get_positions_in_mask(3, Board.get_filled_mask(the_board)) == [(2, 3), (3, 2)]
+        assert Board.get_mask_of_positions(3, [(3, 2), (2, 3)]) == Board.get_filled_mask(the_board)
+        assert Board.is_proper_board(the_board)
+        score.value += 3
+    except:
+        pass
+
+
+# tests for make_board_from_mask and make_board_from_buffer
+
+def test_Make_Board_From_Buffer__Single_Case(score, max_score):
+    """Functions make_board_from_mask and make_board_from_buffer: single case."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board_from_mask(3, 0b010100001)
+        assert Board.is_proper_board(the_board)
+        assert Board.get_all_filled_positions(the_board) == {(1, 1), (2, 3), (3, 2)}
+        assert Board.get_filled_mask(the_board) == 0b010100001
+        for data in (bytes([1, 0, 0, 0, 0, 1, 0, 1, 0]), bytearray([7, 0, 0, 0, 0, 255, 0, 1, 0]),
+                     array.array("b", [1, 0, 0, 0, 0, -1, 0, 1, 0])):
+            other_board = Board.make_board_from_buffer(3, data)
+            assert Board.is_proper_board(other_board)
+            assert Board.get_all_filled_positions(other_board) == {(1, 1), (2, 3), (3, 2)}
+        other_board = Board.make_board_from_buffer(3, memoryview(bytes(range(2, 11))).cast("B", (3, 3)))
+        assert Board.get_all_filled_positions(other_board) == {(column, row) for column in range(1, 4)
+                                                               for row in range(1, 4)}
+        other_board = Board.make_board_from_buffer(3, bytes([0b10100001, 0b0]), True)
+        assert Board.get_all_filled_positions(other_board) == {(1, 1), (2, 3), (3, 2)}
+        assert Board.get_all_filled_positions(Board.make_board_from_buffer(2, b"\x00" * 4)) == set()
+        score.value += 4
+    except:
+        pass
+
+
+# tests for get_cells_buffer and get_packed_bytes
+
+def test_Get_Cells_Buffer__Changed_Board(score, max_score):
+    """Functions get_cells_buffer and get_packed_bytes: buffers follow changes of the board."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(3, {(1, 1), (2, 3)})
+        cells = Board.get_cells_buffer(the_board)
+        assert cells.readonly and cells.shape == (3, 3) and cells.format == "B"
+        assert cells.tolist() == [[1, 0, 0], [0, 0, 1], [0, 0, 0]]
+        assert Board.get_cells_buffer(the_board) is cells
+        assert Board.get_packed_bytes(the_board) == bytes([0b00100001, 0])
+        Board.fill_cell(the_board, (3, 2))
+        assert Board.get_cells_buffer(the_board).tolist() == [[1, 0, 0], [0, 0, 1], [0, 1, 0]]
+        assert cells.tolist() == [[1, 0, 0], [0, 0, 1], [0, 0, 0]]
+        assert Board.get_packed_bytes(the_board) == bytes([0b10100001, 0])
+        assert Board.is_proper_board(the_board)
+        for board in (the_board, Board.make_board(7, {(1, 7), (7, 1), (4, 4)}), Board.make_board(1)):
+            positions = Board.get_all_filled_positions(board)
+            assert Board.get_all_filled_positions(
+                Board.make_board_from_buffer(Board.dimension(board), Board.get_cells_buffer(board))) == positions
+            assert Board.get_all_filled_positions(
+                Board.make_board_from_buffer(Board.dimension(board), Board.get_packed_bytes(board), True)) == positions
+        score.value += 4
+    except:
+        pass
+
+
+# tests for to_bytes and from_bytes
+
+def test_To_Bytes__Round_Trip(score, max_score):
+    """Functions to_bytes and from_bytes: boards survive their encoding."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(3, {(1, 1), (2, 3), (3, 2)})
+        assert Board.to_bytes(the_board) == bytes([0, 3, 0, 0b10100001, 0])
+        assert Board.to_bytes(the_board, True) == bytes([1, 3, 0, 0, 1, 4, 1, 1, 1])
+        assert len(Board.to_bytes(Board.make_board(10, {(1, 1)}))) == 16
+        for board in (the_board, Board.make_board(1), Board.make_board(1, {(1, 1)}),
+                      Board.make_board(20, {(column, 7) for column in range(1, 21)} | {(20, 20)}),
+                      PersistentBoard.make_board(4, {(2, 2), (2, 3)})):
+            for run_length in (False, True):
+                data = Board.to_bytes(board, run_length)
+                other_board = Board.from_bytes(data)
+                assert Board.is_proper_board(other_board)
+                assert Board.dimension(other_board) == Board.dimension(board)
+                assert Board.get_all_filled_positions(other_board) == Board.get_all_filled_positions(board)
+                assert Board.get_all_filled_positions(Board.from_bytes(bytearray(data))) == \
+                       Board.get_all_filled_positions(board)
+        assert len(Board.to_bytes(Board.make_board(100, {(50, 50)}), True)) < 10
+        score.value += 4
+    except:
+        pass
+
+
+def test_From_Bytes__Invalid_Encodings(score, max_score):
+    """Function from_bytes: invalid encodings."""
+    max_score.value += 2
+    try:
+        for data in (b"", bytes([0, 3]), bytes([0, 3, 0, 0]), bytes([0, 3, 0, 0, 2]), bytes([0, 0, 0]),
+                     bytes([2, 3, 0, 0, 0]), bytes([1, 3, 0, 0]), bytes([1, 3, 0, 0, 0x81]),
+                     bytes([1, 3, 0, 8, 2])):
+            try:
+                Board.from_bytes(data)
+                assert False
+            except ValueError:
+                pass
+        score.value += 2
+    except:
+        pass
+
+
+# tests for pickling boards
+
+def test_Pickle__Compact_Boards(score, max_score):
+    """Boards are pickled in their compact encoding."""
+    max_score.value += 2
+    try:
+        the_board = Board.make_board(10, {(column, row) for column in range(1, 11) for row in range(1, 11)
+                                          if (column + row) % 3 == 0})
+        Board.get_summed_area_table(the_board)
+        data = pickle.dumps(the_board)
+        assert len(data) < 100 and Board.to_bytes(the_board) in data
+        other_board = pickle.loads(data)
+        assert Board.is_proper_board(other_board)
+        assert Board.get_all_filled_positions(other_board) == Board.get_all_filled_positions(the_board)
+        assert Board.get_filled_mask(other_board) == Board.get_filled_mask(the_board)
+        copied_board = pickle.loads(pickle.dumps(Board.copy_board(other_board)))
+        assert Board.get_all_filled_positions(copied_board) == Board.get_all_filled_positions(the_board)
+        score.value += 2
+    except:
+        pass
+
+
+# tests for derived data
+
+def test_Derived_Data__Not_In_Items(score, max_score):
+    """Cached and recorded data does not change the items of a board."""
+    max_score.value += 2
+    try:
+        the_board = Board.make_board(4, {(1, 1), (2, 3)})
+        Board.get_filled_mask(the_board)
+        Board.get_summed_area_table(the_board)
+        Board.get_cells_buffer(the_board)
+        Board.register_block(the_board, Block.make_block({(0, 0)}))
+        with Board.transaction(the_board):
+            assert set(the_board) == {"dim", (1, 1), (2, 3)}
+        assert len(the_board) == 3
+        assert the_board == Board.make_board(4, {(1, 1), (2, 3)})
+        assert pickle.loads(pickle.dumps(the_board)) == Board.make_board(4, {(1, 1), (2, 3)})
+        assert Board.copy_board(the_board) == the_board
+        score.value += 2
+    except:
+        pass
+
+
+# tests for get_summed_area_table
+
+def test_Get_Summed_Area_Table__Single_Case(score, max_score):
+    """Function get_summed_area_table: single case."""
+    max_score.value += 3
+    try:
+        the_board = Board.make_board(3, {(1, 1), (2, 3), (3, 1), (3, 2)})
+        table = Board.get_summed_area_table(the_board)
+        assert table[0] == [0, 0, 0, 0]
+        assert table[1] == [0, 1, 1, 1]
+        assert table[2] == [0, 1, 1, 2]
+        assert table[3] == [0, 2, 3, 4]
+        score.value += 3
+    except:
+        pass
+
+
+def test_Get_Summed_Area_Table__Changed_Board(score, max_score):
+    """Function get_summed_area_table: table follows changes of the board."""
+    max_score.value += 3
+    try:
+        the_board = Board.make_board(3, {(1, 1)})
+        assert Board.get_summed_area_table(the_board)[3][3] == 1
+        Board.fill_cell(the_board, (2, 2))
+        assert Board.get_summed_area_table(the_board)[3][3] == 2
+        Board.drop_at(the_board, Block.make_block({(0, 0), (0, 1)}), (3, 1))
+        assert Board.get_summed_area_table(the_board)[3][3] == 4
+        Board.free_row(the_board, 1)
+        assert Board.get_summed_area_table(the_board)[3][3] == 2
+        assert Board.is_proper_board(the_board)
+        score.value += 3
+    except:
+        pass
+
+
+# tests for is_free_rectangle
+
+def test_Is_Free_Rectangle__Single_Case(score, max_score):
+    """Function is_free_rectangle: single case."""
+    max_score.value += 3
+    try:
+        the_board = Board.make_board(4, {(2, 2), (4, 4)})
+        assert Board.is_free_rectangle(the_board, (1, 3), (3, 4))
+        assert Board.is_free_rectangle(the_board, (3, 1), (4, 3))
+        assert not Board.is_free_rectangle(the_board, (1, 1), (2, 2))
+        assert not Board.is_free_rectangle(the_board, (2, 2), (2, 2))
+        assert not Board.is_free_rectangle(the_board, (3, 1), (5, 2))
+        score.value += 3
+    except:
+        pass
+
+
+# tests for get_free_runs_in_row and get_free_runs_in_column
+
+def test_Get_Free_Runs__Single_Case(score, max_score):
+    """Functions get_free_runs_in_row and get_free_runs_in_column: single case."""
+    max_score.value += 3
+    try:
+        the_board = Board.make_board(5, {(2, 1), (3, 1), (5, 1), (2, 4)})
+        assert Board.get_free_runs_in_row(the_board, 1) == ((1, 1), (4, 1))
+        assert Board.get_free_runs_in_row(the_board, 2) == ((1, 5),)
+        assert Board.get_free_runs_in_column(the_board, 2) == ((2, 2), (5, 1))
+        assert Board.get_free_runs_in_column(the_board, 5) == ((2, 4),)
+        assert Board.get_longest_free_row_run(the_board) == 5
+        assert Board.get_longest_free_column_run(the_board) == 5
+        score.value += 3
+    except:
+        pass
+
+
+def test_Get_Free_Runs__Changed_Board(score, max_score):
+    """Functions get_free_runs_in_row and get_free_runs_in_column: runs follow changes of the board."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(3, {(1, 1)})
+        assert Board.get_free_runs_in_row(the_board, 1) == ((2, 2),)
+        the_copy = Board.copy_board(the_board)
+        Board.drop_at(the_board, Block.make_block({(0, 0), (1, 0)}), (2, 1))
+        assert Board.get_free_runs_in_row(the_board, 1) == ()
+        assert Board.get_free_runs_in_column(the_board, 3) == ((2, 2),)
+        assert Board.get_free_runs_in_row(the_copy, 1) == ((2, 2),)
+        Board.clear_full_rows_and_columns(the_board)
+        assert Board.get_free_runs_in_row(the_board, 1) == ((1, 3),)
+        assert Board.get_longest_free_column_run(the_board) == 3
+        Board.fill_all_cells(the_board, [(1, 2), (2, 2), (3, 2), (2, 1), (2, 3)])
+        assert Board.get_longest_free_row_run(the_board) == 1
+        assert Board.get_longest_free_column_run(the_board) == 1
+        assert Board.is_proper_board(the_board)
+        score.value += 4
+    except:
+        pass
+
+
 # tests for can_be_dropped_at
 
 def test_Can_Be_Dropped_At__True_Case(score, max_score):
@@ -613,6 +872,81 @@ def test_Get_Droppable_Positions__NonEmptyBoard_Non_Fitting_Block(score, max_sco
         pass
 
 
+def test_Get_Droppable_Positions__All_Standard_Blocks(score, max_score):
+    """Function get_droppable_positions: all standard blocks on random boards."""
+    max_score.value += 6
+    try:
+        import random
+        generator = random.Random(1010)
+        for dimension in (1, 4, 7):
+            all_positions = [(column, row) for column in range(-6, dimension + 7) for row in range(-6, dimension + 7)]
+            for nb_filled in (0, dimension, dimension * dimension // 2):
+                the_board = Board.make_board(dimension, generator.sample(
+                    [(column, row) for column in range(1, dimension + 1) for row in range(1, dimension + 1)],
+                    nb_filled))
+                for block in Block.standard_blocks:
+                    expected = [position for position in all_positions
+                                if all(Board.inside_board(the_board, (dot[0] + position[0], dot[1] + position[1])) and
+                                       not Board.is_filled_at(the_board, (dot[0] + position[0], dot[1] + position[1]))
+                                       for dot in block)]
+                    assert Board.get_droppable_positions(the_board, block) == expected
+        score.value += 6
+    except:
+        pass
+
+
+def test_Get_Droppable_Positions__Registered_Blocks(score, max_score):
+    """Function get_droppable_positions: blocks registered on a changing board."""
+    max_score.value += 6
+    try:
+        import random
+        generator = random.Random(2020)
+        the_board = Board.make_board(6)
+        reference_board = Board.make_board(6)
+        for block in Block.standard_blocks:
+            Board.register_block(the_board, block)
+        for move in range(40):
+            block = generator.choice(Block.standard_blocks)
+            positions = Board.get_droppable_positions(reference_board, block)
+            assert Board.get_droppable_positions(the_board, block) == positions
+            assert Board.is_fitting_block(the_board, block) == (len(positions) > 0)
+            if len(positions) == 0:
+                break
+            position = generator.choice(positions)
+            for board in (the_board, reference_board):
+                Board.drop_at(board, block, position)
+                Board.clear_full_rows_and_columns(board)
+        the_copy = Board.copy_board(the_board)
+        Board.fill_all_cells(the_board, [(column, row) for column in range(1, 7) for row in range(1, 7)])
+        assert Board.get_droppable_positions(the_board, Block.standard_blocks[0]) == []
+        assert not Board.is_fitting_block(the_board, Block.standard_blocks[0])
+        assert Board.get_droppable_positions(the_copy, Block.standard_blocks[0]) == \
+               Board.get_droppable_positions(reference_board, Block.standard_blocks[0])
+        Board.unregister_block(the_copy, Block.standard_blocks[0])
+        assert Board.get_droppable_positions(the_copy, Block.standard_blocks[0]) == \
+               Board.get_droppable_positions(reference_board, Block.standard_blocks[0])
+        assert Board.is_proper_board(the_board)
+        score.value += 6
+    except:
+        pass
+
+
+# tests for get_droppable_mask
+
+def test_Get_Droppable_Mask__Single_Case(score, max_score):
+    """Function get_droppable_mask: single case."""
+    max_score.value += 3
+    try:
+        the_board = Board.make_board(3, {(2, 2)})
+        # Lower left corners of a vertical line of length 2 in columns 1 and 3.
+        assert Board.get_droppable_mask(the_board, Block.make_block({(0, -6), (0, -5)})) == 0b011000011
+        assert Board.get_droppable_mask(the_board, Block.make_block({(0, 0), (1, 0), (0, 1), (1, 1)})) == 0
+        assert Board.get_droppable_mask(the_board, Block.make_block({(0, 0), (1, 0), (2, 0), (3, 0)})) == 0
+        score.value += 3
+    except:
+        pass
+
+
 # tests for drop_at
 
 def test_Drop_at__Normalized_Block(score, max_score):
@@ -660,6 +994,22 @@ def test_Drop_at__Non_Fitting_Block(score, max_score):
         pass
 
 
+# tests for get_line_masks
+
+def test_Get_Line_Masks__Single_Case(score, max_score):
+    """Function get_line_masks: single case."""
+    max_score.value += 2
+    try:
+        (row_masks, column_masks) = Board.get_line_masks(3)
+        assert row_masks == (0, 0b001001001, 0b010010010, 0b100100100)
+        assert column_masks == (0, 0b000000111, 0b000111000, 0b111000000)
+        the_board = Board.make_board(3, {(1, 2), (2, 2), (3, 2)})
+        assert Board.get_filled_mask(the_board) == row_masks[2]
+        score.value += 2
+    except:
+        pass
+
+
 # tests for clear_full_rows_and_columns
 
 def test_Clear_Full_Rows_And_Columns__No_Fulls(score, max_score):
@@ -737,6 +1087,58 @@ def test_Clear_Full_Rows_And_Columns__Full_Rows_And_Columns(score, max_score):
         pass
 
 
+# tests for transaction
+
+def test_Transaction__Rollback(score, max_score):
+    """Function transaction: changes are undone at the end of the transaction."""
+    max_score.value += 4
+    try:
+        positions_to_fill = {(1, 1), (2, 1), (3, 1), (1, 3)}
+        the_board = Board.make_board(4, positions_to_fill)
+        Board.register_block(the_board, Block.make_block({(0, 0), (1, 0)}))
+        droppable_positions = Board.get_droppable_positions(the_board, Block.make_block({(0, 0), (1, 0)}))
+        with Board.transaction(the_board):
+            Board.fill_cell(the_board, (2, 2))
+            Board.free_cell(the_board, (1, 3))
+            Board.drop_at(the_board, Block.make_block({(0, 0)}), (4, 1))
+            Board.clear_full_rows_and_columns(the_board)
+            assert Board.get_all_filled_positions(the_board) == {(2, 2)}
+        assert Board.get_all_filled_positions(the_board) == positions_to_fill
+        assert Board.get_filled_mask(the_board) == Board.get_mask_of_positions(4, positions_to_fill)
+        assert Board.get_droppable_positions(the_board, Block.make_block({(0, 0), (1, 0)})) == droppable_positions
+        assert Board.is_proper_board(the_board)
+        score.value += 4
+    except:
+        pass
+
+
+def test_Transaction__Nested_And_Committed(score, max_score):
+    """Function transaction: nested transactions and committed changes."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(3, {(1, 1)})
+        with Board.transaction(the_board) as outer:
+            Board.fill_cell(the_board, (2, 2))
+            with Board.transaction(the_board):
+                Board.fill_cell(the_board, (3, 3))
+            assert Board.get_all_filled_positions(the_board) == {(1, 1), (2, 2)}
+            with Board.transaction(the_board) as inner:
+                Board.fill_cell(the_board, (1, 2))
+                inner.commit()
+            assert Board.get_all_filled_positions(the_board) == {(1, 1), (2, 2), (1, 2)}
+            the_copy = Board.copy_board(the_board)
+        assert Board.get_all_filled_positions(the_board) == {(1, 1)}
+        assert Board.get_all_filled_positions(the_copy) == {(1, 1), (2, 2), (1, 2)}
+        with Board.transaction(the_board) as outer:
+            Board.fill_cell(the_board, (3, 1))
+            outer.commit()
+        assert Board.get_all_filled_positions(the_board) == {(1, 1), (3, 1)}
+        assert Board.is_proper_board(the_board)
+        score.value += 4
+    except:
+        pass
+
+
 # tests for are_chained
 
 def test_Are_Chained__Trivial_Cases(score, max_score):
@@ -845,6 +1247,22 @@ board_test_functions = \
 
         test_Free_Column__Single_Case,
 
+        test_Get_Filled_Mask__Changed_Board,
+        test_Make_Board_From_Buffer__Single_Case,
+        test_Get_Cells_Buffer__Changed_Board,
+        test_To_Bytes__Round_Trip,
+        test_From_Bytes__Invalid_Encodings,
+        test_Pickle__Compact_Boards,
+        test_Derived_Data__Not_In_Items,
+
+        test_Get_Summed_Area_Table__Single_Case,
+        test_Get_Summed_Area_Table__Changed_Board,
+
+        test_Is_Free_Rectangle__Single_Case,
+
+        test_Get_Free_Runs__Single_Case,
+        test_Get_Free_Runs__Changed_Board,
+
         test_Can_Be_Dropped_At__True_Case,
         test_Can_Be_Dropped_At__Filled_Cells,
         test_Can_Be_Dropped_At__Outside_Boundaries,
@@ -856,16 +1274,25 @@ board_test_functions = \
         test_Get_Droppable_Positions__NonEmptyBoard_Normalized_Block,
         test_Get_Droppable_Positions__NonEmptyBoard_Non_Normalized_Block,
         test_Get_Droppable_Positions__NonEmptyBoard_Non_Fitting_Block,
+        test_Get_Droppable_Positions__All_Standard_Blocks,
+        test_Get_Droppable_Positions__Registered_Blocks,
+
+        test_Get_Droppable_Mask__Single_Case,
 
         test_Drop_at__Normalized_Block,
         test_Drop_at__Non_Normalized_Block,
         test_Drop_at__Non_Fitting_Block,
 
+        test_Get_Line_Masks__Single_Case,
+
         test_Clear_Full_Rows_And_Columns__No_Fulls,
         test_Clear_Full_Rows_And_Columns__Only_Full_Columns,
         test_Clear_Full_Rows_And_Columns__Only_Full_Rows,
         test_Clear_Full_Rows_And_Columns__Full_Rows_And_Columns,
 
+        test_Transaction__Rollback,
+        test_Transaction__Nested_And_Committed,
+
         test_Are_Chained__Trivial_Cases,
         test_Are_Chained__Adjacent_Positions,
         test_Are_Chained__Non_Adjacent_Chained_Positions,
@@ -0,0 +1,313 @@
+import Block
+import Board
+import Evaluation
+import Game
+import PersistentBoard
+
+import collections
+import json
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+
+# A dataset holds samples of positions reached in seeded games without
+# interaction (see Game.play_headless), labeled with the best moves for them, to
+# train models that rank moves.
+# The games only generate the positions: the blocks are drawn at random and
+# dropped where an evaluator (see the module Evaluation) prefers. Each move of a
+# game is then labeled with the move that Game.play_greedy makes for its block,
+# in a group of a given size with the blocks drawn after it, looking ahead at a
+# given number of further blocks (see Game.get_greedy_moves). With groups of a
+# single block and no lookahead, the label is the move of Game.highest_score for
+# the block alone. If the blocks of a group cannot all be dropped, smaller groups
+# are tried.
+# A dataset is a directory with shards and an index. Each shard is a raw binary
+# file of at most a fixed number of samples, that are all of the same size, so a
+# shard can be mapped into memory and sample N of a shard starts at N times the
+# size of a sample. A sample consists of the following little-endian fields, in
+# which B is the number of bytes needed for a bit per cell of the board:
+# - "game" (u4) and "move" (u4): the number of the game in the dataset and of the
+#   move in that game, both starting at 0.
+# - "board" (B bytes): the filled mask of the board before the move (see
+#   Board.get_filled_mask).
+# - "block" (B bytes): the mask of the cells covered by the block if the lower
+#   left corner of its bounding box is at position (1,1).
+# - "legal" (B bytes): the mask of all positions at which the lower left corner
+#   of the bounding box of the block can be put (see Board.get_droppable_mask).
+# - "corner" (u2): the index of the bit of the position of the lower left corner
+#   of the bounding box of the block in the move played.
+# - "column" and "row" (i2): the position of the anchor of the block in the move.
+# - "move_score" (i4): the score of the move.
+# - "game_score" (i4): the final score of the game.
+# - "best_corner" (u2), "best_column" and "best_row" (i2): the label, that is the
+#   index of the bit of the lower left corner of the bounding box and the position
+#   of the anchor of the block in the best move.
+# - "best_score" (i4): the highest score for the group of the best move and the
+#   blocks looked ahead at (see Game.get_greedy_moves).
+# The index is a JSON file with the dimension of the board, the size of a sample,
+# the fields of a sample (each given by its name, its type in the notation of
+# NumPy and its number of elements), and per shard its file name and number of
+# samples. The fields and the sizes of the shards are enough to map a shard onto
+# an array of records, for instance with numpy.memmap.
+# Games are played by a pool of processes, and their samples are written to the
+# shards in the order of the games as soon as they are played. At most a few
+# games per process are handed to the pool at any time, so only the samples of
+# those games are in memory, whatever the size of the dataset.
+
+INDEX_FILE_NAME = "index.json"
+
+_FORMAT = "1010-samples"
+_FORMAT_VERSION = 3
+
+
+def get_sample_fields(dimension):
+    """
+        Return a list of the fields of a sample in a dataset for boards of the
+        given dimension, each field being a list consisting of its name, its type
+        in the notation of NumPy, and its number of elements.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+    """
+    nb_mask_bytes = _get_nb_mask_bytes(dimension)
+    return [["game", "<u4", 1], ["move", "<u4", 1],
+            ["board", "u1", nb_mask_bytes], ["block", "u1", nb_mask_bytes], ["legal", "u1", nb_mask_bytes],
+            ["corner", "<u2", 1], ["column", "<i2", 1], ["row", "<i2", 1],
+            ["move_score", "<i4", 1], ["game_score", "<i4", 1],
+            ["best_corner", "<u2", 1], ["best_column", "<i2", 1], ["best_row", "<i2", 1], ["best_score", "<i4", 1]]
+
+
+def get_sample_size(dimension):
+    """
+        Return the number of bytes of a sample in a dataset for boards of the
+        given dimension.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+    """
+    return struct.calcsize(_get_sample_format(dimension))
+
+
+def export_dataset(directory, nb_games, dimension=10, strategy=Evaluation.evaluate, max_moves=None,
+                   shard_size=65536, seed=0, nb_processes=None, group_size=1, lookahead=0):
+    """
+        Play the given number of games with the given strategy on an empty board
+        of the given dimension, and write a sample for each of their moves,
+        labeled with the best move for groups of the given size looking ahead at
+        the given number of blocks, to a dataset in the given directory. Return
+        the index of the dataset.
+        - Each game has at most the given maximum number of moves (unlimited if
+          None). Each shard holds at most the given number of samples.
+        - Games are played in parallel by a pool of the given number of processes
+          (the number of processors if None). With a single process, no pool is used.
+        - The directory is created if it does not exist. The index and the shards
+          of a dataset previously written to the directory are overwritten.
+        - Given the same seed, the same games are played.
+        ASSUMPTIONS
+        - The given strategy is a picklable evaluator (see Game.play_headless).
+        - The given numbers of games, samples per shard and processes and the
+          given group size are positive integer numbers, and the dimension is at
+          most 255. The given lookahead is a non-negative integer number.
+        - The given directory is a path at which a directory can be created and
+          written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    generator = random.Random(seed)
+    tasks = ((game, generator.getrandbits(32), dimension, strategy, max_moves, group_size, lookahead)
+             for game in range(nb_games))
+    sample_size = get_sample_size(dimension)
+    shards = []
+    shard_file = None
+    pool = None
+    if nb_processes != 1:
+        pool = multiprocessing.Pool(nb_processes)
+    try:
+        if pool is None:
+            game_samples = map(_play_game, tasks)
+        else:
+            game_samples = _map_in_order(pool, _play_game, tasks, 2 * (nb_processes or os.cpu_count() or 1))
+        for samples in game_samples:
+            for start in range(0, len(samples), sample_size):
+                if shard_file is None or shards[-1]["nb_samples"] == shard_size:
+                    if shard_file is not None:
+                        shard_file.close()
+                    shards.append({"file": "shard-{:05d}.bin".format(len(shards)), "nb_samples": 0})
+                    shard_file = open(os.path.join(directory, shards[-1]["file"]), "wb")
+                shard_file.write(samples[start:start + sample_size])
+                shards[-1]["nb_samples"] += 1
+    finally:
+        if shard_file is not None:
+            shard_file.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    index = {"format": _FORMAT, "version": _FORMAT_VERSION, "dimension": dimension,
+             "sample_size": sample_size, "fields": get_sample_fields(dimension),
+             "nb_games": nb_games, "nb_samples": sum([shard["nb_samples"] for shard in shards]),
+             "seed": seed, "shards": shards}
+    # The index is replaced at once, so it never describes shards that are
+    # only partly written.
+    temporary_path = os.path.join(directory, INDEX_FILE_NAME + ".tmp")
+    with open(temporary_path, "w") as file:
+        json.dump(index, file, indent=1)
+    os.replace(temporary_path, os.path.join(directory, INDEX_FILE_NAME))
+    return index
+
+
+def load_index(directory):
+    """
+        Return the index of the dataset in the given directory.
+        - A ValueError is raised if the directory holds no index of a dataset in
+          the format of this module.
+        ASSUMPTIONS
+        - The given directory is a path at which a directory can be read.
+    """
+    try:
+        with open(os.path.join(directory, INDEX_FILE_NAME)) as file:
+            index = json.load(file)
+    except (OSError, ValueError) as error:
+        raise ValueError(str(error))
+    if index.get("format") != _FORMAT or index.get("version") != _FORMAT_VERSION:
+        raise ValueError("not a dataset of format version {}".format(_FORMAT_VERSION))
+    return index
+
+
+def read_samples(directory):
+    """
+        Return an iterator over the samples of the dataset in the given directory,
+        in the order in which they were written. Each sample is decoded by
+        decode_sample.
+        - Shards are mapped into memory one at a time, so the samples are read
+          in constant memory whatever the size of the dataset.
+        ASSUMPTIONS
+        - The given directory holds a dataset.
+    """
+    index = load_index(directory)
+    sample_size = index["sample_size"]
+    for shard in index["shards"]:
+        if shard["nb_samples"] == 0:
+            continue
+        with open(os.path.join(directory, shard["file"]), "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for start in range(0, shard["nb_samples"] * sample_size, sample_size):
+                    yield decode_sample(index["dimension"], data[start:start + sample_size])
+
+
+def decode_sample(dimension, data):
+    """
+        Return a dict with the fields of the sample in the given bytes, for
+        boards of the given dimension.
+        - The keys are the names of the fields, except that the anchors of the
+          block are positions at the keys "position" and "best_position" instead
+          of the keys "column", "row", "best_column" and "best_row". Masks are integer numbers (see Board.get_filled_mask).
+        ASSUMPTIONS
+        - The given bytes are a sample of a dataset for boards of the given
+          dimension.
+    """
+    (game, move, board_bytes, block_bytes, legal_bytes, corner, column, row, move_score, game_score,
+     best_corner, best_column, best_row, best_score) = struct.unpack(_get_sample_format(dimension), data)
+    return {"game": game, "move": move,
+            "board": int.from_bytes(board_bytes, "little"), "block": int.from_bytes(block_bytes, "little"),
+            "legal": int.from_bytes(legal_bytes, "little"), "corner": corner, "position": (column, row),
+            "move_score": move_score, "game_score": game_score,
+            "best_corner": best_corner, "best_position": (best_column, best_row), "best_score": best_score}
+
+
+def _get_nb_mask_bytes(dimension):
+    """
+        Return the number of bytes of a mask for a board of the given dimension.
+    """
+    return (dimension * dimension + 7) // 8
+
+
+def _get_sample_format(dimension):
+    """
+        Return the struct format of a sample for boards of the given dimension.
+    """
+    nb_mask_bytes = _get_nb_mask_bytes(dimension)
+    return "<II{0}s{0}s{0}sHhhiiHhhi".format(nb_mask_bytes)
+
+
+def _map_in_order(pool, function, tasks, max_pending):
+    """
+        Return an iterator over the results of applying the given function to
+        the given tasks in the given pool, in the order of the tasks.
+        - At most the given number of tasks are handed to the pool at any time,
+          so tasks are only taken from the given iterable as results are consumed.
+    """
+    pending = collections.deque()
+    for task in tasks:
+        pending.append(pool.apply_async(function, (task,)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while len(pending) > 0:
+        yield pending.popleft().get()
+
+
+def _play_game(task):
+    """
+        Play the game of the given task, a tuple consisting of the number of the
+        game, its seed, the dimension of the board, the strategy, the maximum
+        number of moves, the group size and the lookahead, and return the bytes
+        of the labeled samples of its moves.
+    """
+    (game, game_seed, dimension, strategy, max_moves, group_size, lookahead) = task
+    nb_mask_bytes = _get_nb_mask_bytes(dimension)
+    boards = []
+    blocks = []
+    moves = []
+
+    def record_move(board, block, position, move_score):
+        boards.append(PersistentBoard.make_from_board(board))
+        blocks.append(block)
+        block_mask = Board.get_block_mask(dimension, block, _get_corner_anchor(block))
+        moves.append((Board.get_filled_mask(board), block_mask, Board.get_droppable_mask(board, block),
+                      _get_corner_index(dimension, block, position), position, move_score))
+
+    result = Game.play_headless(Board.make_board(dimension), strategy, game_seed, max_moves, recorder=record_move)
+    sample_format = _get_sample_format(dimension)
+    samples = []
+    for (move, (board_mask, block_mask, legal_mask, corner, position, move_score)) in enumerate(moves):
+        (best_score, best_position) = _get_label(boards[move], blocks, move, group_size, lookahead)
+        samples.append(struct.pack(sample_format, game, move,
+                                   board_mask.to_bytes(nb_mask_bytes, "little"),
+                                   block_mask.to_bytes(nb_mask_bytes, "little"),
+                                   legal_mask.to_bytes(nb_mask_bytes, "little"),
+                                   corner, position[0], position[1], move_score, result["score"],
+                                   _get_corner_index(dimension, blocks[move], best_position),
+                                   best_position[0], best_position[1], best_score))
+    return b"".join(samples)
+
+
+def _get_label(board, blocks, move, group_size, lookahead):
+    """
+        Return a tuple consisting of the highest score and the best position for
+        the block of the given move, on the given board reached before that move,
+        in a group of at most the given size looking ahead at the given number of
+        blocks (see Game.get_greedy_moves).
+    """
+    for size in range(group_size, 0, -1):
+        group_moves = Game.get_greedy_moves(board, blocks[move:], size, lookahead)
+        if group_moves is not None:
+            return group_moves[0], dict(group_moves[1])[0]
+
+
+def _get_corner_anchor(block):
+    """
+        Return the position of the anchor of the given block if the lower left
+        corner of its bounding box is at position (1,1).
+    """
+    horizontal_offsets = Block.get_horizontal_offsets_from_anchor(block)
+    vertical_offsets = Block.get_vertical_offsets_from_anchor(block)
+    return 1 - horizontal_offsets[0], 1 - vertical_offsets[0]
+
+
+def _get_corner_index(dimension, block, position):
+    """
+        Return the index of the bit of the lower left corner of the bounding box
+        of the given block with its anchor at the given position, on a board of
+        the given dimension.
+    """
+    (column_offset, row_offset) = _get_corner_anchor(block)
+    return (position[0] - column_offset) * dimension + position[1] - row_offset
@@ -0,0 +1,149 @@
+import Block
+import Board
+import Dataset
+import Game
+
+import os
+import tempfile
+
+
+# tests for export_dataset
+
+def test_Export_Dataset__Replayed_Samples(score, max_score):
+    """Function export_dataset: samples agree with a replay of their games."""
+    max_score.value += 6
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            index = Dataset.export_dataset(directory, 3, 6, max_moves=8, shard_size=5, seed=11, nb_processes=1)
+            assert index == Dataset.load_index(directory)
+            assert index["nb_games"] == 3 and index["sample_size"] == Dataset.get_sample_size(6)
+            assert all([shard["nb_samples"] == 5 for shard in index["shards"][:-1]])
+            assert 0 < index["shards"][-1]["nb_samples"] <= 5
+            for shard in index["shards"]:
+                assert os.path.getsize(os.path.join(directory, shard["file"])) == \
+                       shard["nb_samples"] * index["sample_size"]
+            samples = list(Dataset.read_samples(directory))
+            assert len(samples) == index["nb_samples"]
+            the_board = None
+            for sample in samples:
+                if sample["move"] == 0:
+                    the_board = Board.make_board(6)
+                    total_score = 0
+                assert sample["board"] == Board.get_filled_mask(the_board)
+                block = [block for block in Block.standard_blocks
+                         if Board.get_block_mask(6, block, sample["position"]) is not None and
+                         sample["block"] << (sample["corner"]) == Board.get_block_mask(6, block, sample["position"])]
+                assert len(block) > 0
+                assert sample["legal"] == Board.get_droppable_mask(the_board, block[0])
+                assert sample["legal"] & (1 << sample["corner"]) != 0
+                assert Game.highest_score(the_board, block[:1]) == (sample["best_score"], [sample["best_position"]])
+                assert Board.get_block_mask(6, block[0], sample["best_position"]) == \
+                       sample["block"] << sample["best_corner"]
+                assert Game.game_move(the_board, block[0], sample["position"]) == sample["move_score"]
+                total_score += sample["move_score"]
+                if sample is samples[-1] or samples[samples.index(sample) + 1]["move"] == 0:
+                    assert total_score == sample["game_score"]
+        score.value += 6
+    except:
+        pass
+
+
+def test_Export_Dataset__Processes(score, max_score):
+    """Function export_dataset: shards do not depend on the number of processes."""
+    max_score.value += 3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            with tempfile.TemporaryDirectory() as other_directory:
+                index = Dataset.export_dataset(directory, 4, 5, max_moves=6, shard_size=7, seed=3, nb_processes=1)
+                assert Dataset.export_dataset(other_directory, 4, 5, max_moves=6, shard_size=7, seed=3,
+                                              nb_processes=2) == index
+                for shard in index["shards"]:
+                    with open(os.path.join(directory, shard["file"]), "rb") as file:
+                        with open(os.path.join(other_directory, shard["file"]), "rb") as other_file:
+                            assert file.read() == other_file.read()
+        score.value += 3
+    except:
+        pass
+
+
+def test_Export_Dataset__Labels_With_Lookahead(score, max_score):
+    """Function export_dataset: labels are the moves of play_greedy with groups and lookahead."""
+    max_score.value += 4
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            Dataset.export_dataset(directory, 2, 5, max_moves=6, seed=7, nb_processes=1, group_size=2, lookahead=1)
+            samples = list(Dataset.read_samples(directory))
+            assert len(samples) > 0
+            games = dict()
+            for sample in samples:
+                block = [block for block in Block.standard_blocks
+                         if Board.get_block_mask(5, block, sample["position"]) == sample["block"] << sample["corner"]]
+                games.setdefault(sample["game"], []).append(block[0])
+            for sample in samples:
+                blocks = games[sample["game"]][sample["move"]:]
+                the_board = Board.make_board(5, Board.get_positions_in_mask(5, sample["board"]))
+                group_moves = Game.get_greedy_moves(the_board, blocks, 2, 1)
+                if group_moves is None:
+                    group_moves = Game.get_greedy_moves(the_board, blocks, 1, 1)
+                assert (sample["best_score"], sample["best_position"]) == (group_moves[0], dict(group_moves[1])[0])
+                assert sample["legal"] & (1 << sample["best_corner"]) != 0
+            # The last block of a game has no blocks after it to group with.
+            the_board = Board.make_board(5, Board.get_positions_in_mask(5, samples[-1]["board"]))
+            assert Game.highest_score(the_board, games[1][-1:]) == \
+                   (samples[-1]["best_score"], [samples[-1]["best_position"]])
+        score.value += 4
+    except:
+        pass
+
+
+# tests for load_index
+
+def test_Load_Index__No_Dataset(score, max_score):
+    """Function load_index: directory without a dataset."""
+    max_score.value += 1
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            try:
+                Dataset.load_index(directory)
+                assert False
+            except ValueError:
+                pass
+            with open(os.path.join(directory, Dataset.INDEX_FILE_NAME), "w") as file:
+                file.write('{"format": "other"}')
+            try:
+                Dataset.load_index(directory)
+                assert False
+            except ValueError:
+                pass
+        score.value += 1
+    except:
+        pass
+
+
+# tests for get_sample_size
+
+def test_Get_Sample_Size__Fields(score, max_score):
+    """Function get_sample_size: sum of the sizes of the fields."""
+    max_score.value += 1
+    try:
+        sizes = {"<u4": 4, "<u2": 2, "u1": 1, "<i2": 2, "<i4": 4}
+        for dimension in (1, 5, 10):
+            assert Dataset.get_sample_size(dimension) == \
+                   sum([sizes[field_type] * nb_elements
+                        for (name, field_type, nb_elements) in Dataset.get_sample_fields(dimension)])
+        assert Dataset.get_sample_size(10) == 4 + 4 + 3 * 13 + 2 + 2 + 2 + 4 + 4 + 2 + 2 + 2 + 4
+        score.value += 1
+    except:
+        pass
+
+
+dataset_test_functions = \
+    {
+        test_Export_Dataset__Replayed_Samples,
+        test_Export_Dataset__Processes,
+        test_Export_Dataset__Labels_With_Lookahead,
+
+        test_Load_Index__No_Dataset,
+
+        test_Get_Sample_Size__Fields,
+    }
@@ -0,0 +1,229 @@
+import Board
+import PersistentBoard
+import Position
+
+# Features of a board used to evaluate how promising it is:
+# - "empty_cells": the number of free cells.
+# - "holes": the number of free cells whose adjacent cells (see
+#   Position.get_adjacent_positions) are all filled.
+# - "near_complete_lines": the number of rows and columns with at least one and
+#   at most NEAR_COMPLETE_FREE_CELLS free cells.
+# - "bumpiness": the sum of the absolute differences between the heights of
+#   neighbouring columns, the height of a column being the highest row in which
+#   it has a filled cell (0 for an empty column).
+# - "largest_free_square": the size of the largest square of free cells.
+# Features of a board are tracked by an observer of the board (see
+# Board.add_observer), that updates them after each change of the board at a cost
+# proportional to the number of changed cells. Only the largest free square is
+# recomputed when it is asked for after a change that may have affected it,
+# with a number of operations on the filled mask proportional to its size.
+
+FEATURES = ("empty_cells", "holes", "near_complete_lines", "bumpiness", "largest_free_square")
+
+NEAR_COMPLETE_FREE_CELLS = 2
+
+# Weights of the default evaluator: more free space is better, holes, bumps and
+# lines that are close to being complete without being cleared are worse.
+DEFAULT_WEIGHTS = \
+    {"empty_cells": 1.0, "holes": -4.0, "near_complete_lines": 2.0, "bumpiness": -0.5,
+     "largest_free_square": 3.0}
+
+
+def compute_features(board):
+    """
+        Return a dict mapping each feature in FEATURES onto its value for the
+        given board, computed from scratch.
+        ASSUMPTIONS
+        - The given board is a proper board, or a persistent board.
+    """
+    board_dimension = Board.dimension(board)
+    filled_mask = Board.get_filled_mask(board)
+    all_positions = [(column, row) for column in range(1, board_dimension + 1)
+                     for row in range(1, board_dimension + 1)]
+    (row_masks, column_masks) = Board.get_line_masks(board_dimension)
+    heights = [_get_height(filled_mask, board_dimension, column) for column in range(1, board_dimension + 1)]
+    return {"empty_cells": board_dimension * board_dimension - bin(filled_mask).count("1"),
+            "holes": len([position for position in all_positions if _is_hole(board, position)]),
+            "near_complete_lines":
+                len([line_mask for line_mask in row_masks[1:] + column_masks[1:]
+                     if _is_near_complete(board_dimension - bin(filled_mask & line_mask).count("1"))]),
+            "bumpiness": sum([abs(heights[index] - heights[index + 1]) for index in range(board_dimension - 1)]),
+            "largest_free_square": _get_largest_free_square(filled_mask, board_dimension)[0]}
+
+
+def track_features(board):
+    """
+        Let the features of the given board be tracked incrementally from now on,
+        and return the observer that tracks them.
+        - The observer of the board is returned if its features are already tracked.
+        - Copies of the board (see Board.copy_board) keep tracking their features.
+        ASSUMPTIONS
+        - The given board is a proper board.
+    """
+    for observer in Board.get_observers(board):
+        if observer.get("kind") == "features":
+            return observer
+    board_dimension = Board.dimension(board)
+    filled_mask = Board.get_filled_mask(board)
+    (row_masks, column_masks) = Board.get_line_masks(board_dimension)
+    features = compute_features(board)
+    observer = \
+        {"kind": "features", "changed": _cells_changed, "copy": _copy_observer,
+         "features": features,
+         "holes": {(column, row) for column in range(1, board_dimension + 1)
+                   for row in range(1, board_dimension + 1) if _is_hole(board, (column, row))},
+         "row_counts": [0] + [bin(filled_mask & row_mask).count("1") for row_mask in row_masks[1:]],
+         "column_counts": [0] + [bin(filled_mask & column_mask).count("1") for column_mask in column_masks[1:]],
+         "heights": [0] + [_get_height(filled_mask, board_dimension, column)
+                           for column in range(1, board_dimension + 1)],
+         "square": _get_largest_free_square(filled_mask, board_dimension)}
+    Board.add_observer(board, observer)
+    return observer
+
+
+def get_features(board):
+    """
+        Return a dict mapping each feature in FEATURES onto its value for the
+        given board.
+        - The features of the given board are tracked from now on (see
+          track_features), unless it is a persistent board.
+        ASSUMPTIONS
+        - The given board is a proper board, or a persistent board.
+    """
+    if PersistentBoard.is_persistent_board(board):
+        return compute_features(board)
+    observer = track_features(board)
+    if observer["square"] is None:
+        observer["square"] = _get_largest_free_square(Board.get_filled_mask(board), Board.dimension(board))
+        observer["features"]["largest_free_square"] = observer["square"][0]
+    return dict(observer["features"])
+
+
+def evaluate(board, weights=DEFAULT_WEIGHTS):
+    """
+        Return the weighted sum of the features of the given board, using the
+        given dict of weights per feature.
+        - Features without a weight are ignored.
+        ASSUMPTIONS
+        - The given board is a proper board, or a persistent board.
+        - The given weights map names of features in FEATURES onto numbers.
+    """
+    features = get_features(board)
+    return sum([weight * features[feature] for (feature, weight) in weights.items()])
+
+
+def make_evaluator(weights=DEFAULT_WEIGHTS):
+    """
+        Return a function that evaluates a board with the given weights (see
+        evaluate).
+        ASSUMPTIONS
+        - The given weights map names of features in FEATURES onto numbers.
+    """
+    weights = dict(weights)
+    return lambda board: evaluate(board, weights)
+
+
+def _cells_changed(board, observer, positions):
+    """
+        Update the features tracked by the given observer after the state of
+        the cells at the given positions of the given board has changed.
+    """
+    board_dimension = Board.dimension(board)
+    features = observer["features"]
+    changed_columns = set()
+    only_filled = True
+    for position in positions:
+        (column, row) = position
+        change = 1 if Board.is_filled_at(board, position) else -1
+        only_filled = only_filled and change == 1
+        features["empty_cells"] -= change
+        for (counts, line) in ((observer["row_counts"], row), (observer["column_counts"], column)):
+            features["near_complete_lines"] -= _is_near_complete(board_dimension - counts[line])
+            counts[line] += change
+            features["near_complete_lines"] += _is_near_complete(board_dimension - counts[line])
+        changed_columns.add(column)
+
+    # Holes can only appear or disappear at changed cells and their neighbours.
+    holes = observer["holes"]
+    for position in positions:
+        for other_position in Position.get_adjacent_positions(position, board_dimension) | {position}:
+            if _is_hole(board, other_position):
+                holes.add(other_position)
+            else:
+                holes.discard(other_position)
+    features["holes"] = len(holes)
+
+    heights = observer["heights"]
+    changed_pairs = {(column + offset - 1, column + offset) for column in changed_columns for offset in (0, 1)
+                     if 1 < column + offset <= board_dimension}
+    features["bumpiness"] -= sum([abs(heights[left] - heights[right]) for (left, right) in changed_pairs])
+    filled_mask = Board.get_filled_mask(board)
+    for column in changed_columns:
+        heights[column] = _get_height(filled_mask, board_dimension, column)
+    features["bumpiness"] += sum([abs(heights[left] - heights[right]) for (left, right) in changed_pairs])
+
+    # Filling cells outside the largest free square cannot change its size.
+    square = observer["square"]
+    if square is not None and (not only_filled or square[1] & Board.get_mask_of_positions(board_dimension, positions)):
+        observer["square"] = None
+
+
+def _copy_observer(observer):
+    """
+        Return a copy of the given observer, for a copy of the board it observes.
+    """
+    return {"kind": "features", "changed": _cells_changed, "copy": _copy_observer,
+            "features": dict(observer["features"]), "holes": set(observer["holes"]),
+            "row_counts": list(observer["row_counts"]), "column_counts": list(observer["column_counts"]),
+            "heights": list(observer["heights"]), "square": observer["square"]}
+
+
+def _is_hole(board, position):
+    """
+        Check whether the cell at the given position on the given board is a hole.
+    """
+    return not Board.is_filled_at(board, position) and \
+        all([Board.is_filled_at(board, other_position)
+             for other_position in Position.get_adjacent_positions(position, Board.dimension(board))])
+
+
+def _is_near_complete(nb_free_cells):
+    """
+        Check whether a line with the given number of free cells is near complete.
+    """
+    return 0 < nb_free_cells <= NEAR_COMPLETE_FREE_CELLS
+
+
+def _get_height(filled_mask, board_dimension, column):
+    """
+        Return the height of the given column on a board with the given dimension
+        and filled mask.
+    """
+    return ((filled_mask >> ((column - 1) * board_dimension)) & ((1 << board_dimension) - 1)).bit_length()
+
+
+def _get_largest_free_square(filled_mask, board_dimension):
+    """
+        Return a tuple consisting of the size of the largest square of free cells
+        on a board with the given dimension and filled mask, followed by the mask
+        of the cells of one such square (0 if there are no free cells).
+    """
+    (row_masks, column_masks) = Board.get_line_masks(board_dimension)
+    free_mask = filled_mask ^ ((1 << board_dimension * board_dimension) - 1)
+    # Bit C is set in corners if the square of the current size with its lower
+    # left corner at cell C is free. A square of the next size is free if the
+    # four squares of the current size in its corners are free.
+    corners = free_mask
+    size = 0
+    while corners != 0:
+        size += 1
+        previous_corners = corners
+        corners &= (corners >> 1) & (corners >> board_dimension) & (corners >> (board_dimension + 1))
+        corners &= sum(row_masks[1:board_dimension - size + 1]) & sum(column_masks[1:board_dimension - size + 1])
+    if size == 0:
+        return 0, 0
+    corner = previous_corners & -previous_corners
+    square_mask = 0
+    for column in range(size):
+        square_mask |= (((1 << size) - 1) * corner) << (column * board_dimension)
+    return size, square_mask
@@ -0,0 +1,79 @@
+import Block
+import Board
+import Evaluation
+import Game
+
+import random
+
+
+# tests for compute_features
+
+def test_Compute_Features__Single_Case(score, max_score):
+    """Function compute_features: single case."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(4, {(1, 2), (2, 1), (1, 3), (2, 3), (2, 2), (3, 2), (4, 4), (4, 3), (4, 2)})
+        assert Evaluation.compute_features(the_board) == \
+               {"empty_cells": 7, "holes": 1, "near_complete_lines": 4, "bumpiness": 3, "largest_free_square": 1}
+        assert Evaluation.compute_features(Board.make_board(5, {(3, 3)}))["largest_free_square"] == 2
+        assert Evaluation.compute_features(Board.make_board(3))["largest_free_square"] == 3
+        score.value += 4
+    except:
+        pass
+
+
+# tests for track_features and get_features
+
+def test_Get_Features__Incremental_Updates(score, max_score):
+    """Function get_features: features stay up to date with moves, clears, copies and transactions."""
+    max_score.value += 8
+    try:
+        generator = random.Random(43)
+        for case in range(40):
+            dimension = generator.randint(2, 7)
+            all_positions = [(column, row) for column in range(1, dimension + 1) for row in range(1, dimension + 1)]
+            the_board = Board.make_board(dimension, generator.sample(all_positions, generator.randint(0, dimension * 2)))
+            Evaluation.track_features(the_board)
+            for step in range(12):
+                block = generator.choice(Block.standard_blocks)
+                droppable_positions = Board.get_droppable_positions(the_board, block)
+                if len(droppable_positions) > 0:
+                    Game.game_move(the_board, block, generator.choice(droppable_positions))
+                Board.free_cell(the_board, generator.choice(all_positions))
+                if step % 4 == 0:
+                    the_board = Board.copy_board(the_board)
+                with Board.transaction(the_board):
+                    Board.fill_cell(the_board, generator.choice(all_positions))
+                    assert Evaluation.get_features(the_board) == Evaluation.compute_features(the_board)
+                assert Evaluation.get_features(the_board) == Evaluation.compute_features(the_board)
+            assert len(Board.get_observers(the_board)) == 1
+        score.value += 8
+    except:
+        pass
+
+
+# tests for evaluate and make_evaluator
+
+def test_Evaluate__Weighted_Sum(score, max_score):
+    """Functions evaluate and make_evaluator: weighted sum of features."""
+    max_score.value += 3
+    try:
+        the_board = Board.make_board(4, {(1, 2), (2, 1), (1, 3), (2, 3), (2, 2), (3, 2), (4, 4), (4, 3), (4, 2)})
+        weights = {"empty_cells": 2, "holes": -10, "bumpiness": 1}
+        assert Evaluation.evaluate(the_board, weights) == 14 - 10 + 3
+        assert Evaluation.make_evaluator(weights)(the_board) == 14 - 10 + 3
+        assert Evaluation.evaluate(Board.make_board(3)) == 9 * 1.0 + 3 * 3.0
+        assert Board.is_proper_board(the_board)
+        score.value += 3
+    except:
+        pass
+
+
+evaluation_test_functions = \
+    {
+        test_Compute_Features__Single_Case,
+
+        test_Get_Features__Incremental_Updates,
+
+        test_Evaluate__Weighted_Sum,
+    }
@@ -1,8 +1,96 @@
 import Position
 import Block
 import Board
+import PersistentBoard
+import MoveOrder
 import random
+import heapq
 import itertools
+
+# Pairs of a function consulted by the solvers before searching, and a function
+# to which they pass the results of their searches (see add_solution_lookup),
+# in the order in which they are consulted.
+_solution_hooks = []
+
+
+def add_solution_lookup(lookup, store=None):
+    """
+        Let the solvers in this module (highest_score, highest_score_pruned,
+        highest_score_ordered and play_greedy through them) consult the given
+        lookup function before searching, and pass the result of each search
+        to the given store function.
+        - The lookup function takes a board and a sequence of blocks, and returns
+          the result of highest_score for them, or None if it does not know it
+          (see for instance the modules OpeningBook and SolveCache).
+        - The store function takes a board, a sequence of blocks and the result
+          of highest_score for them. It is also called for the sub-problems solved
+          by highest_score.
+        - Lookup functions are consulted in the order in which they were added,
+          until one of them knows the result. That result is then passed to the
+          store functions added with the lookup functions that did not know it.
+        - If the given store function is None, results are not passed on to it.
+        ASSUMPTIONS
+        - The given lookup function is a function as described above, and the
+          given store function is None or a function as described above.
+    """
+    _solution_hooks.append((lookup, store))
+
+
+def remove_solution_lookup(lookup):
+    """
+        Stop the solvers in this module from consulting the given lookup
+        function, and from passing results to the store function added with it.
+        - Nothing happens if the given lookup function has not been added.
+        ASSUMPTIONS
+        - None
+    """
+    _solution_hooks[:] = [hook for hook in _solution_hooks if hook[0] is not lookup]
+
+
+def set_solution_lookup(lookup, store=None):
+    """
+        Let the solvers in this module consult the given lookup function and pass
+        their results to the given store function, instead of all the functions
+        added before (see add_solution_lookup).
+        - If the given lookup function is None, solvers always search and their
+          results are not passed on.
+        ASSUMPTIONS
+        - The given lookup and store functions are None or functions as
+          described for add_solution_lookup.
+    """
+    del _solution_hooks[:]
+    if lookup is not None:
+        add_solution_lookup(lookup, store)
+
+
+def _look_up_solution(board, blocks, start):
+    """
+        Return the result of highest_score for the given board and the blocks of
+        the given sequence from the given start index on, as known by the first
+        solution lookup function that knows it, or None if it is unknown.
+    """
+    for (index, (lookup, store)) in enumerate(_solution_hooks):
+        result = lookup(board, blocks[start:])
+        if result is not None:
+            for (other_lookup, other_store) in _solution_hooks[:index]:
+                if other_store is not None:
+                    other_store(board, blocks[start:], result)
+            return result
+    return None
+
+
+def _store_solution(board, blocks, start, result):
+    """
+        Pass the given result of highest_score for the given board and the blocks
+        of the given sequence from the given start index on, to the solution
+        store functions, and return that result.
+    """
+    for (lookup, store) in _solution_hooks:
+        if store is not None:
+            store(board, blocks[start:], result)
+    return result
+
+
 def highest_score(board, blocks, start=0):
     """
         Return the highest possible score that can be obtained by dropping
@@ -35,23 +123,28 @@ def highest_score(board, blocks, start=0):
     if start == len(blocks):
         return 0, []
 
+    known_result = _look_up_solution(board, blocks, start)
+    if known_result is not None:
+        return known_result
+
     droppable_positions = Board.get_droppable_positions(board, blocks[start])
 
     max_score = 0
     max_result = None, None
 
-    for droppable_position in droppable_positions:
-        # use a copy board
-        board_try = Board.copy_board(board)
+    # Moves on a persistent board result in new boards sharing all unchanged
+    # columns, so the given board is never changed and never copied as a whole.
+    persistent_board = PersistentBoard.make_from_board(board)
 
-        # Get the score of droppable position
-        score = game_move(board_try, blocks[start], droppable_position)
+    for droppable_position in droppable_positions:
+        # Get the board and the score of droppable position
+        (board_try, score) = PersistentBoard.game_move(persistent_board, blocks[start], droppable_position)
 
         # recursion step until base case
         result = highest_score(board_try, blocks, start+1)
 
         # add result to previous result if not None
-        if result is not (None, None):
+        if result[0] is not None:
             result = (result[0] + score, [droppable_position] + result[1])
 
         # if score of result is greater than max_score, change max_score
@@ -59,7 +152,295 @@ def highest_score(board, blocks, start=0):
             max_score = result[0]
             max_result = result
 
-    return max_result
+    return _store_solution(board, blocks, start, max_result)
+
+
+def highest_score_pruned(board, blocks, start=0):
+    """
+        Return the same result as highest_score for the given board, sequence of
+        blocks and start index, by a breadth-first search that keeps, after each
+        block, the frontier of all distinct boards that can be reached together
+        with the best way to reach them, and prunes dominated boards.
+        - Boards are represented by their filled masks (see Board.get_filled_mask),
+          so the given board is never changed nor copied.
+        - Boards reached in several ways are only kept once, with the highest score
+          (and the smallest positions for equal scores).
+        - A board B is dominated by a board A, if the filled cells of A are a subset
+          of the filled cells of B, if A is reached with a better result than B,
+          and if no row or column on B can be completed by the remaining blocks.
+          Each continuation of B can then be played on A with the same score,
+          because neither board will ever clear a line, so B can be discarded
+          without affecting the result.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+        - The given start index is not negative and not beyond the length of
+          the sequence of blocks.
+    """
+    known_result = _look_up_solution(board, blocks, start)
+    if known_result is not None:
+        return known_result
+
+    board_dimension = Board.dimension(board)
+    (row_masks, column_masks) = Board.get_line_masks(board_dimension)
+    # A frontier maps the filled mask of each board onto a tuple with the score
+    # and the positions with which it is reached best.
+    frontier = {Board.get_filled_mask(board): (0, ())}
+
+    for index in range(start, len(blocks)):
+        next_frontier = dict()
+        for (filled_mask, (score, positions)) in frontier.items():
+            for (position, next_mask, move_score, block_mask) in \
+                    _get_mask_moves(board, filled_mask, blocks[index], row_masks, column_masks):
+                result = (score + move_score, positions + (position,))
+                if next_mask not in next_frontier or _is_better_result(result, next_frontier[next_mask]):
+                    next_frontier[next_mask] = result
+        if index == len(blocks) - 1:
+            frontier = next_frontier
+            break
+
+        # Maximum number of cells the remaining blocks can fill in a single row
+        # or in a single column.
+        remaining_blocks = blocks[index + 1:]
+        row_capacity = sum([_get_largest_line_count(block, 1) for block in remaining_blocks])
+        column_capacity = sum([_get_largest_line_count(block, 0) for block in remaining_blocks])
+
+        candidates = sorted(next_frontier.items(), key=lambda item: (-item[1][0], item[1][1]))
+        frontier = dict()
+        dominating_masks = []
+        for (filled_mask, result) in candidates:
+            if _cannot_complete_lines(filled_mask, row_masks, row_capacity, board_dimension) and \
+                    _cannot_complete_lines(filled_mask, column_masks, column_capacity, board_dimension) and \
+                    _is_dominated(filled_mask, dominating_masks):
+                continue
+            frontier[filled_mask] = result
+            if len(dominating_masks) < _MAX_DOMINATING_BOARDS:
+                dominating_masks.append(filled_mask)
+
+    if len(frontier) == 0:
+        return _store_solution(board, blocks, start, (None, None))
+    best_result = None
+    for result in frontier.values():
+        if best_result is None or _is_better_result(result, best_result):
+            best_result = result
+    return _store_solution(board, blocks, start, (best_result[0], list(best_result[1])))
+
+
+def highest_score_ordered(board, blocks, start=0, move_order=MoveOrder.order_moves):
+    """
+        Return the same result as highest_score for the given board, sequence of
+        blocks and start index, by a depth-first search that tries the moves for
+        each block in the given move order (see the module MoveOrder), and skips
+        all branches that cannot improve the best result found so far.
+        - The score of the moves for the remaining blocks is bounded by the number
+          of dots of each block, together with the score for completing all rows
+          and columns crossed by it. Branches are skipped if even that bound cannot
+          reach the best score found so far, or can only reach it with positions
+          that are not smaller than the positions of the best result.
+        - Because only branches that cannot improve the result are skipped, the
+          move order only affects the time it takes to find the result.
+        - Boards are represented by their filled masks (see Board.get_filled_mask),
+          so the given board is never changed nor copied.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+        - The given start index is not negative, but may be beyond the last element
+          in the sequence of blocks.
+        - The given move order is a move order as defined in the module MoveOrder.
+    """
+    known_result = _look_up_solution(board, blocks, start)
+    if known_result is not None:
+        return known_result
+
+    board_dimension = Board.dimension(board)
+    search = \
+        {"board": board, "blocks": blocks, "move_order": move_order,
+         "bounds": _get_score_bounds(blocks, start, board_dimension),
+         "line_masks": Board.get_line_masks(board_dimension),
+         "state": MoveOrder.make_search_state(board_dimension),
+         "best_score": None, "best_positions": None}
+    _search_ordered(search, Board.get_filled_mask(board), start, 0, ())
+    if search["best_score"] is None:
+        return _store_solution(board, blocks, start, (None, None))
+    return _store_solution(board, blocks, start, (search["best_score"], list(search["best_positions"])))
+
+
+def highest_scores(board, blocks, start=0):
+    """
+        Generate all possible ways to drop all the blocks in the given sequence
+        of blocks starting from the given start index on the given board, in
+        descending order of their score.
+        - Each solution is generated as a tuple consisting of its score followed
+          by a list of all positions at which the successive blocks are dropped,
+          so the first solution is the result of highest_score.
+        - Solutions with the same score are generated in ascending order of
+          their positions.
+        - Solutions are computed lazily by a best-first search, which always
+          extends the partial solution with the highest bound on its final score
+          (see highest_score_ordered). A solution is only generated once no partial
+          solution can still lead to a better one, so taking the first K solutions
+          does not compute the solutions after them.
+        - Boards are represented by their filled masks (see Board.get_filled_mask),
+          so the given board is never changed nor copied.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+        - The given start index is not negative, but may be beyond the last element
+          in the sequence of blocks.
+    """
+    board_dimension = Board.dimension(board)
+    (row_masks, column_masks) = Board.get_line_masks(board_dimension)
+    bounds = _get_score_bounds(blocks, start, board_dimension)
+    # Entries are ordered by descending bound and by ascending positions. For
+    # complete solutions, the bound is the score itself. A partial solution is
+    # ordered before each solution it can be extended to, because its bound is
+    # not smaller and its positions are a prefix of the positions of the solution.
+    queue = [(-bounds[start], (), 0, Board.get_filled_mask(board))]
+    while len(queue) > 0:
+        (negated_bound, positions, score, filled_mask) = heapq.heappop(queue)
+        index = start + len(positions)
+        if index >= len(blocks):
+            yield score, list(positions)
+            continue
+        for (position, next_mask, move_score, block_mask) in \
+                _get_mask_moves(board, filled_mask, blocks[index], row_masks, column_masks):
+            next_score = score + move_score
+            heapq.heappush(queue, (-(next_score + bounds[index + 1]), positions + (position,), next_score, next_mask))
+
+
+def _get_score_bounds(blocks, start, board_dimension):
+    """
+        Return a dict mapping each index from the given start index up to the
+        length of the given sequence of blocks onto an upper bound for the score
+        of dropping all blocks from that index on.
+    """
+    bounds = {max(start, len(blocks)): 0}
+    for index in range(len(blocks) - 1, start - 1, -1):
+        horizontal_offsets = Block.get_horizontal_offsets_from_anchor(blocks[index])
+        vertical_offsets = Block.get_vertical_offsets_from_anchor(blocks[index])
+        nb_lines = min(horizontal_offsets[1] - horizontal_offsets[0] + 1, board_dimension) + \
+            min(vertical_offsets[1] - vertical_offsets[0] + 1, board_dimension)
+        bounds[index] = bounds[index + 1] + len(Block.get_all_dot_positions(blocks[index])) + \
+            10 * ((nb_lines + 1) * nb_lines) // 2
+    return bounds
+
+
+def _search_ordered(search, filled_mask, index, score, positions):
+    """
+        Search all ways to drop the blocks of the given search from the given
+        index on the board with the given filled mask, reached with the given
+        score by dropping the previous blocks at the given positions.
+    """
+    if search["best_score"] is not None:
+        bound = score + search["bounds"][index]
+        if bound < search["best_score"] or \
+                (bound == search["best_score"] and positions > search["best_positions"][:len(positions)]):
+            return
+    if index >= len(search["blocks"]):
+        if search["best_score"] is not None and \
+                not _is_better_result((score, positions), (search["best_score"], search["best_positions"])):
+            return
+        depth = 0
+        for position in positions:
+            MoveOrder.record_improvement(search["state"], depth, position, len(positions) - depth)
+            depth += 1
+        search["best_score"] = score
+        search["best_positions"] = positions
+        return
+
+    (row_masks, column_masks) = search["line_masks"]
+    moves = _get_mask_moves(search["board"], filled_mask, search["blocks"][index], row_masks, column_masks)
+    state = search["state"]
+    state["filled_mask"] = filled_mask
+    state["depth"] = len(positions)
+    for (position, next_mask, move_score, block_mask) in search["move_order"](moves, state):
+        _search_ordered(search, next_mask, index + 1, score + move_score, positions + (position,))
+
+
+def _get_mask_moves(board, filled_mask, block, row_masks, column_masks):
+    """
+        Return a list of tuples consisting of a position at which the given block
+        can be dropped on the given board with its filled cells replaced by the
+        given filled mask, followed by the filled mask after that move, the score
+        obtained from it (see game_move) and the mask of the cells covered by the
+        block (see the module MoveOrder).
+        - The positions are listed in ascending order.
+    """
+    droppable_mask = Board.get_droppable_mask(board, block, filled_mask)
+    if droppable_mask == 0:
+        return []
+    board_dimension = Board.dimension(board)
+    horizontal_offsets = Block.get_horizontal_offsets_from_anchor(block)
+    vertical_offsets = Block.get_vertical_offsets_from_anchor(block)
+    corner_mask = Board.get_block_mask(board_dimension, block,
+                                       (1 - horizontal_offsets[0], 1 - vertical_offsets[0]))
+    nb_dots = len(Block.get_all_dot_positions(block))
+
+    moves = []
+    for corner in Board.get_positions_in_mask(board_dimension, droppable_mask):
+        cell_index = (corner[0] - 1) * board_dimension + corner[1] - 1
+        block_mask = corner_mask << cell_index
+        next_mask = filled_mask | block_mask
+        full_mask = 0
+        nb_filled_seqs = 0
+        for line_mask in row_masks[1:] + column_masks[1:]:
+            if next_mask & line_mask == line_mask:
+                full_mask |= line_mask
+                nb_filled_seqs += 1
+        moves.append(((corner[0] - horizontal_offsets[0], corner[1] - vertical_offsets[0]),
+                      next_mask & ~full_mask,
+                      nb_dots + 10 * ((nb_filled_seqs + 1) * nb_filled_seqs) // 2,
+                      block_mask))
+    return moves
+
+
+def _is_better_result(result, other_result):
+    """
+        Check whether the given result (a tuple starting with a score followed by
+        positions) is better than the other result: a higher score, or the same
+        score reached with smaller positions.
+    """
+    return result[0] > other_result[0] or (result[0] == other_result[0] and result[1] < other_result[1])
+
+
+def _get_largest_line_count(block, coordinate):
+    """
+        Return the largest number of dots of the given block that share the same
+        value for the given coordinate (1 for rows, 0 for columns).
+    """
+    counts = dict()
+    for dot in block:
+        counts[dot[coordinate]] = counts.get(dot[coordinate], 0) + 1
+    return max(counts.values())
+
+
+def _cannot_complete_lines(filled_mask, line_masks, capacity, board_dimension):
+    """
+        Check whether each of the lines with the given masks has more free cells
+        than the given capacity.
+    """
+    for line_mask in line_masks[1:]:
+        if board_dimension - bin(filled_mask & line_mask).count("1") <= capacity:
+            return False
+    return True
+
+
+# Maximum number of boards in a frontier against which other boards are checked
+# for dominance. Only the boards reached with the best results are used, which
+# keeps the check linear in the size of the frontier.
+_MAX_DOMINATING_BOARDS = 64
+
+
+def _is_dominated(filled_mask, dominating_masks):
+    """
+        Check whether a board with the given filled mask is dominated by one of
+        the boards with the given masks, which all have been reached with better
+        results.
+    """
+    for other_mask in dominating_masks:
+        if other_mask & ~filled_mask == 0:
+            return True
+    return False
 
 
 def turn_in_triplets(blocks):
@@ -67,8 +448,9 @@ def turn_in_triplets(blocks):
     triplet_list = []
     if len(blocks) <= 3:
         return [blocks]
-    for i in range(2,len(blocks)+1,3):
-        triplet = blocks[i-2:i+1]
+    # The last triplet holds the remaining 1 or 2 blocks, if any.
+    for i in range(0,len(blocks),3):
+        triplet = blocks[i:i+3]
         triplet_list.append(triplet)
     return triplet_list
 
@@ -79,30 +461,41 @@ def turn_in_lists(permutations):
         permutations_list.append(list(permutation))
     return permutations_list
 
-def play_greedy(board, blocks):
-    """
-        Drop the given sequence of blocks in the order from left to right on
-        the given board in a greedy way.
-        - The function will take blocks in triplets (groups of 3) in the order from
-          left tot right, and drop them on the given board in the best possible way
-          (i.e yielding the highest possible score) not taking into account blocks
-          that still need to be dropped further on.
-        - If the number of blocks is not a multiple of 3, the function will take the
-          remaining blocks (1 or 2) in the last step.
-        - The function will search for the best possible positions to drop each
-          of the 3 blocks in succession. If several positions yield the same highest
-          score, the function will give preference to positions closest to the bottom
-          left corner.
+def play_greedy(board, blocks, group_size=3, lookahead=0):
+    """
+        Drop the given sequence of blocks on the given board in a greedy way, in
+        groups of the given size, looking ahead at the given number of blocks.
+        - The blocks are taken in groups of the given size in the order from left
+          to right. The last group has fewer blocks if the number of blocks is not
+          a multiple of the group size.
+        - For each group, the function searches the window consisting of the
+          blocks of the group, in each of their possible orders, followed by the
+          given number of blocks after the group. Only the blocks of the group are
+          dropped, in the order and at the positions of the window with the
+          highest score (see highest_score), before moving on to the next group.
+          If several orders yield the same highest score, the first of them in
+          the order of itertools.permutations is taken.
+        - The window never reaches beyond the last block of the sequence. If the
+          blocks of the group can be dropped but the blocks following it cannot,
+          the window shrinks by one block at a time until a solution is found.
         - If a solution is possible, the function returns the total score obtained
           from dropping all the blocks.
-        - If no solution is possible, the function returns None. All the blocks that
-          could be dropped are effectively dropped on the given board.
+        - If the blocks of a group cannot be dropped, the function returns None.
+          The blocks of the groups before it remain dropped on the given board.
+        - With the default group size of 3 and no lookahead, each group is
+          searched with highest_score. Otherwise the search is pruned (see
+          highest_score_ordered), and the same window is never searched twice
+          on the same board.
         ASSUMPTIONS
         - The given board is a proper board.
-        - The number of blocks in the given sequence of blocks is a multiple of 3.
+        - The given sequence of blocks is a list of proper blocks, of any length.
+        - The given group size is a positive integer number, and the given lookahead
+          is a non-negative integer number.
     """
     if len(blocks) == 0:
         return 0
+    if group_size != 3 or lookahead != 0:
+        return _play_greedy_with_lookahead(board, blocks, group_size, lookahead)
 
     triplets = turn_in_triplets(blocks)
     # print("triplets = ",triplets)
@@ -147,6 +540,76 @@ def play_greedy(board, blocks):
     return final_max_result
 
 
+def get_greedy_moves(board, blocks, group_size=3, lookahead=0):
+    """
+        Return the moves that play_greedy makes for the first group of the given
+        sequence of blocks on the given board, with the given group size and
+        lookahead.
+        - If the blocks of the first group can be dropped, the function returns a
+          tuple consisting of the highest score for those blocks in the chosen
+          order followed by the blocks looked ahead at (see highest_score),
+          followed by a list of tuples consisting of the index of a block of the
+          group in the given sequence and the position at which it is dropped, in
+          the order in which the blocks are dropped.
+        - If the blocks of the first group cannot be dropped, the function returns
+          None.
+        - The given board is not changed.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given sequence of blocks is a non-empty list of proper blocks.
+        - The given group size is a positive integer number, and the given lookahead
+          is a non-negative integer number.
+    """
+    return _get_greedy_group_moves(board, blocks, 0, group_size, lookahead, dict())
+
+
+def _play_greedy_with_lookahead(board, blocks, group_size, lookahead):
+    """
+        Drop the given sequence of blocks on the given board in groups of the given
+        size, looking ahead at the given number of blocks (see play_greedy).
+        - The sequence of blocks may have any length: the last group takes the
+          remaining blocks, and groups near the end look ahead at the blocks that
+          are left.
+    """
+    total_score = 0
+    # Results of searches, keyed by the filled mask of the board and the blocks.
+    searched = dict()
+    for group_start in range(0, len(blocks), group_size):
+        group_moves = _get_greedy_group_moves(board, blocks, group_start, group_size, lookahead, searched)
+        if group_moves is None:
+            return None
+        for (index, position) in group_moves[1]:
+            total_score += game_move(board, blocks[index], position)
+    return total_score
+
+
+def _get_greedy_group_moves(board, blocks, group_start, group_size, lookahead, searched):
+    """
+        Return the moves for the group of the given size starting at the given
+        index in the given sequence of blocks, as for get_greedy_moves, using and
+        extending the given dict of results of searches.
+    """
+    group_indices = range(group_start, min(group_start + group_size, len(blocks)))
+    best_order = None
+    best_result = None, None
+    window_size = min(lookahead, len(blocks) - group_indices.stop)
+    while best_order is None and window_size >= 0:
+        following_blocks = list(blocks[group_indices.stop:group_indices.stop + window_size])
+        for group_order in itertools.permutations(group_indices):
+            searched_blocks = [blocks[index] for index in group_order] + following_blocks
+            key = (Board.get_filled_mask(board), tuple(frozenset(block) for block in searched_blocks))
+            if key not in searched:
+                searched[key] = highest_score_ordered(board, searched_blocks)
+            result = searched[key]
+            if result[0] is not None and (best_result[0] is None or result[0] > best_result[0]):
+                best_order = group_order
+                best_result = result
+        window_size -= 1
+    if best_order is None:
+        return None
+    return best_result[0], list(zip(best_order, best_result[1]))
+
+
 def game_move(board, block, position):
     """
         Drop the given block at the given position on the given board, and
@@ -169,6 +632,54 @@ def game_move(board, block, position):
         10 * ((nb_filled_seqs + 1) * nb_filled_seqs) // 2
 
 
+def play_headless(board, evaluator, seed=None, max_moves=None, blocks=Block.standard_blocks, recorder=None):
+    """
+        Play a game without any interaction on the given board, and return a dict
+        with the number of moves played (key "moves") and the score obtained
+        (key "score").
+        - In each move, a block is drawn from the given collection of blocks by a
+          random generator seeded with the given seed, and dropped at the position
+          for which the score of the move (see game_move) increased with the value
+          of the given evaluator for the resulting board is highest. For equal
+          values, the smallest position is taken.
+        - The game ends as soon as the drawn block cannot be dropped, or after the
+          given maximum number of moves (if not None).
+        - Given the same seed, the same blocks are drawn, so different evaluators
+          can be compared on the same games.
+        - If a recorder is given, it is called before each move with the board,
+          the block, the position at which it is dropped and the score of the move.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given evaluator is a function that takes a board and returns a number.
+        - The given collection of blocks is not empty and contains proper blocks.
+        - The given recorder, if any, does not change the board.
+    """
+    generator = random.Random(seed)
+    blocks = tuple(blocks)
+    nb_moves = 0
+    total_score = 0
+    while max_moves is None or nb_moves < max_moves:
+        block = generator.choice(blocks)
+        best_position = None
+        best_value = None
+        best_move_score = None
+        for position in Board.get_droppable_positions(board, block):
+            with Board.transaction(board):
+                move_score = game_move(board, block, position)
+                value = move_score + evaluator(board)
+            if best_value is None or value > best_value:
+                best_position = position
+                best_value = value
+                best_move_score = move_score
+        if best_position is None:
+            break
+        if recorder is not None:
+            recorder(board, block, best_position, best_move_score)
+        total_score += game_move(board, block, best_position)
+        nb_moves += 1
+    return {"moves": nb_moves, "score": total_score}
+
+
 def play_game():
     """
         Play the game.
@@ -184,7 +695,7 @@ def play_game():
     Board.print_board(the_board)
     print()
 
-    while len(Board.get_droppable_positions(the_board, current_block)) > 0:
+    while Board.is_fitting_block(the_board, current_block):
 
         position = input("Enter the position to drop the block: ")
         if position == "":
@@ -0,0 +1,252 @@
+import Block
+import Board
+import Game
+
+import mmap
+import os
+import struct
+
+# A game record describes a game played from an empty board: a dict with keys
+# "dimension" (the dimension of the board), "seed" (the seed of the random
+# generator that drew the blocks), "source" (the source of the blocks, one of
+# SOURCES), "moves" (a list with for each move a tuple consisting of the index of
+# the block in its source and the position at which it was dropped) and "score"
+# (the score claimed for the game).
+# In a file, game records follow a header (see _HEADER). Each record consists of
+# the dimension, the seed and the source, followed by a value per move and the
+# score, all encoded as unsigned numbers of 7 bits per byte (LEB128). The value
+# of a move is 1 plus the index of the block times D*D plus the index of the bit
+# (see Board.get_filled_mask) of the lower left corner of the bounding box of the
+# block, D being the dimension of the board. That corner is always on the board,
+# whereas the anchor of the block need not be. A value 0 ends the moves. On a
+# board of dimension 10, each move of a standard block takes 2 bytes.
+# Records are written and read one at a time, so files of any size are streamed
+# in constant memory.
+
+_MAGIC = b"1010GAME"
+_VERSION = 1
+# Magic bytes and version.
+_HEADER = struct.Struct("<8sH")
+
+# Sources of blocks, keyed by their identifier in game records.
+SOURCES = {0: Block.standard_blocks}
+STANDARD_SOURCE = 0
+
+# Offsets from the anchor of each block to the lower left corner of its bounding
+# box, keyed by the identifier of the source of the blocks.
+_corner_offsets = dict()
+
+
+def make_record(dimension=10, seed=0, source=STANDARD_SOURCE):
+    """
+        Return a new game record without moves for a game on a board of the given
+        dimension, with blocks from the given source drawn with the given seed.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+        - The given seed is a non-negative integer number.
+        - The given source is a key of SOURCES.
+    """
+    return {"dimension": dimension, "seed": seed, "source": source, "moves": [], "score": 0}
+
+
+def record_move(record, block, position, move_score):
+    """
+        Add the move dropping the given block at the given position, with the
+        given score, to the given game record.
+        - The function has the signature of a recorder of Game.play_headless, once
+          the record is bound to it.
+        ASSUMPTIONS
+        - The given record is a game record.
+        - The given block is a block of the source of the record, and can be
+          dropped at the given position on the board of the record.
+    """
+    record["moves"].append((SOURCES[record["source"]].index(block), position))
+    record["score"] += move_score
+
+
+def record_headless_game(dimension, evaluator, seed=0, max_moves=None):
+    """
+        Play a game without interaction with the given evaluator and seed on an
+        empty board of the given dimension (see Game.play_headless), and return
+        its game record.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+        - The given evaluator is a function that takes a board and returns a number.
+        - The given seed is a non-negative integer number.
+    """
+    record = make_record(dimension, seed)
+    Game.play_headless(Board.make_board(dimension), evaluator, seed, max_moves, SOURCES[STANDARD_SOURCE],
+                       lambda board, block, position, move_score: record_move(record, block, position, move_score))
+    return record
+
+
+def encode_record(record):
+    """
+        Return the bytes of the given game record, without the header of a file.
+        - A ValueError is raised if the record cannot be encoded: if its dimension
+          is not positive, its seed or score is negative, or its source is not in
+          SOURCES, or if one of its moves refers to a block that is not in its
+          source or puts the lower left corner of the bounding box of the block
+          outside the board.
+        ASSUMPTIONS
+        - The given record is a dict with the keys of a game record, whose
+          dimension, seed, source and score are integer numbers.
+    """
+    board_dimension = record["dimension"]
+    if board_dimension <= 0 or record["seed"] < 0 or record["score"] < 0 or record["source"] not in SOURCES:
+        raise ValueError("game record for an empty board, with a negative seed or score, or an unknown source")
+    corner_offsets = _get_corner_offsets(record["source"])
+    data = bytearray()
+    for value in (board_dimension, record["seed"], record["source"]):
+        _append_number(data, value)
+    for (move, (block_index, position)) in enumerate(record["moves"]):
+        if not 0 <= block_index < len(corner_offsets):
+            raise ValueError("move {} with an unknown block".format(move))
+        (column, row) = (position[0] + corner_offsets[block_index][0], position[1] + corner_offsets[block_index][1])
+        if not (0 < column <= board_dimension and 0 < row <= board_dimension):
+            raise ValueError("move {} outside the board".format(move))
+        _append_number(data, 1 + block_index * board_dimension * board_dimension +
+                       (column - 1) * board_dimension + row - 1)
+    data.append(0)
+    _append_number(data, record["score"])
+    return bytes(data)
+
+
+def decode_records(data, offset=0):
+    """
+        Return an iterator over the game records in the given bytes, starting at
+        the given offset, without the header of a file.
+        - A ValueError is raised if the bytes do not hold complete game records,
+          or refer to unknown sources or blocks.
+        ASSUMPTIONS
+        - The given bytes are any object supporting the buffer protocol.
+    """
+    # Releasing the view at once lets a mapped file be closed, even if decoding fails.
+    with memoryview(data).cast("B") as data:
+        while offset < len(data):
+            (board_dimension, offset) = _read_number(data, offset)
+            (seed, offset) = _read_number(data, offset)
+            (source, offset) = _read_number(data, offset)
+            if board_dimension == 0 or source not in SOURCES:
+                raise ValueError("game record for an empty board or an unknown source")
+            corner_offsets = _get_corner_offsets(source)
+            nb_cells = board_dimension * board_dimension
+            moves = []
+            (value, offset) = _read_number(data, offset)
+            while value != 0:
+                (block_index, cell_index) = divmod(value - 1, nb_cells)
+                if block_index >= len(corner_offsets):
+                    raise ValueError("game record with an unknown block")
+                (column_offset, row_offset) = corner_offsets[block_index]
+                moves.append((block_index, (cell_index // board_dimension + 1 - column_offset,
+                                            cell_index % board_dimension + 1 - row_offset)))
+                (value, offset) = _read_number(data, offset)
+            (score, offset) = _read_number(data, offset)
+            yield {"dimension": board_dimension, "seed": seed, "source": source, "moves": moves, "score": score}
+
+
+def write_records(path, records, append=False):
+    """
+        Write the given game records to the file at the given path, and return
+        the number of records written.
+        - The records are written one at a time, so the given records can be
+          produced while they are written.
+        - If append is set, the records are added to the records already in the
+          file, if any. Otherwise the file is replaced.
+        - A ValueError is raised for a record that cannot be encoded (see
+          encode_record). The records before it are written.
+        ASSUMPTIONS
+        - The given records are an iterable of game records.
+        - The given path is a path at which a file can be written, and it holds
+          game records if records are appended to it.
+    """
+    nb_records = 0
+    with open(path, "ab" if append else "wb") as file:
+        if file.tell() == 0:
+            file.write(_HEADER.pack(_MAGIC, _VERSION))
+        for record in records:
+            file.write(encode_record(record))
+            nb_records += 1
+    return nb_records
+
+
+def read_records(path):
+    """
+        Return an iterator over the game records in the file at the given path.
+        - The file is mapped into memory, so only the record being read is kept.
+        - A ValueError is raised if the file does not hold game records in the
+          format of this module.
+        ASSUMPTIONS
+        - The given path is a path at which a file can be read.
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size < _HEADER.size:
+            raise ValueError("not a file of game records")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            (magic, version) = _HEADER.unpack_from(data, 0)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError("not a file of game records of version {}".format(_VERSION))
+            yield from decode_records(data, _HEADER.size)
+
+
+def replay_record(record):
+    """
+        Replay the given game record from an empty board with Game.game_move, and
+        return the resulting board.
+        - A ValueError is raised if one of the moves cannot be made (see
+          Board.can_be_dropped_at), or if the sum of the scores of the moves
+          differs from the score of the record.
+        ASSUMPTIONS
+        - The given record is a game record.
+    """
+    board = Board.make_board(record["dimension"])
+    blocks = SOURCES[record["source"]]
+    score = 0
+    for (move, (block_index, position)) in enumerate(record["moves"]):
+        if not Board.can_be_dropped_at(board, blocks[block_index], position):
+            raise ValueError("move {} cannot be made".format(move))
+        score += Game.game_move(board, blocks[block_index], position)
+    if score != record["score"]:
+        raise ValueError("score {} instead of {}".format(score, record["score"]))
+    return board
+
+
+def _get_corner_offsets(source):
+    """
+        Return a list with for each block of the given source the offsets from
+        its anchor to the lower left corner of its bounding box.
+    """
+    if source not in _corner_offsets:
+        _corner_offsets[source] = [(min([dot[0] for dot in block]), min([dot[1] for dot in block]))
+                                   for block in SOURCES[source]]
+    return _corner_offsets[source]
+
+
+def _append_number(data, number):
+    """
+        Append the given non-negative integer number to the given bytearray, in
+        7 bits per byte.
+    """
+    while number >= 0x80:
+        data.append(number & 0x7F | 0x80)
+        number >>= 7
+    data.append(number)
+
+
+def _read_number(data, offset):
+    """
+        Return a tuple consisting of the non-negative integer number encoded in 7
+        bits per byte at the given offset in the given bytes, followed by the
+        offset after it.
+    """
+    number = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("game record ends in the middle of a number")
+        byte = data[offset]
+        offset += 1
+        number |= (byte & 0x7F) << shift
+        if byte & 0x80 == 0:
+            return number, offset
+        shift += 7
@@ -0,0 +1,153 @@
+import Block
+import Board
+import Evaluation
+import GameRecord
+
+import os
+import tempfile
+
+
+# tests for record_headless_game
+
+def test_Record_Headless_Game__Replayed_Game(score, max_score):
+    """Function record_headless_game: recorded games replay to the same score."""
+    max_score.value += 3
+    try:
+        record = GameRecord.record_headless_game(8, Evaluation.evaluate, 12, 30)
+        assert record["dimension"] == 8 and record["seed"] == 12 and record["source"] == GameRecord.STANDARD_SOURCE
+        assert 0 < len(record["moves"]) <= 30 and record["score"] > 0
+        assert Board.is_proper_board(GameRecord.replay_record(record))
+        score.value += 3
+    except:
+        pass
+
+
+# tests for encode_record and decode_records
+
+def test_Encode_Record__Round_Trip(score, max_score):
+    """Functions encode_record and decode_records: records survive their encoding."""
+    max_score.value += 3
+    try:
+        # The vertical line of length 5 has its anchor below the board if its lowest dot is in row 1.
+        vertical_index = [index for (index, block) in enumerate(Block.standard_blocks)
+                          if sorted(block) == [(0, -6), (0, -5), (0, -4), (0, -3), (0, -2)]][0]
+        record = {"dimension": 10, "seed": 3, "source": 0, "moves": [(0, (1, 1)), (vertical_index, (10, 7))],
+                  "score": 6}
+        data = GameRecord.encode_record(record)
+        assert len(data) == 3 + 1 + 2 + 1 + 1
+        assert data[3] == 1 and data[-2:] == bytes([0, 6])
+        assert list(GameRecord.decode_records(data)) == [record]
+        assert list(GameRecord.decode_records(b"")) == []
+        other_record = GameRecord.make_record(3, 300, 0)
+        assert list(GameRecord.decode_records(data + GameRecord.encode_record(other_record))) == [record, other_record]
+        score.value += 3
+    except:
+        pass
+
+
+def test_Encode_Record__Invalid_Records(score, max_score):
+    """Function encode_record: records that cannot be encoded."""
+    max_score.value += 2
+    try:
+        record = {"dimension": 3, "seed": 0, "source": 0, "moves": [(0, (1, 1)), (0, (3, 3))], "score": 2}
+        nb_blocks = len(GameRecord.SOURCES[GameRecord.STANDARD_SOURCE])
+        assert len(GameRecord.encode_record(record)) > 0
+        for invalid_record in (dict(record, dimension=0), dict(record, seed=-1), dict(record, score=-2),
+                               dict(record, source=99)):
+            try:
+                GameRecord.encode_record(invalid_record)
+                assert False
+            except ValueError:
+                pass
+        for invalid_move in ((-1, (2, 2)), (nb_blocks, (2, 2)), (0, (0, 2)), (0, (2, 4))):
+            try:
+                GameRecord.encode_record(dict(record, moves=[(0, (1, 1)), invalid_move]))
+                assert False
+            except ValueError as error:
+                assert str(error).startswith("move 1 ")
+        score.value += 2
+    except:
+        pass
+
+
+def test_Decode_Records__Invalid_Data(score, max_score):
+    """Function decode_records: invalid data."""
+    max_score.value += 2
+    try:
+        data = GameRecord.encode_record({"dimension": 2, "seed": 0, "source": 0, "moves": [(0, (1, 1))], "score": 1})
+        for invalid_data in (data[:-1], data[:-2], bytes([2, 0, 7, 0, 0]), bytes([0, 0, 0, 0, 0]),
+                             bytes([2, 0, 0, 0x80, 0x7F, 0, 0]), bytes([2, 0x80])):
+            try:
+                list(GameRecord.decode_records(invalid_data))
+                assert False
+            except ValueError:
+                pass
+        score.value += 2
+    except:
+        pass
+
+
+# tests for write_records and read_records
+
+def test_Write_Records__Streamed_File(score, max_score):
+    """Functions write_records and read_records: records are streamed to and from a file."""
+    max_score.value += 3
+    try:
+        records = [GameRecord.record_headless_game(6, Evaluation.evaluate, seed, 10) for seed in range(3)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games")
+            assert GameRecord.write_records(path, (record for record in records[:2])) == 2
+            assert GameRecord.write_records(path, records[2:], True) == 1
+            assert list(GameRecord.read_records(path)) == records
+            assert os.path.getsize(path) == 10 + sum([len(GameRecord.encode_record(record)) for record in records])
+            assert GameRecord.write_records(path, records[2:]) == 1
+            assert list(GameRecord.read_records(path)) == records[2:]
+            with open(path, "wb") as file:
+                file.write(b"1010BOOK\x01\x00")
+            try:
+                list(GameRecord.read_records(path))
+                assert False
+            except ValueError:
+                pass
+        score.value += 3
+    except:
+        pass
+
+
+# tests for replay_record
+
+def test_Replay_Record__Invalid_Games(score, max_score):
+    """Function replay_record: illegal moves and wrong scores."""
+    max_score.value += 3
+    try:
+        record = {"dimension": 3, "seed": 0, "source": 0,
+                  "moves": [(0, (2, 1)), (0, (3, 1)), (0, (1, 2)), (0, (1, 3))], "score": 4}
+        assert Board.get_all_filled_positions(GameRecord.replay_record(record)) == {(2, 1), (3, 1), (1, 2), (1, 3)}
+        for (moves, claimed_score) in (([(0, (1, 1)), (0, (1, 1))], 2), ([(0, (1, 1)), (0, (4, 1))], 2),
+                                       ([(0, (1, 1))], 2)):
+            try:
+                GameRecord.replay_record(dict(record, moves=moves, score=claimed_score))
+                assert False
+            except ValueError:
+                pass
+        # Completing a row and a column at once.
+        record["moves"].append((0, (1, 1)))
+        record["score"] = 4 + 1 + 10 * 3
+        assert Board.get_all_filled_positions(GameRecord.replay_record(record)) == set()
+        score.value += 3
+    except:
+        pass
+
+
+game_record_test_functions = \
+    {
+        test_Record_Headless_Game__Replayed_Game,
+
+        test_Encode_Record__Round_Trip,
+        test_Encode_Record__Invalid_Records,
+        test_Decode_Records__Invalid_Data,
+
+        test_Write_Records__Streamed_File,
+
+        test_Replay_Record__Invalid_Games,
+    }
@@ -1,6 +1,9 @@
 import Block
 import Board
 import Game
+import MoveOrder
+
+import random
 
 
 # tests for highest_score
@@ -245,6 +248,135 @@ def test_highest_score__Larger_Sequence_Blocks(score, max_score):
         pass
 
 
+# tests for highest_score_pruned
+
+def test_highest_score_pruned__Larger_Sequence_Blocks(score, max_score):
+    """Function highest_score_pruned: larger sequence of blocks."""
+    max_score.value += 10
+    try:
+        positions_to_fill = \
+            {(1, 4), (2, 1), (3, 2), (3, 4), (3, 6), (4, 2), (5, 1), (5, 3), (5, 4), (5, 6), (6, 3), (6, 5)}
+        the_board = Board.make_board(6, positions_to_fill)
+        blocks = \
+            [Block.make_block({(-3, 0), (-2, 0), (-1, 0), (0, 0)}),
+             Block.make_block({(0, 2), (1, 2), (2, 2), (3, 2), (4, 2)}),
+             Block.make_block({(-2, 2), (-2, 3), (-2, 4), (-2, 5)}),
+             Block.make_block({(0, 0), (0, 1), (1, 0)}),
+             Block.make_block({(0, 0), (1, 0), (0, 1), (1, 1)}),
+             Block.make_block({(0, 0), (1, 0), (2, 0)}),
+             Block.make_block({(0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (1, 2)}),
+             Block.make_block({(0, 0), (1, 0), (2, 0)}),
+             Block.make_block({(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (1, 2), (2, 2)}),
+             Block.make_block({(0, 0)})]
+        assert Game.highest_score_pruned(the_board, blocks) == \
+               (132, [(4, 3), (1, 3), (8, 1), (5, 2), (1, 2), (1, 5), (3, 1), (3, 5), (2, 4), (1, 6)])
+        assert Game.highest_score_pruned(the_board, blocks, 10) == (0, [])
+        assert Board.get_all_filled_positions(the_board) == positions_to_fill
+        score.value += 10
+    except:
+        pass
+
+
+def test_highest_score_pruned__Same_As_Highest_Score(score, max_score):
+    """Function highest_score_pruned: same result as highest_score on random cases."""
+    max_score.value += 8
+    try:
+        generator = random.Random(35)
+        for case in range(60):
+            dimension = generator.randint(3, 6)
+            all_positions = [(column, row) for column in range(1, dimension + 1) for row in range(1, dimension + 1)]
+            the_board = Board.make_board(dimension, generator.sample(all_positions, generator.randint(0, dimension * 2)))
+            blocks = [generator.choice(Block.standard_blocks) for index in range(generator.randint(0, 3))]
+            assert Game.highest_score_pruned(the_board, blocks) == Game.highest_score(the_board, blocks)
+        score.value += 8
+    except:
+        pass
+
+
+# tests for highest_score_ordered
+
+def test_highest_score_ordered__Same_As_Highest_Score(score, max_score):
+    """Function highest_score_ordered: same result as highest_score for several move orders."""
+    max_score.value += 8
+    try:
+        generator = random.Random(36)
+        move_orders = (MoveOrder.order_moves, MoveOrder.order_by_position,
+                       MoveOrder.order_by_history, lambda moves, state: list(reversed(moves)))
+        for case in range(50):
+            dimension = generator.randint(3, 6)
+            all_positions = [(column, row) for column in range(1, dimension + 1) for row in range(1, dimension + 1)]
+            positions_to_fill = generator.sample(all_positions, generator.randint(0, dimension * 2))
+            the_board = Board.make_board(dimension, positions_to_fill)
+            blocks = [generator.choice(Block.standard_blocks) for index in range(generator.randint(0, 3))]
+            expected = Game.highest_score(the_board, blocks)
+            for move_order in move_orders:
+                assert Game.highest_score_ordered(the_board, blocks, 0, move_order) == expected
+            assert Board.get_all_filled_positions(the_board) == set(positions_to_fill)
+        score.value += 8
+    except:
+        pass
+
+
+# tests for highest_scores
+
+def get_all_solutions(board, blocks, start=0):
+    """Return all ways to drop the given blocks from the given start index on the given board."""
+    if start == len(blocks):
+        return [(0, [])]
+    solutions = []
+    for position in Board.get_droppable_positions(board, blocks[start]):
+        the_copy = Board.copy_board(board)
+        move_score = Game.game_move(the_copy, blocks[start], position)
+        solutions += [(move_score + score, [position] + positions)
+                      for (score, positions) in get_all_solutions(the_copy, blocks, start + 1)]
+    return solutions
+
+
+def test_highest_scores__All_Solutions(score, max_score):
+    """Function highest_scores: all solutions in descending order of score and ascending order of positions."""
+    max_score.value += 8
+    try:
+        generator = random.Random(37)
+        for case in range(40):
+            dimension = generator.randint(3, 5)
+            all_positions = [(column, row) for column in range(1, dimension + 1) for row in range(1, dimension + 1)]
+            positions_to_fill = generator.sample(all_positions, generator.randint(0, dimension * 2))
+            the_board = Board.make_board(dimension, positions_to_fill)
+            blocks = [generator.choice(Block.standard_blocks) for index in range(generator.randint(0, 3))]
+            assert list(Game.highest_scores(the_board, blocks)) == \
+                   sorted(get_all_solutions(the_board, blocks), key=lambda solution: (-solution[0], solution[1]))
+            assert Board.get_all_filled_positions(the_board) == set(positions_to_fill)
+        score.value += 8
+    except:
+        pass
+
+
+def test_highest_scores__Lazy_Top_Solutions(score, max_score):
+    """Function highest_scores: first solutions of a long sequence of blocks."""
+    max_score.value += 6
+    try:
+        positions_to_fill = \
+            {(1, 4), (2, 1), (3, 2), (3, 4), (3, 6), (4, 2), (5, 1), (5, 3), (5, 4), (5, 6), (6, 3), (6, 5)}
+        the_board = Board.make_board(6, positions_to_fill)
+        blocks = \
+            [Block.make_block({(-3, 0), (-2, 0), (-1, 0), (0, 0)}),
+             Block.make_block({(0, 2), (1, 2), (2, 2), (3, 2), (4, 2)}),
+             Block.make_block({(-2, 2), (-2, 3), (-2, 4), (-2, 5)}),
+             Block.make_block({(0, 0), (0, 1), (1, 0)}),
+             Block.make_block({(0, 0), (1, 0), (0, 1), (1, 1)}),
+             Block.make_block({(0, 0), (1, 0), (2, 0)})]
+        solutions = Game.highest_scores(the_board, blocks)
+        top_solutions = [next(solutions) for index in range(3)]
+        assert top_solutions[0] == Game.highest_score(the_board, blocks)
+        assert [solution[0] for solution in top_solutions] == \
+               sorted([solution[0] for solution in top_solutions], reverse=True)
+        assert list(Game.highest_scores(the_board, [], 0)) == [(0, [])]
+        assert list(Game.highest_scores(Board.make_board(2), [Block.make_block({(0, 0), (1, 0), (2, 0)})])) == []
+        score.value += 6
+    except:
+        pass
+
+
 # tests for greedy_play
 
 def test_play_greedy__Empty_List(score, max_score):
@@ -335,6 +467,19 @@ def test_play_greedy__Octet_Of_Blocks(score, max_score):
         pass
 
 
+def test_play_greedy__Incomplete_Last_Triplet(score, max_score):
+    """Function play_greedy: number of blocks that is not a multiple of 3."""
+    max_score.value += 2
+    try:
+        the_board = Board.make_board(6)
+        the_block = Block.make_block({(0, 0)})
+        assert Game.play_greedy(the_board, [the_block] * 4) == 4
+        assert len(Board.get_all_filled_positions(the_board)) == 4
+        score.value += 2
+    except:
+        pass
+
+
 def test_play_greedy__No_Solution(score, max_score):
     """Function play_greedy: no solution."""
     max_score.value += 20
@@ -388,6 +533,101 @@ def test_play_greedy__Larger_Sequence_Blocks(score, max_score):
         pass
 
 
+def test_play_greedy__Single_Block_Groups(score, max_score):
+    """Function play_greedy: groups of a single block without lookahead."""
+    max_score.value += 6
+    try:
+        generator = random.Random(38)
+        for case in range(10):
+            blocks = [generator.choice(Block.standard_blocks) for index in range(6)]
+            the_board = Board.make_board(6)
+            expected_board = Board.make_board(6)
+            expected_score = 0
+            for block in blocks:
+                (block_score, positions) = Game.highest_score(expected_board, [block])
+                if block_score is None:
+                    expected_score = None
+                    break
+                expected_score += Game.game_move(expected_board, block, positions[0])
+            assert Game.play_greedy(the_board, blocks, 1, 0) == expected_score
+            assert Board.get_all_filled_positions(the_board) == Board.get_all_filled_positions(expected_board)
+        score.value += 6
+    except:
+        pass
+
+
+def test_play_greedy__Lookahead(score, max_score):
+    """Function play_greedy: groups with lookahead."""
+    max_score.value += 6
+    try:
+        generator = random.Random(39)
+        for case in range(6):
+            blocks = [generator.choice(Block.standard_blocks) for index in range(7)]
+            for (group_size, lookahead) in ((1, 2), (2, 1), (3, 2)):
+                the_board = Board.make_board(6)
+                total_score = Game.play_greedy(the_board, blocks, group_size, lookahead)
+                assert total_score is None or total_score >= sum([len(block) for block in blocks])
+        # The lookahead window shrinks if the following blocks cannot be dropped.
+        the_board = Board.make_board(3)
+        blocks = [Block.make_block({(0, 0)}),
+                  Block.make_block({(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (1, 2), (2, 2)})]
+        assert Game.play_greedy(the_board, blocks, 1, 1) is None
+        assert Board.get_all_filled_positions(the_board) == {(1, 1)}
+        score.value += 6
+    except:
+        pass
+
+
+# tests for get_greedy_moves
+
+def test_get_greedy_moves__Same_As_Play_Greedy(score, max_score):
+    """Function get_greedy_moves: moves of play_greedy for the first group."""
+    max_score.value += 4
+    try:
+        generator = random.Random(41)
+        for case in range(6):
+            blocks = [generator.choice(Block.standard_blocks) for index in range(5)]
+            for (group_size, lookahead) in ((1, 0), (2, 1), (3, 0)):
+                the_board = Board.make_board(5, {(1, 1), (3, 2)})
+                group_moves = Game.get_greedy_moves(the_board, blocks, group_size, lookahead)
+                assert Board.get_all_filled_positions(the_board) == {(1, 1), (3, 2)}
+                assert sorted([index for (index, position) in group_moves[1]]) == list(range(group_size))
+                other_board = Board.make_board(5, {(1, 1), (3, 2)})
+                Game.play_greedy(other_board, blocks[:group_size], group_size, 0)
+                for (index, position) in group_moves[1]:
+                    Game.game_move(the_board, blocks[index], position)
+                if lookahead == 0:
+                    assert Board.get_all_filled_positions(the_board) == Board.get_all_filled_positions(other_board)
+        the_board = Board.make_board(2)
+        assert Game.get_greedy_moves(the_board, [Block.standard_blocks[0], Block.make_block({(0, 0), (1, 0), (2, 0)})], 2) is None
+        assert Game.get_greedy_moves(the_board, [Block.standard_blocks[0]], 1, 2) == (1, [(0, (1, 1))])
+        score.value += 4
+    except:
+        pass
+
+
+# tests for play_headless
+
+def test_play_headless__Seeded_Games(score, max_score):
+    """Function play_headless: seeded games."""
+    max_score.value += 4
+    try:
+        evaluator = lambda board: -len(Board.get_all_filled_positions(board))
+        result = Game.play_headless(Board.make_board(6), evaluator, 7, 20)
+        assert result == Game.play_headless(Board.make_board(6), evaluator, 7, 20)
+        assert 0 < result["moves"] <= 20 and result["score"] >= result["moves"]
+        # Each move completes a row.
+        the_board = Board.make_board(2)
+        assert Game.play_headless(the_board, evaluator, 1, 3, [Block.make_block({(0, 0), (1, 0)})]) == \
+               {"moves": 3, "score": 3 * (2 + 10)}
+        assert Board.get_all_filled_positions(the_board) == set()
+        result = Game.play_headless(the_board, evaluator, 1, None, [Block.make_block({(0, 0), (1, 0), (2, 0)})])
+        assert result == {"moves": 0, "score": 0}
+        score.value += 4
+    except:
+        pass
+
+
 game_test_functions = \
     {
         test_highest_score__Empty_List,
@@ -404,11 +644,26 @@ game_test_functions = \
         test_highest_score__Several_Blocks_No_Solution,
         test_highest_score__Larger_Sequence_Blocks,
 
+        test_highest_score_pruned__Larger_Sequence_Blocks,
+        test_highest_score_pruned__Same_As_Highest_Score,
+
+        test_highest_score_ordered__Same_As_Highest_Score,
+
+        test_highest_scores__All_Solutions,
+        test_highest_scores__Lazy_Top_Solutions,
+
         test_play_greedy__Empty_List,
         test_play_greedy__Single_Block,
         test_play_greedy__Pair_Of_Blocks,
         test_play_greedy__Triplet_Of_Blocks,
         test_play_greedy__Octet_Of_Blocks,
+        test_play_greedy__Incomplete_Last_Triplet,
         test_play_greedy__No_Solution,
         test_play_greedy__Larger_Sequence_Blocks,
+        test_play_greedy__Single_Block_Groups,
+        test_play_greedy__Lookahead,
+
+        test_get_greedy_moves__Same_As_Play_Greedy,
+
+        test_play_headless__Seeded_Games,
     }
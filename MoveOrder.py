@@ -0,0 +1,146 @@
+import Board
+
+# Move orders decide in which order a search tries the moves for a block, so
+# that strong moves are found early and bounds can prune the remaining ones.
+# A move is a tuple consisting of the position at which the block is dropped,
+# followed by the filled mask of the board after the move, the score of the
+# move and the mask of the cells covered by the block (see Board.get_filled_mask).
+# A move order is a function that takes a list of moves and a search state,
+# and returns a list with the same moves in the order in which they must be
+# tried. A search state is a dict with keys:
+# - "dim": the dimension of the board.
+# - "filled_mask": the filled mask of the board before the move.
+# - "depth": the number of blocks dropped so far in the search.
+# - "history": a dict mapping tuples of a depth and a position onto the weight
+#   of the improvements found by dropping a block at that position at that depth.
+# - "killers": a dict mapping each depth onto the position of the last move at
+#   that depth that improved the best result of the search.
+# The order in which moves are tried never affects the result of a search,
+# only the time it takes to find it.
+
+
+def make_search_state(board_dimension):
+    """
+        Return a new search state for a board of the given dimension, without
+        any history.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+    """
+    return {"dim": board_dimension, "filled_mask": 0, "depth": 0, "history": dict(), "killers": dict()}
+
+
+def record_improvement(state, depth, position, weight=1):
+    """
+        Record in the given search state that dropping a block at the given
+        position at the given depth has improved the best result of the search.
+        - The given weight is added to the history of that move, and the move
+          becomes the killer move at that depth.
+        ASSUMPTIONS
+        - The given state is a search state.
+    """
+    key = (depth, position)
+    state["history"][key] = state["history"].get(key, 0) + weight
+    state["killers"][depth] = position
+
+
+def get_nb_completed_lines(state, move):
+    """
+        Return the number of rows and columns completed by the given move in the
+        given search state.
+        ASSUMPTIONS
+        - The given state is a search state, and the given move is a move in it.
+    """
+    # The score of a move completing N lines is the number of dots of its block
+    # increased with 10*(N+1)*N/2 (see Game.game_move).
+    bonus = move[2] - bin(move[3]).count("1")
+    nb_completed_lines = 0
+    while 10 * ((nb_completed_lines + 1) * nb_completed_lines) // 2 < bonus:
+        nb_completed_lines += 1
+    return nb_completed_lines
+
+
+def get_nb_contacts(state, move):
+    """
+        Return the number of filled cells that are horizontally or vertically
+        adjacent to the cells covered by the block of the given move, before that
+        move in the given search state.
+        ASSUMPTIONS
+        - The given state is a search state, and the given move is a move in it.
+    """
+    board_dimension = state["dim"]
+    block_mask = move[3]
+    (row_masks, column_masks) = Board.get_line_masks(board_dimension)
+    # Shifting by one bit moves cells up or down within their column; cells
+    # that would wrap around to the neighbouring column are removed.
+    neighbours_mask = \
+        ((block_mask << 1) & ~row_masks[1]) | \
+        ((block_mask >> 1) & ~row_masks[board_dimension]) | \
+        (block_mask << board_dimension) | \
+        (block_mask >> board_dimension)
+    return bin(neighbours_mask & state["filled_mask"] & ~block_mask).count("1")
+
+
+def order_by_position(moves, state):
+    """
+        Return the given moves in ascending order of their positions.
+        ASSUMPTIONS
+        - The given state is a search state, and the given moves are moves in it.
+    """
+    return sorted(moves, key=lambda move: move[0])
+
+
+def order_by_completed_lines(moves, state):
+    """
+        Return the given moves in descending order of the number of lines they
+        complete, and in ascending order of their positions for moves that
+        complete the same number of lines.
+        ASSUMPTIONS
+        - The given state is a search state, and the given moves are moves in it.
+    """
+    return sorted(moves, key=lambda move: (-get_nb_completed_lines(state, move), move[0]))
+
+
+def order_by_contacts(moves, state):
+    """
+        Return the given moves in descending order of the number of filled cells
+        they touch, and in ascending order of their positions for moves that touch
+        the same number of filled cells.
+        ASSUMPTIONS
+        - The given state is a search state, and the given moves are moves in it.
+    """
+    return sorted(moves, key=lambda move: (-get_nb_contacts(state, move), move[0]))
+
+
+def order_by_history(moves, state):
+    """
+        Return the given moves with the killer move at the current depth first,
+        followed by the other moves in descending order of their history at the
+        current depth, and in ascending order of their positions for moves with
+        the same history.
+        ASSUMPTIONS
+        - The given state is a search state, and the given moves are moves in it.
+    """
+    depth = state["depth"]
+    killer = state["killers"].get(depth)
+    history = state["history"]
+    return sorted(moves, key=lambda move: (move[0] != killer, -history.get((depth, move[0]), 0), move[0]))
+
+
+def order_moves(moves, state):
+    """
+        Return the given moves with the moves that complete most lines first,
+        then the moves that touch most filled cells, then the killer move and the
+        moves with the best history (see order_by_history), and finally the moves
+        in ascending order of their positions.
+        - This is the default move order of searches.
+        ASSUMPTIONS
+        - The given state is a search state, and the given moves are moves in it.
+    """
+    depth = state["depth"]
+    killer = state["killers"].get(depth)
+    history = state["history"]
+    return sorted(moves, key=lambda move: (-get_nb_completed_lines(state, move),
+                                           -get_nb_contacts(state, move),
+                                           move[0] != killer,
+                                           -history.get((depth, move[0]), 0),
+                                           move[0]))
@@ -0,0 +1,88 @@
+import Block
+import Board
+import MoveOrder
+
+
+def make_moves(board, block, state):
+    """Return all moves for the given block on the given board, in ascending order of their positions."""
+    board_dimension = Board.dimension(board)
+    moves = []
+    for position in Board.get_droppable_positions(board, block):
+        block_mask = Board.get_block_mask(board_dimension, block, position)
+        the_copy = Board.copy_board(board)
+        Board.drop_at(the_copy, block, position)
+        nb_lines = len(Board.get_all_filled_rows(the_copy)) + len(Board.get_all_filled_columns(the_copy))
+        Board.clear_full_rows_and_columns(the_copy)
+        moves.append((position, Board.get_filled_mask(the_copy),
+                      len(block) + 10 * ((nb_lines + 1) * nb_lines) // 2, block_mask))
+    state["filled_mask"] = Board.get_filled_mask(board)
+    return moves
+
+
+# tests for get_nb_completed_lines and get_nb_contacts
+
+def test_Move_Features__Single_Case(score, max_score):
+    """Functions get_nb_completed_lines and get_nb_contacts: single case."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(4, {(1, 1), (2, 1), (3, 1), (1, 2), (1, 3), (4, 4)})
+        state = MoveOrder.make_search_state(4)
+        moves = dict((move[0], move) for move in make_moves(the_board, Block.make_block({(0, 0)}), state))
+        assert MoveOrder.get_nb_completed_lines(state, moves[(4, 1)]) == 1
+        assert MoveOrder.get_nb_completed_lines(state, moves[(1, 4)]) == 1
+        assert MoveOrder.get_nb_completed_lines(state, moves[(3, 3)]) == 0
+        assert MoveOrder.get_nb_contacts(state, moves[(4, 1)]) == 1
+        assert MoveOrder.get_nb_contacts(state, moves[(2, 2)]) == 2
+        assert MoveOrder.get_nb_contacts(state, moves[(4, 3)]) == 1
+        assert MoveOrder.get_nb_contacts(state, moves[(1, 4)]) == 1
+        assert MoveOrder.get_nb_contacts(state, moves[(3, 3)]) == 0
+        score.value += 4
+    except:
+        pass
+
+
+# tests for move orders
+
+def test_Order_Moves__Line_Completing_First(score, max_score):
+    """Function order_moves: line-completing moves first, then moves touching most filled cells."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(4, {(1, 1), (2, 1), (3, 1), (1, 2), (1, 3), (4, 4)})
+        state = MoveOrder.make_search_state(4)
+        moves = make_moves(the_board, Block.make_block({(0, 0)}), state)
+        ordered_positions = [move[0] for move in MoveOrder.order_moves(moves, state)]
+        assert ordered_positions[:3] == [(1, 4), (4, 1), (2, 2)]
+        assert sorted(ordered_positions) == [move[0] for move in moves]
+        assert [move[0] for move in MoveOrder.order_by_position(list(reversed(moves)), state)] == \
+               [move[0] for move in moves]
+        score.value += 4
+    except:
+        pass
+
+
+def test_Order_By_History__Killer_And_History(score, max_score):
+    """Function order_by_history: killer move first, then moves with the best history."""
+    max_score.value += 3
+    try:
+        the_board = Board.make_board(3)
+        state = MoveOrder.make_search_state(3)
+        moves = make_moves(the_board, Block.make_block({(0, 0)}), state)
+        MoveOrder.record_improvement(state, 0, (2, 2), 5)
+        MoveOrder.record_improvement(state, 1, (3, 3), 9)
+        MoveOrder.record_improvement(state, 0, (3, 1), 2)
+        ordered_positions = [move[0] for move in MoveOrder.order_by_history(moves, state)]
+        assert ordered_positions[:3] == [(3, 1), (2, 2), (1, 1)]
+        state["depth"] = 1
+        assert MoveOrder.order_by_history(moves, state)[0][0] == (3, 3)
+        score.value += 3
+    except:
+        pass
+
+
+move_order_test_functions = \
+    {
+        test_Move_Features__Single_Case,
+
+        test_Order_Moves__Line_Completing_First,
+        test_Order_By_History__Killer_And_History,
+    }
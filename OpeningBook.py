@@ -0,0 +1,184 @@
+import Block
+import Board
+import Game
+
+import hashlib
+import itertools
+import struct
+
+# An opening book maps keys of early-game boards and sequences of standard
+# blocks onto the result of Game.highest_score for that board and sequence of
+# blocks: a tuple consisting of the highest score followed by a list of the
+# positions for the successive blocks, or the tuple (None,None).
+# A key is a hash of 8 bytes of the dimension of the board, its filled mask (see
+# Board.get_filled_mask) and the indices of the blocks in Block.standard_blocks.
+# The chance that two different boards and sequences of blocks in a book share
+# the same key is negligible.
+# In a file, an opening book starts with a header (see _HEADER), followed by its
+# entries in ascending order of their keys. Each entry consists of its key, the
+# number of blocks, the score (-1 for no solution) and the column and the row
+# of the successive positions, each stored in a single signed byte.
+
+_MAGIC = b"1010BOOK"
+_VERSION = 1
+# Magic bytes, version and number of entries.
+_HEADER = struct.Struct(">8sHI")
+# Key, number of blocks and score.
+_ENTRY = struct.Struct(">8sBi")
+
+# Indices of the standard blocks, keyed by their dot positions.
+_standard_indices = dict()
+
+# Lookup function of the installed opening book, if any (see Game.add_solution_lookup).
+_installed_lookup = None
+
+
+def get_key(board, blocks):
+    """
+        Return the key of the given board and sequence of blocks in an opening book.
+        - None is returned if one of the given blocks is not a standard block.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+    """
+    if len(_standard_indices) == 0:
+        for (index, standard_block) in enumerate(Block.standard_blocks):
+            _standard_indices.setdefault(frozenset(standard_block), index)
+    indices = []
+    for block in blocks:
+        index = _standard_indices.get(frozenset(block))
+        if index is None:
+            return None
+        indices.append(index)
+    board_dimension = Board.dimension(board)
+    filled_mask = Board.get_filled_mask(board)
+    data = struct.pack(">B", board_dimension) + \
+        filled_mask.to_bytes((board_dimension * board_dimension + 7) // 8, "big") + \
+        bytes(indices)
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+def build_opening_book(dimension=10, nb_moves=1, hand_size=1, blocks=Block.standard_blocks):
+    """
+        Return a new opening book with the results of Game.highest_score for all
+        boards that can be reached within the given number of moves from an empty
+        board of the given dimension, and all sequences of the given number of
+        blocks taken from the given collection of blocks.
+        - Boards are reached by dropping the given blocks with the semantics of
+          Game.game_move.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number not above 100.
+        - The given number of moves is a non-negative integer number, and the
+          given hand size is a positive integer number.
+        - The given collection of blocks contains standard blocks.
+    """
+    blocks = tuple(blocks)
+    boards = {0: Board.make_board(dimension)}
+    new_boards = dict(boards)
+    for move in range(nb_moves):
+        next_boards = dict()
+        for board in new_boards.values():
+            for block in blocks:
+                for position in Board.get_droppable_positions(board, block):
+                    next_board = Board.copy_board(board)
+                    Game.game_move(next_board, block, position)
+                    filled_mask = Board.get_filled_mask(next_board)
+                    if filled_mask not in boards and filled_mask not in next_boards:
+                        next_boards[filled_mask] = next_board
+        boards.update(next_boards)
+        new_boards = next_boards
+
+    book = dict()
+    for board in boards.values():
+        for hand in itertools.product(blocks, repeat=hand_size):
+            book[get_key(board, hand)] = Game.highest_score_ordered(board, list(hand))
+    return book
+
+
+def look_up(book, board, blocks):
+    """
+        Return the result of Game.highest_score for the given board and sequence
+        of blocks as stored in the given opening book.
+        - None is returned if the book has no entry for the board and blocks.
+        ASSUMPTIONS
+        - The given book is an opening book.
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+    """
+    key = get_key(board, blocks)
+    if key is None or key not in book:
+        return None
+    (score, positions) = book[key]
+    if score is None:
+        return None, None
+    return score, list(positions)
+
+
+def install_opening_book(book):
+    """
+        Let the solvers of the module Game consult the given opening book before
+        searching (see Game.add_solution_lookup).
+        - If the given book is None, solvers no longer consult a book.
+        - A book installed before is replaced. Solve caches and transposition
+          tables that are installed stay in use, and all of them are consulted
+          in the order in which they were installed.
+        ASSUMPTIONS
+        - The given book is an opening book or None.
+    """
+    global _installed_lookup
+    if _installed_lookup is not None:
+        Game.remove_solution_lookup(_installed_lookup)
+        _installed_lookup = None
+    if book is not None:
+        _installed_lookup = lambda board, blocks: look_up(book, board, blocks)
+        Game.add_solution_lookup(_installed_lookup)
+
+
+def save_opening_book(book, path):
+    """
+        Write the given opening book to the file at the given path.
+        ASSUMPTIONS
+        - The given book is an opening book.
+        - The given path is a path at which a file can be written.
+    """
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, len(book)))
+        for key in sorted(book):
+            (score, positions) = book[key]
+            positions = positions if positions is not None else []
+            file.write(_ENTRY.pack(key, len(positions), -1 if score is None else score))
+            file.write(struct.pack(">{}b".format(2 * len(positions)),
+                                   *[coordinate for position in positions for coordinate in position]))
+
+
+def load_opening_book(path):
+    """
+        Return the opening book stored in the file at the given path.
+        - A ValueError is raised if the file does not hold an opening book in
+          the format of this module.
+        ASSUMPTIONS
+        - The given path is a path at which a file can be read.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < _HEADER.size:
+        raise ValueError("not an opening book")
+    (magic, version, nb_entries) = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("not an opening book of version {}".format(_VERSION))
+
+    book = dict()
+    offset = _HEADER.size
+    for entry in range(nb_entries):
+        (key, nb_blocks, score) = _ENTRY.unpack_from(data, offset)
+        offset += _ENTRY.size
+        coordinates = struct.unpack_from(">{}b".format(2 * nb_blocks), data, offset)
+        offset += 2 * nb_blocks
+        if score < 0:
+            book[key] = (None, None)
+        else:
+            book[key] = (score, [(coordinates[index], coordinates[index + 1])
+                                 for index in range(0, len(coordinates), 2)])
+    if offset != len(data):
+        raise ValueError("opening book has trailing data")
+    return book
@@ -0,0 +1,88 @@
+import Block
+import Board
+import Game
+import OpeningBook
+
+import os
+import tempfile
+
+# Single dot, horizontal line of length 2 and square block 2x2.
+book_blocks = (Block.standard_blocks[0], Block.standard_blocks[1], Block.standard_blocks[17])
+
+
+# tests for build_opening_book and look_up
+
+def test_Build_Opening_Book__Same_As_Highest_Score(score, max_score):
+    """Function build_opening_book: same results as highest_score."""
+    max_score.value += 4
+    try:
+        book = OpeningBook.build_opening_book(3, 1, 2, book_blocks)
+        the_board = Board.make_board(3, {(1, 1), (2, 1)})
+        for first_block in book_blocks:
+            for second_block in book_blocks:
+                assert OpeningBook.look_up(book, the_board, [first_block, second_block]) == \
+                       Game.highest_score(the_board, [first_block, second_block])
+        assert OpeningBook.look_up(book, Board.make_board(3, {(1, 1), (3, 3)}), book_blocks[:2]) is None
+        assert OpeningBook.look_up(book, the_board, [Block.standard_blocks[2], book_blocks[0]]) is None
+        assert OpeningBook.look_up(book, the_board, [Block.make_block({(0, 0), (1, 1), (0, 1)})]) is None
+        score.value += 4
+    except:
+        pass
+
+
+# tests for save_opening_book and load_opening_book
+
+def test_Save_Load_Opening_Book__Round_Trip(score, max_score):
+    """Functions save_opening_book and load_opening_book: round trip."""
+    max_score.value += 4
+    try:
+        book = OpeningBook.build_opening_book(3, 1, 1, book_blocks)
+        assert (None, None) in book.values()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "book.bin")
+            OpeningBook.save_opening_book(book, path)
+            assert OpeningBook.load_opening_book(path) == book
+            with open(path, "r+b") as file:
+                file.write(b"NOTABOOK")
+            try:
+                OpeningBook.load_opening_book(path)
+                assert False
+            except ValueError:
+                pass
+        score.value += 4
+    except:
+        pass
+
+
+# tests for install_opening_book
+
+def test_Install_Opening_Book__Solvers_Consult_Book(score, max_score):
+    """Function install_opening_book: solvers consult the book before searching."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(3)
+        blocks = [book_blocks[0], book_blocks[1]]
+        # A fake entry proves that the book is consulted instead of searching.
+        book = {OpeningBook.get_key(the_board, blocks): (1000, [(3, 3), (1, 1)])}
+        OpeningBook.install_opening_book(book)
+        try:
+            assert Game.highest_score(the_board, blocks) == (1000, [(3, 3), (1, 1)])
+            assert Game.highest_score_pruned(the_board, blocks) == (1000, [(3, 3), (1, 1)])
+            assert Game.highest_score_ordered(the_board, blocks) == (1000, [(3, 3), (1, 1)])
+            assert Game.highest_score(the_board, [book_blocks[2]]) == (4, [(1, 1)])
+        finally:
+            OpeningBook.install_opening_book(None)
+        assert Game.highest_score(the_board, blocks) == (13, [(1, 1), (2, 1)])
+        score.value += 4
+    except:
+        pass
+
+
+opening_book_test_functions = \
+    {
+        test_Build_Opening_Book__Same_As_Highest_Score,
+
+        test_Save_Load_Opening_Book__Round_Trip,
+
+        test_Install_Opening_Book__Solvers_Consult_Book,
+    }
@@ -0,0 +1,278 @@
+import Block
+import Board
+
+import collections.abc
+
+# Persistent boards never change. Dropping a block or clearing lines results in
+# a new board that shares all unchanged columns with the board it came from, so
+# many sibling boards can be kept alive during a search at a cost proportional
+# to the number of columns that changed.
+# The columns of a persistent board are stored as masks (see Board.get_filled_mask)
+# in a persistent vector: a tree of tuples with at most _BRANCHING children
+# per node, whose leaves are the masks of the successive columns. Changing a
+# column only copies the nodes on the path from the root to its leaf.
+# Persistent boards can be passed to all the functions of the module Board that
+# do not change the board.
+
+_BRANCHING = 4
+
+
+class _PersistentBoard(collections.abc.Mapping):
+    """
+        A board that cannot be changed, with the same keys as the boards of the
+        module Board: "dim", "bits" and all the filled positions.
+    """
+
+    __slots__ = ("_dimension", "_depth", "_columns", "_cache")
+
+    def __init__(self, dimension, depth, columns):
+        self._dimension = dimension
+        self._depth = depth
+        self._columns = columns
+        # Data derived by the module Board (summed-area table, runs of free cells,
+        # buffer of cells).
+        self._cache = dict()
+
+    def __getitem__(self, key):
+        if key == "dim":
+            return self._dimension
+        if key == "bits":
+            return _get_filled_mask(self)
+        if key in self._cache:
+            return self._cache[key]
+        if type(key) == tuple and Board.inside_board(self, key) and \
+                _get_column(self, key[0]) & (1 << (key[1] - 1)) != 0:
+            return True
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in ("sat", "runs", "cells"):
+            raise TypeError("persistent boards cannot be changed")
+        self._cache[key] = value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+            return True
+        except (KeyError, TypeError):
+            return False
+
+    # As for the boards of the module Board, "bits" and the derived data are not
+    # items of the mapping, so equality and length only depend on the filled cells.
+    def __iter__(self):
+        yield "dim"
+        yield from Board.get_positions_in_mask(self._dimension, _get_filled_mask(self))
+
+    def __len__(self):
+        return 1 + bin(_get_filled_mask(self)).count("1")
+
+    def copy(self):
+        return self
+
+    def __repr__(self):
+        return "PersistentBoard({}, {})".format(self._dimension, sorted(Board.get_all_filled_positions(self)))
+
+
+def make_board(dimension=10, positions_to_fill=frozenset()):
+    """
+        Return a new persistent board of the given dimension for which all cells
+        at the given positions are filled.
+        - Positions outside the boundaries of the new board are ignored.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number.
+        - The filled positions is a collection of proper positions.
+    """
+    return make_from_board(Board.make_board(dimension, positions_to_fill))
+
+
+def make_from_board(board):
+    """
+        Return a new persistent board with the same dimension and filled cells as
+        the given board.
+        - The given board itself is returned if it is already a persistent board.
+        ASSUMPTIONS
+        - The given board is a proper board, or a persistent board.
+    """
+    if is_persistent_board(board):
+        return board
+    board_dimension = Board.dimension(board)
+    filled_mask = Board.get_filled_mask(board)
+    column_mask = (1 << board_dimension) - 1
+    depth = 1
+    while _BRANCHING ** depth < board_dimension:
+        depth += 1
+    columns = [(filled_mask >> (column * board_dimension)) & column_mask for column in range(0, board_dimension)]
+    return _PersistentBoard(board_dimension, depth, _make_vector(columns, depth))
+
+
+def to_board(persistent_board):
+    """
+        Return a new (changeable) board with the same dimension and filled cells
+        as the given persistent board.
+        ASSUMPTIONS
+        - The given board is a persistent board.
+    """
+    return Board.make_board(Board.dimension(persistent_board),
+                            Board.get_all_filled_positions(persistent_board))
+
+
+def is_persistent_board(board):
+    """
+        Check whether the given board is a persistent board.
+        ASSUMPTIONS
+        - None
+    """
+    return isinstance(board, _PersistentBoard)
+
+
+def drop_at(persistent_board, block, position):
+    """
+        Return the persistent board resulting from dropping the given block at
+        the given position on the given persistent board.
+        - The given persistent board itself is returned if the given block cannot
+          be dropped at the given position.
+        - The resulting board shares all the columns not covered by the block
+          with the given board.
+        ASSUMPTIONS
+        - The given board is a persistent board.
+        - The given block is a proper block.
+        - The given position is a proper position.
+    """
+    board_dimension = Board.dimension(persistent_board)
+    dots_per_column = dict()
+    for dot in block:
+        column = dot[0] + position[0]
+        row = dot[1] + position[1]
+        if not (0 < column <= board_dimension and 0 < row <= board_dimension):
+            return persistent_board
+        dots_per_column[column] = dots_per_column.get(column, 0) | (1 << (row - 1))
+
+    columns = persistent_board._columns
+    for (column, dots) in dots_per_column.items():
+        old_column = _get_column(persistent_board, column)
+        if old_column & dots != 0:
+            return persistent_board
+        columns = _set(columns, persistent_board._depth, column - 1, old_column | dots)
+    return _PersistentBoard(board_dimension, persistent_board._depth, columns)
+
+
+def get_all_filled_lines(persistent_board):
+    """
+        Return a tuple consisting of the mask of all the full rows, followed by
+        the list of all the full columns of the given persistent board.
+        - Bit R-1 of the mask of full rows is set if row R is completely filled.
+        ASSUMPTIONS
+        - The given board is a persistent board.
+    """
+    board_dimension = Board.dimension(persistent_board)
+    column_mask = (1 << board_dimension) - 1
+    full_rows = column_mask
+    full_columns = []
+    for (index, column) in enumerate(_get_values(persistent_board._columns, persistent_board._depth)):
+        if index < board_dimension:
+            full_rows &= column
+            if column == column_mask:
+                full_columns.append(index + 1)
+    return full_rows, full_columns
+
+
+def clear_full_rows_and_columns(persistent_board):
+    """
+        Return the persistent board resulting from clearing all full rows and all
+        full columns on the given persistent board.
+        - The given persistent board itself is returned if it has no full lines.
+        ASSUMPTIONS
+        - The given board is a persistent board.
+    """
+    (full_rows, full_columns) = get_all_filled_lines(persistent_board)
+    if full_rows == 0 and len(full_columns) == 0:
+        return persistent_board
+
+    depth = persistent_board._depth
+    columns = persistent_board._columns
+    # Only the columns whose mask changes are set, so all other nodes are shared.
+    for (index, column) in enumerate(_get_values(persistent_board._columns, depth)):
+        if index + 1 in full_columns:
+            cleared_column = 0
+        else:
+            cleared_column = column & ~full_rows
+        if cleared_column != column:
+            columns = _set(columns, depth, index, cleared_column)
+    return _PersistentBoard(Board.dimension(persistent_board), depth, columns)
+
+
+def game_move(persistent_board, block, position):
+    """
+        Return a tuple consisting of the persistent board resulting from dropping
+        the given block at the given position on the given persistent board and
+        clearing all full rows and columns after the drop, followed by the score
+        obtained from that move (see Game.game_move).
+        ASSUMPTIONS
+        - The given board is a persistent board.
+        - The given block is a proper block.
+        - The given position is a proper position.
+        - The given block can be dropped at the given position on the given board.
+    """
+    dropped_board = drop_at(persistent_board, block, position)
+    (full_rows, full_columns) = get_all_filled_lines(dropped_board)
+    nb_filled_seqs = bin(full_rows).count("1") + len(full_columns)
+    return clear_full_rows_and_columns(dropped_board), \
+        len(Block.get_all_dot_positions(block)) + 10 * ((nb_filled_seqs + 1) * nb_filled_seqs) // 2
+
+
+def _get_filled_mask(persistent_board):
+    """
+        Return the mask of all the filled cells of the given persistent board.
+    """
+    board_dimension = persistent_board._dimension
+    filled_mask = 0
+    for (index, column) in enumerate(_get_values(persistent_board._columns, persistent_board._depth)):
+        filled_mask |= column << (index * board_dimension)
+    return filled_mask
+
+
+def _get_column(persistent_board, column):
+    """
+        Return the mask of the given column of the given persistent board.
+    """
+    node = persistent_board._columns
+    for level in range(persistent_board._depth - 1, -1, -1):
+        node = node[((column - 1) // (_BRANCHING ** level)) % _BRANCHING]
+    return node
+
+
+def _make_vector(values, depth):
+    """
+        Return a new persistent vector of the given depth holding the given values,
+        padded with zeros.
+    """
+    nodes = list(values) + [0] * (_BRANCHING ** depth - len(values))
+    for level in range(depth):
+        nodes = [tuple(nodes[index:index + _BRANCHING]) for index in range(0, len(nodes), _BRANCHING)]
+    return nodes[0]
+
+
+def _set(vector, depth, index, value):
+    """
+        Return a new persistent vector that is a copy of the given vector of the
+        given depth, except for the value at the given index.
+        - The new vector shares all nodes that are not on the path to the index.
+    """
+    if depth == 0:
+        return value
+    child_size = _BRANCHING ** (depth - 1)
+    child_index = index // child_size
+    return vector[:child_index] + \
+        (_set(vector[child_index], depth - 1, index % child_size, value),) + \
+        vector[child_index + 1:]
+
+
+def _get_values(vector, depth):
+    """
+        Return a list of all the values of the given persistent vector of the
+        given depth, including the padding.
+    """
+    values = [vector]
+    for level in range(depth):
+        values = [value for node in values for value in node]
+    return values
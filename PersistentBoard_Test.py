@@ -0,0 +1,171 @@
+import Block
+import Board
+import Game
+import PersistentBoard
+
+import random
+
+
+# tests for make_from_board
+
+def test_Make_From_Board__Read_Functions(score, max_score):
+    """Function make_from_board: persistent boards work with the functions of Board that do not change boards."""
+    max_score.value += 4
+    try:
+        positions_to_fill = {(1, 4), (2, 1), (3, 2), (3, 4), (4, 1), (4, 2), (4, 3), (4, 4), (4, 5), (4, 6), (5, 3), (6, 5)}
+        the_board = Board.make_board(6, positions_to_fill)
+        persistent_board = PersistentBoard.make_from_board(the_board)
+        assert PersistentBoard.is_persistent_board(persistent_board)
+        assert not PersistentBoard.is_persistent_board(the_board)
+        assert Board.dimension(persistent_board) == 6
+        assert Board.get_all_filled_positions(persistent_board) == positions_to_fill
+        assert Board.is_filled_at(persistent_board, (4, 3))
+        assert not Board.is_filled_at(persistent_board, (5, 4))
+        assert not Board.is_filled_at(persistent_board, (7, 1))
+        assert Board.get_all_filled_columns(persistent_board) == (4,)
+        assert Board.get_filled_mask(persistent_board) == Board.get_filled_mask(the_board)
+        for block in Block.standard_blocks:
+            assert Board.get_droppable_positions(persistent_board, block) == \
+                   Board.get_droppable_positions(the_board, block)
+        assert Board.is_free_rectangle(persistent_board, (5, 1), (6, 2))
+        assert Board.get_free_runs_in_row(persistent_board, 5) == ((1, 3), (5, 1))
+        assert Board.copy_board(persistent_board) is persistent_board
+        assert Board.get_all_filled_positions(PersistentBoard.to_board(persistent_board)) == positions_to_fill
+        score.value += 4
+    except:
+        pass
+
+
+def test_Make_From_Board__Cannot_Be_Changed(score, max_score):
+    """Function make_from_board: persistent boards cannot be changed."""
+    max_score.value += 2
+    try:
+        persistent_board = PersistentBoard.make_board(3, {(1, 1)})
+        try:
+            Board.fill_cell(persistent_board, (2, 2))
+            assert False
+        except TypeError:
+            pass
+        assert Board.get_all_filled_positions(persistent_board) == {(1, 1)}
+        score.value += 2
+    except:
+        pass
+
+
+def test_Make_From_Board__Cells_Buffer(score, max_score):
+    """Function make_from_board: persistent boards have a buffer of cells."""
+    max_score.value += 2
+    try:
+        positions_to_fill = {(1, 4), (2, 1), (3, 2), (4, 4)}
+        the_board = Board.make_board(4, positions_to_fill)
+        persistent_board = PersistentBoard.make_from_board(the_board)
+        cells = Board.get_cells_buffer(persistent_board)
+        assert cells.tolist() == Board.get_cells_buffer(the_board).tolist()
+        assert cells[1, 0] == 1 and cells[1, 1] == 0
+        assert Board.get_cells_buffer(persistent_board) is cells
+        assert Board.get_all_filled_positions(persistent_board) == positions_to_fill
+        score.value += 2
+    except:
+        pass
+
+
+def test_Make_From_Board__Equality(score, max_score):
+    """Function make_from_board: equality and length only depend on the filled cells."""
+    max_score.value += 2
+    try:
+        first_board = PersistentBoard.make_board(4, {(1, 1)})
+        second_board = PersistentBoard.make_board(4, {(1, 1)})
+        Board.get_summed_area_table(first_board)
+        Board.get_cells_buffer(first_board)
+        assert first_board == second_board and len(first_board) == len(second_board) == 2
+        assert set(first_board) == {"dim", (1, 1)}
+        assert first_board == Board.make_board(4, {(1, 1)})
+        assert first_board != PersistentBoard.make_board(4, {(1, 2)})
+        score.value += 2
+    except:
+        pass
+
+
+# tests for drop_at
+
+def test_Drop_At__Shared_Columns(score, max_score):
+    """Function drop_at (persistent): new board sharing unchanged columns."""
+    max_score.value += 4
+    try:
+        persistent_board = PersistentBoard.make_board(10, {(1, 1), (9, 9)})
+        block = Block.make_block({(0, 0), (0, 1)})
+        new_board = PersistentBoard.drop_at(persistent_board, block, (5, 5))
+        assert Board.get_all_filled_positions(new_board) == {(1, 1), (9, 9), (5, 5), (5, 6)}
+        assert Board.get_all_filled_positions(persistent_board) == {(1, 1), (9, 9)}
+        assert new_board._columns[0] is persistent_board._columns[0]
+        assert new_board._columns[2] is persistent_board._columns[2]
+        assert PersistentBoard.drop_at(persistent_board, block, (1, 1)) is persistent_board
+        assert PersistentBoard.drop_at(persistent_board, block, (1, 10)) is persistent_board
+        score.value += 4
+    except:
+        pass
+
+
+# tests for clear_full_rows_and_columns
+
+def test_Clear_Full_Rows_And_Columns__Shared_Columns(score, max_score):
+    """Function clear_full_rows_and_columns (persistent): new board sharing unchanged columns."""
+    max_score.value += 3
+    try:
+        full_column = {(5, row) for row in range(1, 11)}
+        persistent_board = PersistentBoard.make_board(10, full_column | {(1, 1), (9, 9)})
+        new_board = PersistentBoard.clear_full_rows_and_columns(persistent_board)
+        assert Board.get_all_filled_positions(new_board) == {(1, 1), (9, 9)}
+        assert new_board._columns[0] is persistent_board._columns[0]
+        assert new_board._columns[2] is persistent_board._columns[2]
+        full_row = {(column, 3) for column in range(1, 11)}
+        persistent_board = PersistentBoard.make_board(10, full_row | full_column | {(1, 1)})
+        new_board = PersistentBoard.clear_full_rows_and_columns(persistent_board)
+        assert Board.get_all_filled_positions(new_board) == {(1, 1)}
+        assert PersistentBoard.clear_full_rows_and_columns(new_board) is new_board
+        score.value += 3
+    except:
+        pass
+
+
+# tests for game_move
+
+def test_Game_Move__Same_As_Game(score, max_score):
+    """Function game_move (persistent): same board and score as Game.game_move."""
+    max_score.value += 6
+    try:
+        generator = random.Random(33)
+        for dimension in (1, 3, 5, 8):
+            the_board = Board.make_board(dimension)
+            persistent_board = PersistentBoard.make_from_board(the_board)
+            for move in range(60):
+                block = generator.choice(Block.standard_blocks)
+                positions = Board.get_droppable_positions(the_board, block)
+                if len(positions) == 0:
+                    continue
+                position = generator.choice(positions)
+                previous_board = persistent_board
+                previous_positions = Board.get_all_filled_positions(previous_board)
+                (persistent_board, move_score) = PersistentBoard.game_move(persistent_board, block, position)
+                assert move_score == Game.game_move(the_board, block, position)
+                assert Board.get_all_filled_positions(persistent_board) == \
+                       Board.get_all_filled_positions(the_board)
+                assert Board.get_all_filled_positions(previous_board) == previous_positions
+        score.value += 6
+    except:
+        pass
+
+
+persistent_board_test_functions = \
+    {
+        test_Make_From_Board__Read_Functions,
+        test_Make_From_Board__Cannot_Be_Changed,
+        test_Make_From_Board__Cells_Buffer,
+        test_Make_From_Board__Equality,
+
+        test_Drop_At__Shared_Columns,
+
+        test_Clear_Full_Rows_And_Columns__Shared_Columns,
+
+        test_Game_Move__Same_As_Game,
+    }
@@ -0,0 +1,79 @@
+import Batch
+import Block
+import Board
+
+import random
+import statistics
+
+
+def simulate_rollouts(board, nb_rollouts=100, seed=None, max_moves=None, blocks=Block.standard_blocks):
+    """
+        Play the given number of random games starting from the given board, and
+        return statistics about the number of moves they survived and the score
+        they obtained.
+        - In each move, a block is drawn uniformly from the given collection of
+          blocks, and dropped at a position chosen uniformly among all positions
+          at which it can be dropped. A game ends as soon as the drawn block cannot
+          be dropped, or after the given maximum number of moves (if not None).
+        - All games are played in lockstep on a single batch of boards (see the
+          module Batch), one move of all games at a time.
+        - The function returns a dict with keys "moves" and "scores", each mapping
+          to the list of values for the successive games, and keys "mean_moves",
+          "stdev_moves", "min_moves", "max_moves", "mean_score", "stdev_score",
+          "min_score" and "max_score".
+        - Given the same seed, the same games are played.
+        - The given board is not changed.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - The given number of rollouts is a positive integer number.
+        - The given collection of blocks is not empty and contains proper blocks.
+    """
+    generator = random.Random(seed)
+    blocks = tuple(blocks)
+    # Offsets of the lower left corner of the bounding box towards the anchor.
+    corners = [(Block.get_horizontal_offsets_from_anchor(block)[0],
+                Block.get_vertical_offsets_from_anchor(block)[0]) for block in blocks]
+
+    the_batch = Batch.make_batch([board] * nb_rollouts)
+    moves = [0] * nb_rollouts
+    scores = [0] * nb_rollouts
+    alive = [True] * nb_rollouts
+    turn = 0
+    while True in alive and (max_moves is None or turn < max_moves):
+        drawn = [generator.randrange(len(blocks)) if is_alive else None for is_alive in alive]
+        drawn_blocks = [blocks[index] if index is not None else None for index in drawn]
+        droppable_masks = Batch.get_droppable_masks(the_batch, drawn_blocks)
+
+        positions = []
+        for game in range(nb_rollouts):
+            if alive[game] and droppable_masks[game] == 0:
+                alive[game] = False
+            if not alive[game]:
+                positions.append(None)
+                continue
+            corner = _select_bit(droppable_masks[game], generator)
+            corner_position = Board.get_positions_in_mask(Batch.dimension(the_batch), corner)[0]
+            positions.append((corner_position[0] - corners[drawn[game]][0],
+                              corner_position[1] - corners[drawn[game]][1]))
+            moves[game] += 1
+
+        for (game, move_score) in enumerate(Batch.game_move(the_batch, drawn_blocks, positions)):
+            if move_score is not None:
+                scores[game] += move_score
+        turn += 1
+
+    return {"moves": moves, "scores": scores,
+            "mean_moves": statistics.mean(moves), "stdev_moves": statistics.pstdev(moves),
+            "min_moves": min(moves), "max_moves": max(moves),
+            "mean_score": statistics.mean(scores), "stdev_score": statistics.pstdev(scores),
+            "min_score": min(scores), "max_score": max(scores)}
+
+
+def _select_bit(mask, generator):
+    """
+        Return a mask with a single bit, chosen uniformly among the bits set in
+        the given mask.
+    """
+    for skipped in range(generator.randrange(bin(mask).count("1"))):
+        mask &= mask - 1
+    return mask & -mask
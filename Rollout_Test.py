@@ -0,0 +1,59 @@
+import Block
+import Board
+import Rollout
+
+
+# tests for simulate_rollouts
+
+def test_Simulate_Rollouts__Full_Board(score, max_score):
+    """Function simulate_rollouts: no block fits on a full board."""
+    max_score.value += 2
+    try:
+        the_board = Board.make_board(3, [(column, row) for column in range(1, 4) for row in range(1, 4)])
+        statistics = Rollout.simulate_rollouts(the_board, 5, seed=1)
+        assert statistics["moves"] == [0, 0, 0, 0, 0]
+        assert statistics["scores"] == [0, 0, 0, 0, 0]
+        assert statistics["mean_moves"] == 0 and statistics["max_score"] == 0
+        score.value += 2
+    except:
+        pass
+
+
+def test_Simulate_Rollouts__Single_Dot_Board(score, max_score):
+    """Function simulate_rollouts: single dots on a board of dimension 1 never end."""
+    max_score.value += 2
+    try:
+        statistics = Rollout.simulate_rollouts(Board.make_board(1), 3, seed=1, max_moves=7,
+                                               blocks=[Block.make_block({(0, 0)})])
+        assert statistics["moves"] == [7, 7, 7]
+        assert statistics["scores"] == [7 * 31, 7 * 31, 7 * 31]
+        assert statistics["stdev_score"] == 0
+        score.value += 2
+    except:
+        pass
+
+
+def test_Simulate_Rollouts__Seeded_Games(score, max_score):
+    """Function simulate_rollouts: seeded games are repeatable and legal."""
+    max_score.value += 5
+    try:
+        the_board = Board.make_board(5, {(1, 1), (3, 3), (5, 2)})
+        statistics = Rollout.simulate_rollouts(the_board, 40, seed=7)
+        assert statistics == Rollout.simulate_rollouts(the_board, 40, seed=7)
+        assert Board.get_all_filled_positions(the_board) == {(1, 1), (3, 3), (5, 2)}
+        assert len(statistics["moves"]) == 40
+        assert statistics["max_moves"] >= 1
+        assert statistics["min_moves"] <= statistics["mean_moves"] <= statistics["max_moves"]
+        for (nb_moves, game_score) in zip(statistics["moves"], statistics["scores"]):
+            assert nb_moves <= game_score <= nb_moves * (9 + 10 * 21)
+        score.value += 5
+    except:
+        pass
+
+
+rollout_test_functions = \
+    {
+        test_Simulate_Rollouts__Full_Board,
+        test_Simulate_Rollouts__Single_Dot_Board,
+        test_Simulate_Rollouts__Seeded_Games,
+    }
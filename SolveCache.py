@@ -0,0 +1,234 @@
+import Board
+import Game
+
+import hashlib
+import sqlite3
+import struct
+import time
+
+# A solve cache keeps the results of Game.highest_score in a SQLite database in a
+# local file, so they survive the process that computed them.
+# A key is a hash of 16 bytes of the dimension of the board, its filled mask (see
+# Board.get_filled_mask) and the sorted dot positions of the successive blocks.
+# Each result is stored with its score (NULL if there is no solution), its
+# positions as successive pairs of signed 16-bit numbers, and the time it was
+# last used. Once the cache holds more results than its maximum size, the
+# results that have not been used for the longest time are removed.
+# The database is in write-ahead-log mode, so any number of processes (for
+# instance the workers of a multiprocessing pool) can read it while one of them
+# writes. Each process must open the cache itself. New results and uses are
+# collected in memory, and only written in a single transaction when the cache
+# is flushed or closed, or once enough of them are pending.
+# Solvers consult the cache for many sub-problems, so results that were found
+# or stored recently are also kept in memory in front of the database, and
+# problems with few blocks, that are solved faster than a query runs, are not
+# cached at all.
+# The format of the database is checked against _FORMAT_VERSION, which is kept
+# in the user version of the database.
+
+_FORMAT_VERSION = 1
+# Number of pending results and uses that causes the cache to be flushed.
+_MAX_PENDING = 1000
+# Number of results kept in memory in front of the database.
+_MAX_RECENT = 100000
+
+# Lookup function of the installed solve cache, if any (see Game.add_solution_lookup).
+_installed_lookup = None
+
+
+def get_key(board, blocks):
+    """
+        Return the key of the given board and sequence of blocks in a solve cache.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+    """
+    board_dimension = Board.dimension(board)
+    data = struct.pack(">H", board_dimension) + \
+        Board.get_filled_mask(board).to_bytes((board_dimension * board_dimension + 7) // 8, "big")
+    for block in blocks:
+        dots = sorted(block)
+        data += struct.pack(">H{}h".format(2 * len(dots)), len(dots), *[coordinate for dot in dots for coordinate in dot])
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def open_solve_cache(path, max_size=1000000, min_nb_blocks=3):
+    """
+        Return the solve cache stored in the file at the given path.
+        - A new empty cache is created if there is no file at the given path.
+        - The cache holds at most the given number of results. Only results for
+          sequences of at least the given number of blocks are looked up and
+          stored, because shorter problems are solved faster than they are
+          looked up.
+        - A ValueError is raised if the file holds a database in another format.
+        ASSUMPTIONS
+        - The given path is a path at which a file can be read and written.
+        - The given maximum size and minimum number of blocks are positive
+          integer numbers.
+    """
+    connection = sqlite3.connect(path, timeout=30)
+    try:
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        tables = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        if version == 0 and len(tables) == 0:
+            with connection:
+                connection.execute("CREATE TABLE IF NOT EXISTS solutions "
+                                   "(key BLOB PRIMARY KEY, score INTEGER, positions BLOB, last_used REAL)")
+                connection.execute("CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)")
+                connection.execute("PRAGMA user_version = {}".format(_FORMAT_VERSION))
+        elif version != _FORMAT_VERSION:
+            raise ValueError("not a solve cache of format version {}".format(_FORMAT_VERSION))
+        connection.execute("PRAGMA journal_mode = WAL")
+    except (ValueError, sqlite3.DatabaseError) as error:
+        connection.close()
+        raise ValueError(str(error))
+    return {"connection": connection, "max_size": max_size, "min_nb_blocks": min_nb_blocks,
+            "new_results": dict(), "used_keys": set(), "recent_results": dict(), "hits": 0, "misses": 0}
+
+
+def close_solve_cache(cache):
+    """
+        Flush the given solve cache and close its database.
+        ASSUMPTIONS
+        - The given cache is an open solve cache.
+    """
+    flush_solve_cache(cache)
+    cache["connection"].close()
+
+
+def flush_solve_cache(cache):
+    """
+        Write all new results and uses of the given solve cache to its database,
+        and remove the least recently used results beyond its maximum size.
+        ASSUMPTIONS
+        - The given cache is an open solve cache.
+    """
+    now = time.time()
+    connection = cache["connection"]
+    with connection:
+        for (key, (score, positions)) in cache["new_results"].items():
+            connection.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)",
+                               (key, score, _pack_positions(positions), now))
+        for key in cache["used_keys"]:
+            connection.execute("UPDATE solutions SET last_used = ? WHERE key = ?", (now, key))
+        nb_excess = connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0] - cache["max_size"]
+        if nb_excess > 0:
+            connection.execute("DELETE FROM solutions WHERE key IN "
+                               "(SELECT key FROM solutions ORDER BY last_used LIMIT ?)", (nb_excess,))
+            # Results kept in memory may have been removed.
+            cache["recent_results"] = dict()
+    cache["new_results"] = dict()
+    cache["used_keys"] = set()
+
+
+def look_up(cache, board, blocks):
+    """
+        Return the result of Game.highest_score for the given board and sequence
+        of blocks as stored in the given solve cache.
+        - None is returned if the cache has no result for the board and blocks,
+          or if the sequence of blocks is too short to be cached.
+        ASSUMPTIONS
+        - The given cache is an open solve cache.
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+    """
+    if len(blocks) < cache["min_nb_blocks"]:
+        return None
+    key = get_key(board, blocks)
+    if key in cache["recent_results"]:
+        (score, positions) = cache["recent_results"][key]
+    elif key in cache["new_results"]:
+        (score, positions) = cache["new_results"][key]
+    else:
+        row = cache["connection"].execute(
+            "SELECT score, positions FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            cache["misses"] += 1
+            return None
+        (score, positions) = (row[0], _unpack_positions(row[1]))
+        _remember(cache, key, (score, positions))
+    if key not in cache["new_results"]:
+        cache["used_keys"].add(key)
+        _flush_if_full(cache)
+    cache["hits"] += 1
+    if score is None:
+        return None, None
+    return score, list(positions)
+
+
+def store(cache, board, blocks, result):
+    """
+        Store the given result of Game.highest_score for the given board and
+        sequence of blocks in the given solve cache.
+        - Nothing is stored if the sequence of blocks is too short to be cached.
+        ASSUMPTIONS
+        - The given cache is an open solve cache.
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+    """
+    if len(blocks) < cache["min_nb_blocks"]:
+        return
+    (score, positions) = result
+    key = get_key(board, blocks)
+    cache["new_results"][key] = (score, tuple(positions) if positions is not None else None)
+    _remember(cache, key, cache["new_results"][key])
+    _flush_if_full(cache)
+
+
+def install_solve_cache(cache):
+    """
+        Let the solvers of the module Game consult the given solve cache before
+        searching, and store the results of their searches in it (see
+        Game.add_solution_lookup).
+        - If the given cache is None, solvers no longer use a cache.
+        - A cache installed before is replaced. Opening books and transposition
+          tables that are installed stay in use, and all of them are consulted
+          in the order in which they were installed.
+        ASSUMPTIONS
+        - The given cache is an open solve cache or None.
+    """
+    global _installed_lookup
+    if _installed_lookup is not None:
+        Game.remove_solution_lookup(_installed_lookup)
+        _installed_lookup = None
+    if cache is not None:
+        _installed_lookup = lambda board, blocks: look_up(cache, board, blocks)
+        Game.add_solution_lookup(_installed_lookup,
+                                 lambda board, blocks, result: store(cache, board, blocks, result))
+
+
+def _flush_if_full(cache):
+    """
+        Flush the given solve cache if it has enough pending results and uses.
+    """
+    if len(cache["new_results"]) + len(cache["used_keys"]) >= _MAX_PENDING:
+        flush_solve_cache(cache)
+
+
+def _remember(cache, key, result):
+    """
+        Keep the given result with the given key in memory in the given solve
+        cache, forgetting all results kept before if there are too many of them.
+    """
+    if len(cache["recent_results"]) >= _MAX_RECENT:
+        cache["recent_results"] = dict()
+    cache["recent_results"][key] = result
+
+
+def _pack_positions(positions):
+    """
+        Return the bytes of the given positions, or None if there are none.
+    """
+    if positions is None:
+        return None
+    return struct.pack(">{}h".format(2 * len(positions)), *[coordinate for position in positions for coordinate in position])
+
+
+def _unpack_positions(data):
+    """
+        Return a tuple of the positions in the given bytes, or None if there are none.
+    """
+    if data is None:
+        return None
+    coordinates = struct.unpack(">{}h".format(len(data) // 2), data)
+    return tuple((coordinates[index], coordinates[index + 1]) for index in range(0, len(coordinates), 2))
@@ -0,0 +1,196 @@
+import Block
+import Board
+import Game
+import OpeningBook
+import SolveCache
+
+import os
+import sqlite3
+import tempfile
+
+
+def make_problem():
+    the_board = Board.make_board(5, {(1, 1), (2, 3), (4, 4), (5, 1)})
+    blocks = [Block.standard_blocks[2], Block.standard_blocks[9], Block.standard_blocks[17]]
+    return the_board, blocks
+
+
+# tests for install_solve_cache
+
+def test_Install_Solve_Cache__Warm_Run(score, max_score):
+    """Function install_solve_cache: warm runs answer sub-problems from disk."""
+    max_score.value += 5
+    try:
+        (the_board, blocks) = make_problem()
+        expected = Game.highest_score(the_board, blocks)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite")
+            cache = SolveCache.open_solve_cache(path)
+            SolveCache.install_solve_cache(cache)
+            try:
+                assert Game.highest_score(the_board, blocks) == expected
+            finally:
+                SolveCache.install_solve_cache(None)
+                SolveCache.close_solve_cache(cache)
+
+            cache = SolveCache.open_solve_cache(path)
+            assert SolveCache.look_up(cache, the_board, blocks) == expected
+            assert SolveCache.look_up(cache, the_board, blocks[:1]) is None
+            SolveCache.install_solve_cache(cache)
+            try:
+                assert Game.highest_score(the_board, blocks) == expected
+                assert Game.highest_score_ordered(the_board, blocks) == expected
+                assert cache["hits"] == 3 and cache["misses"] == 0
+            finally:
+                SolveCache.install_solve_cache(None)
+                SolveCache.close_solve_cache(cache)
+        score.value += 5
+    except:
+        pass
+
+
+def test_Install_Solve_Cache__With_Opening_Book(score, max_score):
+    """Function install_solve_cache: a cache and an opening book are consulted together."""
+    max_score.value += 6
+    try:
+        (the_board, blocks) = make_problem()
+        expected = Game.highest_score(the_board, blocks)
+        booked_board = Board.make_board(5)
+        booked_blocks = [Block.standard_blocks[0], Block.standard_blocks[1]]
+        book = {OpeningBook.get_key(booked_board, booked_blocks): (1000, [(3, 3), (1, 1)])}
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SolveCache.open_solve_cache(os.path.join(directory, "cache.sqlite"), min_nb_blocks=2)
+            SolveCache.install_solve_cache(cache)
+            OpeningBook.install_opening_book(book)
+            try:
+                assert Game.highest_score(booked_board, booked_blocks) == (1000, [(3, 3), (1, 1)])
+                assert SolveCache.look_up(cache, booked_board, booked_blocks) == (1000, [(3, 3), (1, 1)])
+                assert Game.highest_score(the_board, blocks) == expected
+                assert SolveCache.look_up(cache, the_board, blocks) == expected
+                OpeningBook.install_opening_book(None)
+                assert Game.highest_score(booked_board, booked_blocks) == (1000, [(3, 3), (1, 1)])
+                SolveCache.install_solve_cache(None)
+                OpeningBook.install_opening_book(book)
+                assert Game.highest_score(the_board, blocks) == expected
+            finally:
+                OpeningBook.install_opening_book(None)
+                SolveCache.install_solve_cache(None)
+                SolveCache.close_solve_cache(cache)
+        score.value += 6
+    except:
+        pass
+
+
+# tests for store and look_up
+
+def test_Store__Concurrent_Readers_And_No_Solution(score, max_score):
+    """Functions store and look_up: results without solution and concurrent readers."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(2, {(1, 1)})
+        blocks = [Block.standard_blocks[17], Block.standard_blocks[0]]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite")
+            writer = SolveCache.open_solve_cache(path, min_nb_blocks=2)
+            reader = SolveCache.open_solve_cache(path, min_nb_blocks=2)
+            SolveCache.store(writer, the_board, blocks, (None, None))
+            SolveCache.store(writer, the_board, blocks[1:] * 2, (2, [(1, 2), (2, 1)]))
+            assert SolveCache.look_up(reader, the_board, blocks) is None
+            SolveCache.flush_solve_cache(writer)
+            assert SolveCache.look_up(reader, the_board, blocks) == (None, None)
+            assert SolveCache.look_up(reader, the_board, blocks[1:] * 2) == (2, [(1, 2), (2, 1)])
+            SolveCache.close_solve_cache(reader)
+            SolveCache.close_solve_cache(writer)
+        score.value += 4
+    except:
+        pass
+
+
+def test_Look_Up__Recent_Results_And_Short_Problems(score, max_score):
+    """Function look_up: recent results are kept in memory, short problems are not cached."""
+    max_score.value += 3
+    try:
+        (the_board, blocks) = make_problem()
+        expected = Game.highest_score(the_board, blocks)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite")
+            writer = SolveCache.open_solve_cache(path)
+            SolveCache.store(writer, the_board, blocks, expected)
+            SolveCache.store(writer, the_board, blocks[:2], Game.highest_score(the_board, blocks[:2]))
+            SolveCache.close_solve_cache(writer)
+            cache = SolveCache.open_solve_cache(path)
+            assert SolveCache.look_up(cache, the_board, blocks[:2]) is None
+            assert SolveCache.look_up(cache, the_board, blocks) == expected
+            connection = sqlite3.connect(path)
+            with connection:
+                assert connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0] == 1
+                connection.execute("DELETE FROM solutions")
+            connection.close()
+            assert SolveCache.look_up(cache, the_board, blocks) == expected
+            assert cache["hits"] == 2 and cache["misses"] == 0
+            SolveCache.close_solve_cache(cache)
+        score.value += 3
+    except:
+        pass
+
+
+# tests for flush_solve_cache
+
+def test_Flush_Solve_Cache__Size_Cap(score, max_score):
+    """Function flush_solve_cache: least recently used results are removed beyond the maximum size."""
+    max_score.value += 4
+    try:
+        blocks = [Block.standard_blocks[0], Block.standard_blocks[0]]
+        boards = [Board.make_board(3, {(1, row)}) for row in (1, 2, 3)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite")
+            cache = SolveCache.open_solve_cache(path, 2, 2)
+            SolveCache.store(cache, boards[0], blocks, Game.highest_score(boards[0], blocks))
+            SolveCache.store(cache, boards[1], blocks, Game.highest_score(boards[1], blocks))
+            SolveCache.flush_solve_cache(cache)
+            assert SolveCache.look_up(cache, boards[0], blocks) is not None
+            SolveCache.flush_solve_cache(cache)
+            SolveCache.store(cache, boards[2], blocks, Game.highest_score(boards[2], blocks))
+            SolveCache.flush_solve_cache(cache)
+            assert SolveCache.look_up(cache, boards[0], blocks) is not None
+            assert SolveCache.look_up(cache, boards[1], blocks) is None
+            assert SolveCache.look_up(cache, boards[2], blocks) is not None
+            SolveCache.close_solve_cache(cache)
+        score.value += 4
+    except:
+        pass
+
+
+# tests for open_solve_cache
+
+def test_Open_Solve_Cache__Other_Format(score, max_score):
+    """Function open_solve_cache: database in another format."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "other.sqlite")
+            connection = sqlite3.connect(path)
+            connection.execute("PRAGMA user_version = 99")
+            connection.close()
+            try:
+                SolveCache.open_solve_cache(path)
+                assert False
+            except ValueError:
+                pass
+        score.value += 2
+    except:
+        pass
+
+
+solve_cache_test_functions = \
+    {
+        test_Install_Solve_Cache__Warm_Run,
+        test_Install_Solve_Cache__With_Opening_Book,
+
+        test_Store__Concurrent_Readers_And_No_Solution,
+        test_Look_Up__Recent_Results_And_Short_Problems,
+
+        test_Flush_Solve_Cache__Size_Cap,
+
+        test_Open_Solve_Cache__Other_Format,
+    }
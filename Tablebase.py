@@ -0,0 +1,136 @@
+import Block
+import Board
+
+import mmap
+import struct
+
+# A fit tablebase stores for each possible state of a board of a given dimension
+# which of the standard blocks can be dropped somewhere on it, so that question is
+# answered with a single lookup instead of a search.
+# The states of a board are indexed by their filled masks (see Board.get_filled_mask).
+# For each state, a 32-bit word holds a mask whose bit I is set if the standard
+# block at index I in Block.standard_blocks can be dropped on the board.
+# A tablebase file starts with a header (see _HEADER), followed by the words of
+# all successive states, each stored in 4 bytes in little-endian order. The file
+# has 4*2**(D*D) bytes after the header for dimension D, so tablebases are only
+# feasible for small boards: 128 MiB for a 5x5 board, but 256 GiB for a 6x6 board.
+# Tablebases are loaded lazily: the file is only mapped in memory with its first
+# lookup, and the operating system only reads the pages that are looked up.
+
+_MAGIC = b"1010FITS"
+_VERSION = 1
+# Magic bytes, version, dimension and number of blocks.
+_HEADER = struct.Struct("<8sHHI")
+
+
+def build_tablebase(path, dimension=5):
+    """
+        Compute the fit tablebase for boards of the given dimension, and write it
+        to the file at the given path.
+        - The masks for all states are computed together on a single integer
+          number holding the words of all states. Each state in which a block
+          fits because its dropped cells are all free, passes that bit to all
+          states with fewer filled cells, one cell at a time.
+        ASSUMPTIONS
+        - The given dimension is a positive integer number not above 5.
+        - The given path is a path at which a file can be written.
+    """
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, dimension, len(Block.standard_blocks)))
+        file.write(_compute_fit_masks(dimension))
+
+
+def open_tablebase(path):
+    """
+        Return the tablebase stored in the file at the given path.
+        - Only the header of the file is read. The rest of the file is mapped in
+          memory with the first lookup.
+        - A ValueError is raised if the file does not hold a tablebase in the
+          format of this module.
+        ASSUMPTIONS
+        - The given path is a path at which a file can be read.
+    """
+    with open(path, "rb") as file:
+        header = file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError("not a tablebase")
+    (magic, version, dimension, nb_blocks) = _HEADER.unpack(header)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("not a tablebase of version {}".format(_VERSION))
+    if nb_blocks != len(Block.standard_blocks):
+        raise ValueError("tablebase built for a different collection of standard blocks")
+    return {"dim": dimension, "path": path, "file": None, "data": None}
+
+
+def close_tablebase(tablebase):
+    """
+        Release the memory map and the file of the given tablebase.
+        - The tablebase is mapped again with its next lookup.
+        ASSUMPTIONS
+        - The given tablebase is a tablebase.
+    """
+    if tablebase["data"] is not None:
+        tablebase["data"].close()
+        tablebase["file"].close()
+        tablebase["data"] = None
+        tablebase["file"] = None
+
+
+def get_fitting_blocks_mask(tablebase, board):
+    """
+        Return a mask of all the standard blocks that can be dropped on the given
+        board, as stored in the given tablebase (see Board.get_fitting_blocks_mask).
+        - None is returned if the tablebase is built for another dimension.
+        ASSUMPTIONS
+        - The given tablebase is a tablebase.
+        - The given board is a proper board.
+    """
+    if Board.dimension(board) != tablebase["dim"]:
+        return None
+    if tablebase["data"] is None:
+        tablebase["file"] = open(tablebase["path"], "rb")
+        tablebase["data"] = mmap.mmap(tablebase["file"].fileno(), 0, access=mmap.ACCESS_READ)
+    offset = _HEADER.size + 4 * Board.get_filled_mask(board)
+    return int.from_bytes(tablebase["data"][offset:offset + 4], "little")
+
+
+def install_tablebase(tablebase):
+    """
+        Let the module Board answer which standard blocks fit on boards of the
+        dimension of the given tablebase by looking them up in it (see
+        Board.set_fit_lookup).
+        - If the given tablebase is None, Board computes them again.
+        ASSUMPTIONS
+        - The given tablebase is a tablebase or None.
+    """
+    if tablebase is None:
+        Board.set_fit_lookup(None)
+    else:
+        Board.set_fit_lookup(lambda board: get_fitting_blocks_mask(tablebase, board))
+
+
+def _compute_fit_masks(dimension):
+    """
+        Return the bytes of the words of all the states of a board of the given
+        dimension.
+    """
+    nb_cells = dimension * dimension
+    all_cells = (1 << nb_cells) - 1
+    words = bytearray(4 << nb_cells)
+    empty_board = Board.make_board(dimension)
+    for (index, block) in enumerate(Block.standard_blocks):
+        for position in Board.get_droppable_positions(empty_board, block):
+            offset = 4 * (all_cells ^ Board.get_block_mask(dimension, block, position))
+            word = int.from_bytes(words[offset:offset + 4], "little") | (1 << index)
+            words[offset:offset + 4] = word.to_bytes(4, "little")
+
+    # Word S of the state with filled mask S sits at bits 32*S up to 32*S+31.
+    states = int.from_bytes(words, "little")
+    del words
+    for cell in range(nb_cells):
+        step = 1 << cell
+        # Mask of the words of all states in which the cell is filled.
+        filled_cell_mask = int.from_bytes(
+            (bytes(4 * step) + b"\xff" * (4 * step)) * (1 << (nb_cells - cell - 1)), "little")
+        states |= (states & filled_cell_mask) >> (32 * step)
+    return states.to_bytes(4 << nb_cells, "little")
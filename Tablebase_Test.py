@@ -0,0 +1,113 @@
+import Block
+import Board
+import Tablebase
+
+import os
+import random
+import tempfile
+
+
+# tests for build_tablebase and get_fitting_blocks_mask
+
+def test_Build_Tablebase__All_States(score, max_score):
+    """Functions build_tablebase and get_fitting_blocks_mask: all states of a 3x3 board."""
+    max_score.value += 5
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fits3.bin")
+            Tablebase.build_tablebase(path, 3)
+            tablebase = Tablebase.open_tablebase(path)
+            assert tablebase["data"] is None
+            for filled_mask in range(1 << 9):
+                the_board = Board.make_board(3, Board.get_positions_in_mask(3, filled_mask))
+                assert Tablebase.get_fitting_blocks_mask(tablebase, the_board) == \
+                       Board.get_fitting_blocks_mask(the_board)
+            assert Tablebase.get_fitting_blocks_mask(tablebase, Board.make_board(4)) is None
+            Tablebase.close_tablebase(tablebase)
+        score.value += 5
+    except:
+        pass
+
+
+def test_Build_Tablebase__Random_States(score, max_score):
+    """Functions build_tablebase and get_fitting_blocks_mask: random states of a 4x4 board."""
+    max_score.value += 4
+    try:
+        generator = random.Random(40)
+        all_positions = [(column, row) for column in range(1, 5) for row in range(1, 5)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fits4.bin")
+            Tablebase.build_tablebase(path, 4)
+            tablebase = Tablebase.open_tablebase(path)
+            for case in range(300):
+                the_board = Board.make_board(4, generator.sample(all_positions, generator.randint(0, 16)))
+                assert Tablebase.get_fitting_blocks_mask(tablebase, the_board) == \
+                       Board.get_fitting_blocks_mask(the_board)
+            Tablebase.close_tablebase(tablebase)
+        score.value += 4
+    except:
+        pass
+
+
+# tests for open_tablebase
+
+def test_Open_Tablebase__Not_A_Tablebase(score, max_score):
+    """Function open_tablebase: file without a tablebase."""
+    max_score.value += 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "other.bin")
+            with open(path, "wb") as file:
+                file.write(b"1010BOOK" + bytes(8))
+            try:
+                Tablebase.open_tablebase(path)
+                assert False
+            except ValueError:
+                pass
+        score.value += 2
+    except:
+        pass
+
+
+# tests for install_tablebase
+
+def test_Install_Tablebase__Board_Consults_Tablebase(score, max_score):
+    """Function install_tablebase: Board consults the tablebase."""
+    max_score.value += 3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fits3.bin")
+            Tablebase.build_tablebase(path, 3)
+            tablebase = Tablebase.open_tablebase(path)
+            Tablebase.install_tablebase(tablebase)
+            try:
+                the_board = Board.make_board(3, {(1, 1), (2, 2), (3, 3)})
+                assert Board.get_fitting_blocks(the_board) == \
+                       [Block.standard_blocks[index] for index in (0, 1, 5, 9, 11)]
+                assert tablebase["data"] is not None
+                assert Board.is_fitting_block(the_board, Block.standard_blocks[5])
+                assert not Board.is_fitting_block(the_board, Block.standard_blocks[17])
+                # Boards of other dimensions are not in the tablebase.
+                small_board = Board.make_board(2, {(1, 1)})
+                assert Board.get_fitting_blocks(small_board) == \
+                       [block for block in Block.standard_blocks
+                        if len(Board.get_droppable_positions(small_board, block)) > 0]
+                assert [block for block in Block.standard_blocks if Board.is_fitting_block(small_board, block)] == \
+                       Board.get_fitting_blocks(small_board)
+            finally:
+                Tablebase.install_tablebase(None)
+                Tablebase.close_tablebase(tablebase)
+        score.value += 3
+    except:
+        pass
+
+
+tablebase_test_functions = \
+    {
+        test_Build_Tablebase__All_States,
+        test_Build_Tablebase__Random_States,
+
+        test_Open_Tablebase__Not_A_Tablebase,
+
+        test_Install_Tablebase__Board_Consults_Tablebase,
+    }
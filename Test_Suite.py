@@ -11,6 +11,20 @@ import Position_Test
 import Block_Test
 import Board_Test
 import Game_Test
+import Batch_Test
+import Rollout_Test
+import PersistentBoard_Test
+import MoveOrder_Test
+import OpeningBook_Test
+import Tablebase_Test
+import SolveCache_Test
+import TranspositionTable_Test
+import Evaluation_Test
+import Tuner_Test
+import Tournament_Test
+import Dataset_Test
+import GameRecord_Test
+import Validator_Test
 
 import multiprocessing
 
@@ -49,7 +63,21 @@ if __name__ == '__main__':
             Position_Test.position_test_functions,
             Block_Test.block_test_functions,
             Board_Test.board_test_functions,
-            Game_Test.game_test_functions
+            Game_Test.game_test_functions,
+            Batch_Test.batch_test_functions,
+            Rollout_Test.rollout_test_functions,
+            PersistentBoard_Test.persistent_board_test_functions,
+            MoveOrder_Test.move_order_test_functions,
+            OpeningBook_Test.opening_book_test_functions,
+            Tablebase_Test.tablebase_test_functions,
+            SolveCache_Test.solve_cache_test_functions,
+            TranspositionTable_Test.transposition_table_test_functions,
+            Evaluation_Test.evaluation_test_functions,
+            Tuner_Test.tuner_test_functions,
+            Tournament_Test.tournament_test_functions,
+            Dataset_Test.dataset_test_functions,
+            GameRecord_Test.game_record_test_functions,
+            Validator_Test.validator_test_functions
         )
 
     (score, max_score, failed_tests) = run_tests(test_functions)
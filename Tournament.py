@@ -0,0 +1,227 @@
+import Board
+import Game
+
+import math
+import multiprocessing
+import random
+import statistics
+
+# A tournament compares two playing strategies on paired games: for each game,
+# both strategies play the same seeded stream of standard blocks (see
+# Game.play_headless), so the difference of their scores in that game is not
+# caused by one of them getting better blocks.
+# A strategy is an evaluator as used by Game.play_headless. Strategies are sent
+# to worker processes, so they must be picklable, for instance a function defined
+# at the top level of a module, or functools.partial(Evaluation.evaluate,
+# weights=...).
+# Games are played in rounds. After each round, the mean of the paired score
+# differences is tested against zero with a normal approximation. The tournament
+# stops as soon as the difference is significant, or after the maximum number of
+# games. Because the test is repeated after each round, it is a group sequential
+# test: the significance level is spent gradually over the rounds by an alpha
+# spending function of the fraction of the maximum number of games played
+# (Lan-DeMets), so stopping early does not inflate the chance of declaring a
+# winner by luck:
+# - "pocock": alpha * ln(1 + (e - 1) * t), which spends much of the level in
+#   the first rounds, so clearly different strategies are told apart early.
+# - "obrien-fleming": 2 - 2 * Phi(z / sqrt(t)), with z the two-sided critical
+#   value at the given confidence, which spends little in the first rounds and
+#   keeps the last test close to a test after the maximum number of games.
+# The critical value of each round is the value for which the chance, in the
+# absence of a difference, of first exceeding it in that round equals the level
+# spent in that round. It is computed by numerical integration of the density of
+# the sum of the standardized differences over the values not stopped before.
+
+SPENDING_FUNCTIONS = ("pocock", "obrien-fleming")
+
+# Number of grid points on which the density of the sum of the differences is
+# integrated, and number of bisection steps for a critical value.
+_GRID_SIZE = 101
+_NB_BISECTIONS = 50
+
+
+def run_tournament(strategy, other_strategy, names=("first", "second"), confidence=0.95,
+                   min_games=10, max_games=1000, round_size=10, dimension=10, max_moves=None,
+                   seed=0, nb_processes=None, spending="pocock"):
+    """
+        Play paired games with the given strategies until the difference of their
+        scores is significant at the given confidence, and return a report.
+        - At least the given minimum number of games and at most the given maximum
+          number of games are played, in rounds of the given size. Games are played
+          on an empty board of the given dimension, with at most the given maximum
+          number of moves (unlimited if None).
+        - Games are played in parallel by a pool of the given number of processes
+          (the number of processors if None). With a single process, no pool is used.
+        - The significance level is spent over the rounds with the given alpha
+          spending function, one of SPENDING_FUNCTIONS.
+        - The report is a dict with keys:
+            - "nb_games": the number of games played by each strategy.
+            - "strategies": a dict mapping each of the given names onto the
+              distribution of the scores (key "scores") and of the number of moves
+              survived (key "moves") of that strategy (see get_distribution).
+            - "difference": the distribution of the paired differences between
+              the score of the first and of the second strategy.
+            - "z": the test statistic of the last test.
+            - "critical_value": the critical value of the last test.
+            - "significant": whether the difference is significant.
+            - "winner": the name of the strategy with the higher mean score if the
+              difference is significant, None otherwise.
+        - Given the same seed, the same games are played.
+        ASSUMPTIONS
+        - The given strategies are picklable evaluators.
+        - The given confidence is a number between 0 and 1.
+        - The given numbers of games, the round size and the number of processes
+          are positive integer numbers.
+    """
+    generator = random.Random(seed)
+    boundary = _make_boundary(1 - confidence, max_games, spending)
+    critical_value = float("inf")
+
+    results = {names[0]: [], names[1]: []}
+    differences = []
+    z = 0.0
+    significant = False
+    pool = None
+    if nb_processes != 1:
+        pool = multiprocessing.Pool(nb_processes)
+    try:
+        while len(differences) < max_games and not significant:
+            game_seeds = [generator.getrandbits(32) for game in range(min(round_size, max_games - len(differences)))]
+            tasks = [(contender, game_seed, dimension, max_moves)
+                     for contender in (strategy, other_strategy) for game_seed in game_seeds]
+            if pool is None:
+                round_results = list(map(_play_game, tasks))
+            else:
+                round_results = pool.map(_play_game, tasks)
+            results[names[0]] += round_results[:len(game_seeds)]
+            results[names[1]] += round_results[len(game_seeds):]
+            differences += [result["score"] - other_result["score"] for (result, other_result)
+                            in zip(round_results[:len(game_seeds)], round_results[len(game_seeds):])]
+            if len(differences) >= max(min_games, 2):
+                z = _get_z(differences)
+                critical_value = _get_critical_value(boundary, len(differences))
+                significant = abs(z) > critical_value
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    winner = None
+    if significant:
+        winner = names[0] if statistics.mean(differences) > 0 else names[1]
+    return {"nb_games": len(differences),
+            "strategies": {name: {"scores": get_distribution([result["score"] for result in results[name]]),
+                                  "moves": get_distribution([result["moves"] for result in results[name]])}
+                           for name in names},
+            "difference": get_distribution(differences),
+            "z": z, "critical_value": critical_value, "significant": significant, "winner": winner}
+
+
+def get_distribution(values):
+    """
+        Return a dict describing the distribution of the given values, with keys
+        "values" (the values in ascending order), "mean", "stdev", "min",
+        "quartiles" (a list of the three quartiles) and "max".
+        ASSUMPTIONS
+        - The given collection of values is not empty and contains numbers.
+    """
+    values = sorted(values)
+    if len(values) > 1:
+        quartiles = statistics.quantiles(values, n=4)
+    else:
+        quartiles = values * 3
+    return {"values": values, "mean": statistics.mean(values), "stdev": statistics.pstdev(values),
+            "min": values[0], "quartiles": quartiles, "max": values[-1]}
+
+
+def _make_boundary(alpha, max_games, spending):
+    """
+        Return a new boundary of a group sequential test at the given significance
+        level for at most the given number of games, with the given alpha spending
+        function.
+        - The boundary keeps the number of games of the previous test, the level
+          spent so far, and a grid of sums of standardized differences with the
+          weights of their density for the values not stopped before.
+    """
+    return {"alpha": alpha, "max_games": max_games, "spending": spending,
+            "nb_games": 0, "spent": 0.0, "sums": [0.0], "weights": [1.0]}
+
+
+def _get_spent_alpha(boundary, fraction):
+    """
+        Return the significance level to be spent by the given boundary once the
+        given fraction of the maximum number of games has been played.
+    """
+    alpha = boundary["alpha"]
+    fraction = min(fraction, 1.0)
+    if boundary["spending"] == "pocock":
+        return alpha * math.log(1 + (math.e - 1) * fraction)
+    z = statistics.NormalDist().inv_cdf(1 - alpha / 2)
+    return 2 - 2 * statistics.NormalDist().cdf(z / math.sqrt(fraction))
+
+
+def _get_critical_value(boundary, nb_games):
+    """
+        Return the critical value of the test after the given number of games
+        with the given boundary, and update the boundary for the next test.
+        ASSUMPTIONS
+        - The given number of games is larger than the number of games of the
+          previous test.
+    """
+    normal = statistics.NormalDist()
+    increment_deviation = math.sqrt(nb_games - boundary["nb_games"])
+    scale = math.sqrt(nb_games)
+    pairs = list(zip(boundary["sums"], boundary["weights"]))
+
+    def get_crossing(critical_value):
+        limit = critical_value * scale
+        return sum([weight * (normal.cdf((-limit - value) / increment_deviation) +
+                              1 - normal.cdf((limit - value) / increment_deviation))
+                    for (value, weight) in pairs])
+
+    target = _get_spent_alpha(boundary, nb_games / boundary["max_games"]) - boundary["spent"]
+    (low, high) = (0.0, 10.0)
+    for step in range(_NB_BISECTIONS):
+        middle = (low + high) / 2
+        if get_crossing(middle) > target:
+            low = middle
+        else:
+            high = middle
+    critical_value = high
+    boundary["spent"] += get_crossing(critical_value)
+
+    # Density of the sums that do not cross the boundary, by the trapezoidal rule.
+    limit = critical_value * scale
+    step = 2 * limit / (_GRID_SIZE - 1)
+    sums = [-limit + index * step for index in range(_GRID_SIZE)]
+    weights = []
+    for (index, value) in enumerate(sums):
+        density = sum([weight * normal.pdf((value - other_value) / increment_deviation)
+                       for (other_value, weight) in pairs]) / increment_deviation
+        weights.append(density * step * (0.5 if index in (0, _GRID_SIZE - 1) else 1))
+    boundary["nb_games"] = nb_games
+    boundary["sums"] = sums
+    boundary["weights"] = weights
+    return critical_value
+
+
+def _get_z(differences):
+    """
+        Return the test statistic for the mean of the given paired differences
+        being different from zero.
+    """
+    mean = statistics.mean(differences)
+    standard_error = statistics.stdev(differences) / len(differences) ** 0.5
+    if standard_error == 0:
+        return 0.0 if mean == 0 else float("inf") if mean > 0 else float("-inf")
+    return mean / standard_error
+
+
+def _play_game(task):
+    """
+        Play the game of the given task, a tuple consisting of a strategy, the seed
+        of the game, the dimension of the board and the maximum number of moves,
+        and return the result of Game.play_headless.
+    """
+    (strategy, game_seed, dimension, max_moves) = task
+    return Game.play_headless(Board.make_board(dimension), strategy, game_seed, max_moves)
@@ -0,0 +1,110 @@
+import Board
+import Evaluation
+import Tournament
+
+import functools
+import statistics
+
+
+def worst_first(board):
+    """Strategy preferring the boards that the default evaluator likes least."""
+    return -Evaluation.evaluate(board)
+
+
+def fill_board(board):
+    """Strategy preferring boards with many filled cells."""
+    return len(Board.get_all_filled_positions(board))
+
+
+default_strategy = functools.partial(Evaluation.evaluate, weights=Evaluation.DEFAULT_WEIGHTS)
+
+
+# tests for run_tournament
+
+def test_Run_Tournament__Early_Stop(score, max_score):
+    """Function run_tournament: stops early once a strategy is significantly better."""
+    max_score.value += 5
+    try:
+        report = Tournament.run_tournament(default_strategy, worst_first, ("default", "worst"), 0.95,
+                                           10, 1000, 10, 6, 40, 45, 1)
+        assert report["significant"] and report["winner"] == "default"
+        # A clearly stronger strategy wins within a few rounds of the 100 rounds allowed.
+        assert 10 <= report["nb_games"] <= 30 and report["nb_games"] % 10 == 0
+        assert report["critical_value"] < statistics.NormalDist().inv_cdf(1 - 0.05 / 100 / 2)
+        assert report["z"] > 0
+        for name in ("default", "worst"):
+            assert len(report["strategies"][name]["scores"]["values"]) == report["nb_games"]
+            assert report["strategies"][name]["moves"]["max"] <= 40
+        assert abs(report["difference"]["mean"] - (report["strategies"]["default"]["scores"]["mean"] -
+                                                   report["strategies"]["worst"]["scores"]["mean"])) < 1e-9
+        score.value += 5
+    except:
+        pass
+
+
+def test_Run_Tournament__Equal_Strategies(score, max_score):
+    """Function run_tournament: equal strategies play the maximum number of games."""
+    max_score.value += 3
+    try:
+        report = Tournament.run_tournament(fill_board, fill_board, ("one", "other"), 0.99,
+                                           4, 12, 5, 5, 10, 46, 2)
+        assert report["nb_games"] == 12 and not report["significant"] and report["winner"] is None
+        assert report["difference"]["values"] == [0] * 12
+        assert report["strategies"]["one"] == report["strategies"]["other"]
+        score.value += 3
+    except:
+        pass
+
+
+def test_Run_Tournament__Processes(score, max_score):
+    """Function run_tournament: the report does not depend on the number of processes."""
+    max_score.value += 3
+    try:
+        arguments = (default_strategy, fill_board, ("default", "fill"), 0.95, 4, 8, 4, 5, 15, 47)
+        assert Tournament.run_tournament(*arguments, nb_processes=1) == \
+               Tournament.run_tournament(*arguments, nb_processes=2)
+        score.value += 3
+    except:
+        pass
+
+
+def test_Run_Tournament__Spending_Functions(score, max_score):
+    """Function run_tournament: critical values of the alpha spending functions."""
+    max_score.value += 3
+    try:
+        # Known critical values for five equally spaced tests at the 5% level.
+        for (spending, last_critical_value) in (("pocock", 2.386), ("obrien-fleming", 2.063)):
+            report = Tournament.run_tournament(fill_board, fill_board, ("one", "other"), 0.95,
+                                               10, 50, 10, 4, 3, 48, 1, spending)
+            assert report["nb_games"] == 50 and not report["significant"]
+            assert abs(report["critical_value"] - last_critical_value) < 0.005
+        score.value += 3
+    except:
+        pass
+
+
+# tests for get_distribution
+
+def test_Get_Distribution__Single_Case(score, max_score):
+    """Function get_distribution: single case."""
+    max_score.value += 2
+    try:
+        distribution = Tournament.get_distribution([4, 1, 3, 2, 5])
+        assert distribution["values"] == [1, 2, 3, 4, 5]
+        assert distribution["mean"] == 3 and distribution["min"] == 1 and distribution["max"] == 5
+        assert distribution["quartiles"][1] == 3
+        assert Tournament.get_distribution([7])["quartiles"] == [7, 7, 7]
+        score.value += 2
+    except:
+        pass
+
+
+tournament_test_functions = \
+    {
+        test_Run_Tournament__Early_Stop,
+        test_Run_Tournament__Equal_Strategies,
+        test_Run_Tournament__Processes,
+        test_Run_Tournament__Spending_Functions,
+
+        test_Get_Distribution__Single_Case,
+    }
@@ -0,0 +1,236 @@
+import Board
+import Game
+import PersistentBoard
+
+import array
+import hashlib
+import struct
+
+# A transposition table remembers the results of Game.highest_score for a fixed
+# number of boards and sequences of blocks, in memory that is allocated once
+# when the table is made, so searches can run in a bounded amount of memory.
+# Entries are kept in parallel arrays, each entry taking 18 bytes:
+# - "keys": a 64-bit hash of the board and the sequence of blocks (see get_key),
+#   computed with BLAKE2 over the dimension and filled mask of the board and the
+#   sorted dot positions of the blocks, as for the keys of a solve cache.
+#   Different boards and sequences of blocks with the same hash are not told
+#   apart, which is very unlikely to happen.
+# - "depths": the number of blocks in the sequence, 0 for an empty slot.
+# - "scores": the highest score for the board and blocks, -1 for no solution.
+# - "columns" and "rows": the position of the best move for the first block.
+# Only the best move is stored for each entry. The positions for the other blocks
+# are reconstructed by following the entries of the boards reached by the best
+# moves (the principal variation). Storing a result therefore also stores an
+# entry for each board along its principal variation, so a result can be looked
+# up even if the solver that found it did not store the results for those boards
+# (as for Game.highest_score_pruned and Game.highest_score_ordered).
+# If a slot is needed for a new entry, the replacement policy decides whether
+# it replaces the entry in that slot:
+# - "always": the new entry always replaces the old one.
+# - "depth-preferred": the new entry only replaces an entry with fewer blocks,
+#   because it saves more work if it is found again.
+# - "two-tier": each key maps to a bucket of two slots. The first slot holds
+#   a depth-preferred entry, the second slot an always-replaced entry.
+
+POLICIES = ("always", "depth-preferred", "two-tier")
+
+# Lookup function of the installed transposition table, if any (see Game.add_solution_lookup).
+_installed_lookup = None
+
+
+def make_table(capacity, policy="depth-preferred"):
+    """
+        Return a new empty transposition table with room for the given number of
+        entries, using the given replacement policy.
+        ASSUMPTIONS
+        - The given capacity is a positive integer number, which is even for the
+          policy "two-tier".
+        - The given policy is one of POLICIES.
+    """
+    return {"policy": policy, "capacity": capacity,
+            "keys": array.array("q", bytes(8 * capacity)),
+            "depths": array.array("H", bytes(2 * capacity)),
+            "scores": array.array("i", bytes(4 * capacity)),
+            "columns": array.array("h", bytes(2 * capacity)),
+            "rows": array.array("h", bytes(2 * capacity)),
+            "hits": 0, "misses": 0, "stores": 0, "replacements": 0}
+
+
+def clear_table(table):
+    """
+        Remove all entries from the given transposition table, and reset its counts.
+        ASSUMPTIONS
+        - The given table is a transposition table.
+    """
+    capacity = table["capacity"]
+    table["depths"] = array.array("H", bytes(2 * capacity))
+    table["hits"] = table["misses"] = table["stores"] = table["replacements"] = 0
+
+
+def get_statistics(table):
+    """
+        Return a dict with the number of hits, misses, stores and replacements of
+        the given transposition table, and the number of slots that are in use.
+        ASSUMPTIONS
+        - The given table is a transposition table.
+    """
+    return {"hits": table["hits"], "misses": table["misses"],
+            "stores": table["stores"], "replacements": table["replacements"],
+            "used": table["capacity"] - table["depths"].count(0)}
+
+
+def get_key(board, blocks):
+    """
+        Return the key of the given board and sequence of blocks in a
+        transposition table: a signed 64-bit hash.
+        ASSUMPTIONS
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+    """
+    board_dimension = Board.dimension(board)
+    data = struct.pack(">H", board_dimension) + \
+        Board.get_filled_mask(board).to_bytes((board_dimension * board_dimension + 7) // 8, "big")
+    for block in blocks:
+        dots = sorted(block)
+        data += struct.pack(">H{}h".format(2 * len(dots)), len(dots), *[coordinate for dot in dots for coordinate in dot])
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big", signed=True)
+
+
+def look_up(table, board, blocks):
+    """
+        Return the result of Game.highest_score for the given board and sequence
+        of blocks as stored in the given transposition table.
+        - None is returned if the table has no entry for the board and blocks, or
+          if the positions of the principal variation cannot be reconstructed
+          because some of its entries have been replaced.
+        - None is returned for an empty sequence of blocks.
+        ASSUMPTIONS
+        - The given table is a transposition table.
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+    """
+    if len(blocks) == 0:
+        return None
+    slot = _find_slot(table, get_key(board, blocks))
+    if slot is not None and table["scores"][slot] < 0:
+        table["hits"] += 1
+        return None, None
+
+    positions = []
+    current_board = PersistentBoard.make_from_board(board)
+    for index in range(len(blocks)):
+        if index > 0:
+            slot = _find_slot(table, get_key(current_board, blocks[index:]))
+        if slot is None or table["scores"][slot] < 0:
+            table["misses"] += 1
+            return None
+        if index == 0:
+            score = table["scores"][slot]
+        position = (table["columns"][slot], table["rows"][slot])
+        positions.append(position)
+        (current_board, move_score) = PersistentBoard.game_move(current_board, blocks[index], position)
+    table["hits"] += 1
+    return score, positions
+
+
+def store(table, board, blocks, result):
+    """
+        Store the given result of Game.highest_score for the given board and
+        sequence of blocks in the given transposition table, as far as its
+        replacement policy allows.
+        - The results for the boards reached along the positions of the given
+          result, with the remaining blocks, are stored as well, up to the first
+          of them that is already in the table.
+        - Nothing is stored for an empty sequence of blocks.
+        ASSUMPTIONS
+        - The given table is a transposition table.
+        - The given board is a proper board.
+        - Each block in the given sequence of blocks is a proper block.
+        - The given result is the result of Game.highest_score for the given
+          board and blocks.
+    """
+    if len(blocks) == 0:
+        return
+    (score, positions) = result
+    if score is None:
+        _store_entry(table, get_key(board, blocks), len(blocks), -1, None)
+        return
+    _store_entry(table, get_key(board, blocks), len(blocks), score, positions[0])
+    # The remainder of a best solution is a best solution for the board it
+    # starts from, because a better one would improve the whole solution.
+    current_board = PersistentBoard.make_from_board(board)
+    for index in range(1, len(blocks)):
+        (current_board, move_score) = PersistentBoard.game_move(current_board, blocks[index - 1], positions[index - 1])
+        score -= move_score
+        key = get_key(current_board, blocks[index:])
+        if _find_slot(table, key) is not None:
+            return
+        _store_entry(table, key, len(blocks) - index, score, positions[index])
+
+
+def install_table(table):
+    """
+        Let the solvers of the module Game consult the given transposition table
+        before searching, and store the results of their searches in it (see
+        Game.add_solution_lookup).
+        - If the given table is None, solvers no longer use a table.
+        - A table installed before is replaced. Opening books and solve caches
+          that are installed stay in use, and all of them are consulted in the
+          order in which they were installed.
+        ASSUMPTIONS
+        - The given table is a transposition table or None.
+    """
+    global _installed_lookup
+    if _installed_lookup is not None:
+        Game.remove_solution_lookup(_installed_lookup)
+        _installed_lookup = None
+    if table is not None:
+        _installed_lookup = lambda board, blocks: look_up(table, board, blocks)
+        Game.add_solution_lookup(_installed_lookup,
+                                 lambda board, blocks, result: store(table, board, blocks, result))
+
+
+def _store_entry(table, key, depth, score, position):
+    """
+        Store an entry with the given key, depth, score and position of the best
+        move in the given transposition table, as far as its replacement policy
+        allows. A score of -1 without position stands for no solution.
+    """
+    capacity = table["capacity"]
+    depths = table["depths"]
+    if table["policy"] == "two-tier":
+        first_slot = 2 * ((key % capacity) // 2)
+        if table["keys"][first_slot] == key or depths[first_slot] <= depth:
+            slot = first_slot
+        else:
+            slot = first_slot + 1
+    else:
+        slot = key % capacity
+        if table["policy"] == "depth-preferred" and table["keys"][slot] != key and depths[slot] > depth:
+            return
+    if depths[slot] != 0 and table["keys"][slot] != key:
+        table["replacements"] += 1
+
+    table["keys"][slot] = key
+    depths[slot] = depth
+    table["scores"][slot] = score
+    if position is not None:
+        (table["columns"][slot], table["rows"][slot]) = position
+    table["stores"] += 1
+
+
+def _find_slot(table, key):
+    """
+        Return the slot of the entry with the given key in the given transposition
+        table, or None if there is no such entry.
+    """
+    capacity = table["capacity"]
+    if table["policy"] == "two-tier":
+        first_slot = 2 * ((key % capacity) // 2)
+        candidate_slots = (first_slot, first_slot + 1)
+    else:
+        candidate_slots = (key % capacity,)
+    for slot in candidate_slots:
+        if table["depths"][slot] != 0 and table["keys"][slot] == key:
+            return slot
+    return None
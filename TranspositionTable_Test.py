@@ -0,0 +1,147 @@
+import Block
+import Board
+import Game
+import TranspositionTable
+
+import random
+
+
+# tests for install_table
+
+def test_Install_Table__Same_As_Highest_Score(score, max_score):
+    """Function install_table: solvers return the same results with each replacement policy."""
+    max_score.value += 6
+    try:
+        for policy in TranspositionTable.POLICIES:
+            generator = random.Random(42)
+            table = TranspositionTable.make_table(64, policy)
+            for case in range(25):
+                dimension = generator.randint(3, 5)
+                all_positions = [(column, row) for column in range(1, dimension + 1) for row in range(1, dimension + 1)]
+                the_board = Board.make_board(dimension, generator.sample(all_positions, generator.randint(0, dimension)))
+                blocks = [generator.choice(Block.standard_blocks) for index in range(generator.randint(0, 3))]
+                expected = Game.highest_score(the_board, blocks)
+                TranspositionTable.install_table(table)
+                try:
+                    assert Game.highest_score(the_board, blocks) == expected
+                    assert Game.highest_score(the_board, blocks) == expected
+                    assert Game.highest_score_ordered(the_board, blocks) == expected
+                finally:
+                    TranspositionTable.install_table(None)
+            statistics = TranspositionTable.get_statistics(table)
+            assert statistics["hits"] > 0 and statistics["misses"] > 0
+            assert 0 < statistics["used"] <= 64
+        score.value += 6
+    except:
+        pass
+
+
+# tests for get_key
+
+def test_Get_Key__Canonical_Blocks(score, max_score):
+    """Function get_key: signed 64-bit keys that only depend on the board and the dot positions of the blocks."""
+    max_score.value += 2
+    try:
+        the_board = Board.make_board(4, {(1, 1), (2, 3)})
+        blocks = [Block.standard_blocks[1], Block.standard_blocks[5]]
+        key = TranspositionTable.get_key(the_board, blocks)
+        assert -2 ** 63 <= key < 2 ** 63
+        assert TranspositionTable.get_key(Board.make_board(4, {(2, 3), (1, 1)}),
+                                          [Block.make_block(set(block)) for block in blocks]) == key
+        assert TranspositionTable.get_key(the_board, blocks[::-1]) != key
+        assert TranspositionTable.get_key(the_board, blocks[:1]) != key
+        assert TranspositionTable.get_key(Board.make_board(4, {(1, 1)}), blocks) != key
+        score.value += 2
+    except:
+        pass
+
+
+# tests for store and look_up
+
+def test_Store__Principal_Variation(score, max_score):
+    """Functions store and look_up: positions are reconstructed from the best moves."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(3)
+        blocks = [Block.standard_blocks[0], Block.standard_blocks[1]]
+        table = TranspositionTable.make_table(1000, "always")
+        TranspositionTable.store(table, the_board, blocks, (13, [(1, 1), (2, 1)]))
+        assert TranspositionTable.look_up(table, the_board, blocks) == (13, [(1, 1), (2, 1)])
+        # The entry for the board reached by the best move is stored as well.
+        next_board = Board.make_board(3, {(1, 1)})
+        assert TranspositionTable.look_up(table, next_board, blocks[1:]) == (12, [(2, 1)])
+        TranspositionTable.store(table, the_board, [Block.standard_blocks[17]] * 3, (None, None))
+        assert TranspositionTable.look_up(table, the_board, [Block.standard_blocks[17]] * 3) == (None, None)
+        # In a table with a single slot, the entry for the next board replaces
+        # the entry for the given board.
+        small_table = TranspositionTable.make_table(1, "always")
+        TranspositionTable.store(small_table, the_board, blocks, (13, [(1, 1), (2, 1)]))
+        assert TranspositionTable.look_up(small_table, the_board, blocks) is None
+        assert TranspositionTable.get_statistics(table)["hits"] == 3
+        assert TranspositionTable.get_statistics(small_table)["misses"] == 1
+        TranspositionTable.clear_table(table)
+        assert TranspositionTable.look_up(table, the_board, blocks) is None
+        assert TranspositionTable.get_statistics(table)["used"] == 0
+        score.value += 4
+    except:
+        pass
+
+
+def test_Store__Repeated_Pruned_And_Ordered_Searches(score, max_score):
+    """Function store: repeated searches of the pruned and ordered solvers hit the table."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(5, {(1, 1), (2, 3), (4, 4), (5, 1)})
+        blocks = [Block.standard_blocks[2], Block.standard_blocks[9], Block.standard_blocks[17]]
+        expected = Game.highest_score(the_board, blocks)
+        expected_prefix = Game.highest_score(the_board, blocks[:2])
+        for solver in (Game.highest_score_pruned, Game.highest_score_ordered):
+            table = TranspositionTable.make_table(1000)
+            TranspositionTable.install_table(table)
+            try:
+                assert solver(the_board, blocks) == expected
+                assert solver(the_board, blocks) == expected
+                assert solver(the_board, blocks[:2]) == expected_prefix
+            finally:
+                TranspositionTable.install_table(None)
+            statistics = TranspositionTable.get_statistics(table)
+            assert statistics["hits"] == 1 and statistics["misses"] == 2
+        score.value += 4
+    except:
+        pass
+
+
+def test_Store__Replacement_Policies(score, max_score):
+    """Function store: replacement policies."""
+    max_score.value += 4
+    try:
+        the_board = Board.make_board(3)
+        long_blocks = [Block.standard_blocks[17]] * 2
+        short_blocks = [Block.standard_blocks[0]]
+        for (policy, kept) in (("always", False), ("depth-preferred", True)):
+            table = TranspositionTable.make_table(1, policy)
+            TranspositionTable.store(table, the_board, long_blocks, (None, None))
+            TranspositionTable.store(table, the_board, short_blocks, (1, [(1, 1)]))
+            slot_key = table["keys"][0]
+            assert (slot_key == TranspositionTable.get_key(the_board, long_blocks)) == kept
+        table = TranspositionTable.make_table(2, "two-tier")
+        TranspositionTable.store(table, the_board, long_blocks, (None, None))
+        TranspositionTable.store(table, the_board, short_blocks, (1, [(1, 1)]))
+        assert table["keys"][0] == TranspositionTable.get_key(the_board, long_blocks)
+        assert table["keys"][1] == TranspositionTable.get_key(the_board, short_blocks)
+        assert TranspositionTable.get_statistics(table)["replacements"] == 0
+        score.value += 4
+    except:
+        pass
+
+
+transposition_table_test_functions = \
+    {
+        test_Install_Table__Same_As_Highest_Score,
+
+        test_Get_Key__Canonical_Blocks,
+
+        test_Store__Principal_Variation,
+        test_Store__Repeated_Pruned_And_Ordered_Searches,
+        test_Store__Replacement_Policies,
+    }
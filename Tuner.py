@@ -0,0 +1,143 @@
+import Board
+import Evaluation
+import Game
+
+import json
+import multiprocessing
+import os
+import random
+import statistics
+
+# The tuner searches the weights of the evaluator of the module Evaluation with
+# the cross-entropy method. Each generation, a population of weight vectors is
+# sampled from independent normal distributions per feature. Each weight vector
+# plays the same seeded games (common random numbers), so differences in their
+# mean score are not caused by luckier blocks. The distributions are then refitted
+# to the elite weight vectors with the highest mean score.
+# The state of the tuner is a dict with keys:
+# - "features": the list of the names of the features that are weighted.
+# - "generation": the number of generations completed so far.
+# - "mean" and "stdev": the lists of the means and the standard deviations of the
+#   sampling distributions for the successive features.
+# - "best_weights" and "best_score": the weights with the highest mean score found
+#   so far, and that score (None before the first generation).
+# - "history": a list with for each generation completed, a dict with the mean
+#   score of the elite and the best mean score of that generation.
+# The state is written to a checkpoint file in JSON after each generation, so a
+# run that is interrupted continues from its last completed generation. All
+# random numbers are derived from the seed of the run and the generation, so a
+# resumed run plays the same games and samples the same weights.
+
+
+def tune_weights(nb_generations=10, population_size=20, nb_games=10, elite_fraction=0.2,
+                 features=Evaluation.FEATURES, dimension=10, max_moves=200, seed=0,
+                 initial_stdev=1.0, min_stdev=0.05, nb_processes=None, checkpoint_path=None):
+    """
+        Tune the weights of the evaluator of the module Evaluation for the given
+        features during the given number of generations, and return the state of
+        the tuner after the last generation.
+        - Each generation samples the given number of weight vectors, and lets each
+          of them play the given number of games on an empty board of the given
+          dimension (see Game.play_headless) of at most the given number of moves.
+          The given fraction of the weight vectors with the highest mean score are
+          the elite to which the sampling distributions are refitted.
+        - The sampling distributions start at the default weights of the module
+          Evaluation, with the given standard deviation. Standard deviations
+          never drop below the given minimum, so the search keeps exploring.
+        - Weight vectors are evaluated in parallel by a pool of the given number
+          of processes (the number of processors if None). With a single process,
+          no pool is used.
+        - If a checkpoint path is given, the state is written to that file after
+          each generation, and a run continues from the state in that file if it
+          exists. A run resumed from a checkpoint continues with the settings of
+          the new call, but keeps the features of the checkpoint.
+        ASSUMPTIONS
+        - The given numbers of generations, weight vectors, games, moves and
+          processes are positive integer numbers, and the elite fraction is a
+          number between 0 and 1.
+        - The given features are names of features in Evaluation.FEATURES.
+        - The given checkpoint path, if any, is a path at which a file can be
+          read and written.
+    """
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+        state = load_checkpoint(checkpoint_path)
+    else:
+        state = {"features": list(features), "generation": 0,
+                 "mean": [Evaluation.DEFAULT_WEIGHTS.get(feature, 0.0) for feature in features],
+                 "stdev": [initial_stdev] * len(features),
+                 "best_weights": None, "best_score": None, "history": []}
+    nb_elite = max(1, int(round(elite_fraction * population_size)))
+
+    pool = None
+    if nb_processes != 1:
+        pool = multiprocessing.Pool(nb_processes)
+    try:
+        while state["generation"] < nb_generations:
+            generator = random.Random("{}/{}".format(seed, state["generation"]))
+            game_seeds = [generator.getrandbits(32) for game in range(nb_games)]
+            population = [[generator.gauss(mean, stdev) for (mean, stdev) in zip(state["mean"], state["stdev"])]
+                          for candidate in range(population_size)]
+            tasks = [(dict(zip(state["features"], weights)), game_seeds, dimension, max_moves)
+                     for weights in population]
+            if pool is None:
+                scores = list(map(_evaluate_weights, tasks))
+            else:
+                scores = pool.map(_evaluate_weights, tasks)
+
+            # Sorting on the index as well keeps the elite deterministic for equal scores.
+            ranking = sorted(range(population_size), key=lambda index: (-scores[index], index))
+            elite = [population[index] for index in ranking[:nb_elite]]
+            for feature in range(len(state["features"])):
+                values = [weights[feature] for weights in elite]
+                state["mean"][feature] = statistics.mean(values)
+                state["stdev"][feature] = max(min_stdev, statistics.pstdev(values))
+            if state["best_score"] is None or scores[ranking[0]] > state["best_score"]:
+                state["best_score"] = scores[ranking[0]]
+                state["best_weights"] = dict(zip(state["features"], population[ranking[0]]))
+            state["history"].append({"elite_score": statistics.mean([scores[index] for index in ranking[:nb_elite]]),
+                                     "best_score": scores[ranking[0]]})
+            state["generation"] += 1
+            if checkpoint_path is not None:
+                save_checkpoint(state, checkpoint_path)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return state
+
+
+def save_checkpoint(state, path):
+    """
+        Write the given state of the tuner to the file at the given path.
+        - The file is replaced at once, so an interruption while writing never
+          leaves a damaged checkpoint behind.
+        ASSUMPTIONS
+        - The given state is a state of the tuner.
+        - The given path is a path at which a file can be written.
+    """
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(state, file, indent=1)
+    os.replace(temporary_path, path)
+
+
+def load_checkpoint(path):
+    """
+        Return the state of the tuner stored in the file at the given path.
+        ASSUMPTIONS
+        - The given path is the path of a checkpoint written by save_checkpoint.
+    """
+    with open(path) as file:
+        return json.load(file)
+
+
+def _evaluate_weights(task):
+    """
+        Return the mean score of the games played with the weights of the given
+        task, a tuple consisting of the weights, the seeds of the games, the
+        dimension of the board and the maximum number of moves.
+    """
+    (weights, game_seeds, dimension, max_moves) = task
+    evaluator = Evaluation.make_evaluator(weights)
+    return statistics.mean([Game.play_headless(Board.make_board(dimension), evaluator, game_seed, max_moves)["score"]
+                            for game_seed in game_seeds])
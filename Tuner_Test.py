@@ -0,0 +1,46 @@
+import Tuner
+
+import os
+import tempfile
+
+settings = {"population_size": 4, "nb_games": 2, "dimension": 5, "max_moves": 8, "seed": 44}
+
+
+# tests for tune_weights
+
+def test_Tune_Weights__Resume_From_Checkpoint(score, max_score):
+    """Function tune_weights: an interrupted run resumes from its checkpoint."""
+    max_score.value += 5
+    try:
+        uninterrupted = Tuner.tune_weights(3, nb_processes=1, **settings)
+        assert uninterrupted["generation"] == 3 and len(uninterrupted["history"]) == 3
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tuner.json")
+            Tuner.tune_weights(2, nb_processes=1, checkpoint_path=path, **settings)
+            assert Tuner.load_checkpoint(path)["generation"] == 2
+            resumed = Tuner.tune_weights(3, nb_processes=1, checkpoint_path=path, **settings)
+            assert resumed == uninterrupted
+            assert Tuner.load_checkpoint(path) == uninterrupted
+        score.value += 5
+    except:
+        pass
+
+
+def test_Tune_Weights__Process_Pool(score, max_score):
+    """Function tune_weights: same state with a pool of processes."""
+    max_score.value += 3
+    try:
+        state = Tuner.tune_weights(1, nb_processes=2, **settings)
+        assert state == Tuner.tune_weights(1, nb_processes=1, **settings)
+        assert set(state["best_weights"]) == set(state["features"])
+        assert all([stdev >= 0.05 for stdev in state["stdev"]])
+        score.value += 3
+    except:
+        pass
+
+
+tuner_test_functions = \
+    {
+        test_Tune_Weights__Resume_From_Checkpoint,
+        test_Tune_Weights__Process_Pool,
+    }
@@ -0,0 +1,202 @@
+import Board
+import GameRecord
+
+import itertools
+import multiprocessing
+
+# The validator checks game records (see GameRecord) in bulk, for instance to
+# reject submitted games with moves that cannot be made or with a score that was
+# not obtained. A move can be made under the same conditions as in
+# Board.can_be_dropped_at, and scores are computed as in Game.game_move.
+# Records are replayed on filled masks (see Board.get_filled_mask) instead of
+# boards. For each block, its mask with the lower left corner of its bounding
+# box in the first cell is computed once per dimension, so a move takes a shift,
+# a test and a few line checks, whatever the size of the block.
+# A mismatch describes why a record is invalid: a dict with keys "record" (the
+# index of the record), "move" (the index of the first move that cannot be made,
+# or None), "reason" (a short description), and for a wrong score "claimed" and
+# "replayed" (the score of the record and the score obtained by its moves).
+# Mismatches found in files also have a key "file" with the path of the file.
+
+# Masks and sizes of blocks, keyed by the identifier of their source and the
+# dimension of the board.
+_footprints = dict()
+
+
+def validate_record(record):
+    """
+        Replay the given game record, and return a mismatch describing why it is
+        invalid, or None if all its moves can be made and its score is the sum of
+        the scores of its moves.
+        - The key "record" of the mismatch is None.
+        - A record with a source that is not in GameRecord.SOURCES, or with a
+          move of a block that is not in its source, is invalid as well.
+        ASSUMPTIONS
+        - The given record is a dict with the keys of a game record.
+    """
+    if record["source"] not in GameRecord.SOURCES:
+        return {"record": None, "move": None, "reason": "unknown source"}
+    board_dimension = record["dimension"]
+    (row_masks, column_masks) = Board.get_line_masks(board_dimension)
+    footprints = _get_footprints(record["source"], board_dimension)
+    filled_mask = 0
+    score = 0
+    for (move, (block_index, (column, row))) in enumerate(record["moves"]):
+        if not 0 <= block_index < len(footprints):
+            return {"record": None, "move": move, "reason": "unknown block"}
+        (column_offset, row_offset, width, height, footprint, nb_dots) = footprints[block_index]
+        column += column_offset
+        row += row_offset
+        if not (0 < column <= board_dimension - width + 1 and 0 < row <= board_dimension - height + 1):
+            return {"record": None, "move": move, "reason": "block outside the board"}
+        block_mask = footprint << ((column - 1) * board_dimension + row - 1)
+        if block_mask & filled_mask != 0:
+            return {"record": None, "move": move, "reason": "block on filled cells"}
+        filled_mask |= block_mask
+        # Only the rows and columns covered by the block can have become full.
+        full_mask = 0
+        nb_full_lines = 0
+        for line_mask in itertools.chain(row_masks[row:row + height], column_masks[column:column + width]):
+            if filled_mask & line_mask == line_mask:
+                full_mask |= line_mask
+                nb_full_lines += 1
+        filled_mask &= ~full_mask
+        score += nb_dots + 10 * ((nb_full_lines + 1) * nb_full_lines) // 2
+    if score != record["score"]:
+        return {"record": None, "move": None, "reason": "wrong score", "claimed": record["score"], "replayed": score}
+    return None
+
+
+def validate_records(records, nb_processes=None, chunk_size=1000):
+    """
+        Validate the given game records (see validate_record), and return a report.
+        - The report is a dict with keys "nb_records" and "nb_moves" (the number
+          of records and moves validated), "nb_invalid" (the number of invalid
+          records) and "mismatches" (a list of the mismatches of the invalid
+          records, in the order of the records).
+        - The records are sent in chunks of the given size to a pool of the given
+          number of processes (the number of processors if None), while they are
+          produced. With a single process, no pool is used.
+        ASSUMPTIONS
+        - The given records are an iterable of game records.
+        - The given number of processes and chunk size are positive integer numbers.
+    """
+    records = iter(records)
+    chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+    tasks = ((index * chunk_size, chunk) for (index, chunk) in enumerate(chunks))
+    return _run(_validate_chunk, tasks, nb_processes)
+
+
+def validate_files(paths, nb_processes=None):
+    """
+        Validate the game records in the files at the given paths (see
+        validate_record), and return a report as for validate_records.
+        - Each file is read and validated by a single process of a pool of the
+          given number of processes (the number of processors if None). With a
+          single process, no pool is used.
+        - If a file does not hold valid game records, its first record that
+          cannot be decoded is counted as invalid, with a mismatch whose key
+          "move" is None and whose reason starts with "corrupt", and the
+          remainder of the file is skipped.
+        ASSUMPTIONS
+        - The given paths are paths at which files can be read.
+        - The given number of processes is a positive integer number.
+    """
+    return _run(_validate_file, paths, nb_processes)
+
+
+def _run(function, tasks, nb_processes):
+    """
+        Apply the given function to the given tasks, in a pool of the given
+        number of processes unless it is 1, and merge the reports it returns.
+    """
+    report = {"nb_records": 0, "nb_moves": 0, "nb_invalid": 0, "mismatches": []}
+    pool = None
+    if nb_processes != 1:
+        pool = multiprocessing.Pool(nb_processes)
+    try:
+        if pool is None:
+            task_reports = map(function, tasks)
+        else:
+            task_reports = pool.imap(function, tasks)
+        for task_report in task_reports:
+            for key in ("nb_records", "nb_moves", "nb_invalid"):
+                report[key] += task_report[key]
+            report["mismatches"] += task_report["mismatches"]
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return report
+
+
+def _validate_chunk(task):
+    """
+        Return the report of the validation of the records of the given task, a
+        tuple consisting of the index of its first record followed by a list of
+        records.
+    """
+    (first_index, records) = task
+    report = {"nb_records": 0, "nb_moves": 0, "nb_invalid": 0, "mismatches": []}
+    for (index, record) in enumerate(records, first_index):
+        _add_to_report(report, index, record, validate_record(record))
+    return report
+
+
+def _validate_file(path):
+    """
+        Return the report of the validation of the records in the file at the
+        given path.
+    """
+    report = {"nb_records": 0, "nb_moves": 0, "nb_invalid": 0, "mismatches": []}
+    index = 0
+    try:
+        for record in GameRecord.read_records(path):
+            mismatch = validate_record(record)
+            if mismatch is not None:
+                mismatch["file"] = path
+            _add_to_report(report, index, record, mismatch)
+            index += 1
+    except (OSError, ValueError) as error:
+        report["nb_records"] += 1
+        report["nb_invalid"] += 1
+        report["mismatches"].append({"record": index, "move": None, "reason": "corrupt: {}".format(error),
+                                     "file": path})
+    return report
+
+
+def _add_to_report(report, index, record, mismatch):
+    """
+        Add the given record with the given index and its mismatch (None if the
+        record is valid) to the given report.
+    """
+    report["nb_records"] += 1
+    report["nb_moves"] += len(record["moves"])
+    if mismatch is not None:
+        mismatch["record"] = index
+        report["nb_invalid"] += 1
+        report["mismatches"].append(mismatch)
+
+
+def _get_footprints(source, board_dimension):
+    """
+        Return a list with for each block of the given source a tuple consisting
+        of the offsets from its anchor to the lower left corner of its bounding
+        box, its width and height, its mask on a board of the given dimension
+        with that corner in the first cell, and its number of dots.
+    """
+    key = (source, board_dimension)
+    if key not in _footprints:
+        footprints = []
+        for block in GameRecord.SOURCES[source]:
+            column_offset = min([dot[0] for dot in block])
+            row_offset = min([dot[1] for dot in block])
+            footprint = 0
+            for dot in block:
+                footprint |= 1 << ((dot[0] - column_offset) * board_dimension + dot[1] - row_offset)
+            footprints.append((column_offset, row_offset,
+                               max([dot[0] for dot in block]) - column_offset + 1,
+                               max([dot[1] for dot in block]) - row_offset + 1,
+                               footprint, len(block)))
+        _footprints[key] = footprints
+    return _footprints[key]
@@ -0,0 +1,140 @@
+import Evaluation
+import GameRecord
+import Validator
+
+import os
+import random
+import tempfile
+
+
+def make_records(nb_records):
+    """Return recorded games of which every second one has a wrong score or an illegal move."""
+    records = [GameRecord.record_headless_game(6, Evaluation.evaluate, seed, 12) for seed in range(nb_records)]
+    for record in records[1::4]:
+        record["score"] += 1
+    for record in records[3::4]:
+        record["moves"].insert(1, record["moves"][0])
+    return records
+
+
+# tests for validate_record
+
+def test_Validate_Record__Mismatches(score, max_score):
+    """Function validate_record: valid and invalid records."""
+    max_score.value += 4
+    try:
+        record = {"dimension": 3, "seed": 0, "source": 0,
+                  "moves": [(0, (2, 1)), (0, (3, 1)), (0, (1, 2)), (0, (1, 3)), (0, (1, 1))], "score": 35}
+        assert Validator.validate_record(record) is None
+        assert Validator.validate_record(dict(record, score=34)) == \
+               {"record": None, "move": None, "reason": "wrong score", "claimed": 34, "replayed": 35}
+        assert Validator.validate_record(dict(record, moves=[(0, (1, 1)), (0, (1, 1))]))["move"] == 1
+        assert Validator.validate_record(dict(record, moves=[(0, (1, 1)), (0, (0, 2))]))["move"] == 1
+        assert Validator.validate_record(dict(record, moves=[(1, (3, 1))]))["move"] == 0
+        score.value += 4
+    except:
+        pass
+
+
+def test_Validate_Record__Same_As_Replay(score, max_score):
+    """Function validate_record: same verdict as GameRecord.replay_record."""
+    max_score.value += 4
+    try:
+        generator = random.Random(5)
+        nb_blocks = len(GameRecord.SOURCES[GameRecord.STANDARD_SOURCE])
+        for record in make_records(8):
+            for attempt in range(5):
+                moves = list(record["moves"])
+                index = generator.randrange(len(moves))
+                (column, row) = moves[index][1]
+                moves[index] = (generator.randrange(nb_blocks),
+                                (column + generator.randint(-1, 1), row + generator.randint(-1, 1)))
+                changed_record = dict(record, moves=moves)
+                try:
+                    GameRecord.replay_record(changed_record)
+                    is_valid = True
+                except ValueError:
+                    is_valid = False
+                assert is_valid == (Validator.validate_record(changed_record) is None)
+        score.value += 4
+    except:
+        pass
+
+
+def test_Validate_Record__Unknown_Source_And_Block(score, max_score):
+    """Function validate_record: records with unknown sources or blocks."""
+    max_score.value += 3
+    try:
+        record = {"dimension": 3, "seed": 0, "source": 0, "moves": [(0, (1, 1)), (0, (2, 1))], "score": 2}
+        nb_blocks = len(GameRecord.SOURCES[GameRecord.STANDARD_SOURCE])
+        assert Validator.validate_record(dict(record, source=99)) == \
+               {"record": None, "move": None, "reason": "unknown source"}
+        for block_index in (-1, nb_blocks, nb_blocks + 1000):
+            assert Validator.validate_record(dict(record, moves=[(0, (1, 1)), (block_index, (2, 1))])) == \
+                   {"record": None, "move": 1, "reason": "unknown block"}
+        report = Validator.validate_records([dict(record, source=99), record, dict(record, moves=[(-1, (1, 1))])],
+                                            nb_processes=1)
+        assert report["nb_records"] == 3 and report["nb_invalid"] == 2
+        assert [mismatch["record"] for mismatch in report["mismatches"]] == [0, 2]
+        score.value += 3
+    except:
+        pass
+
+
+# tests for validate_records
+
+def test_Validate_Records__Chunks_And_Processes(score, max_score):
+    """Function validate_records: reports do not depend on chunks and processes."""
+    max_score.value += 3
+    try:
+        records = make_records(10)
+        report = Validator.validate_records(records, 1, 1000)
+        assert report["nb_records"] == 10 and report["nb_invalid"] == 5
+        assert report["nb_moves"] == sum([len(record["moves"]) for record in records])
+        assert [mismatch["record"] for mismatch in report["mismatches"]] == [1, 3, 5, 7, 9]
+        assert [mismatch["move"] for mismatch in report["mismatches"]] == [None, 1, None, 1, None]
+        assert Validator.validate_records(iter(records), 2, 3) == report
+        assert Validator.validate_records([], 1) == {"nb_records": 0, "nb_moves": 0, "nb_invalid": 0, "mismatches": []}
+        score.value += 3
+    except:
+        pass
+
+
+# tests for validate_files
+
+def test_Validate_Files__Corrupt_File(score, max_score):
+    """Function validate_files: valid, invalid and corrupt files."""
+    max_score.value += 3
+    try:
+        records = make_records(6)
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, name) for name in ("first", "second", "third")]
+            GameRecord.write_records(paths[0], records[:4])
+            GameRecord.write_records(paths[1], records[4:])
+            with open(paths[1], "ab") as file:
+                file.write(bytes([6, 0]))
+            with open(paths[2], "wb") as file:
+                file.write(b"garbage")
+            report = Validator.validate_files(paths, 2)
+            assert report == Validator.validate_files(paths, 1)
+            assert report["nb_records"] == 4 + 3 + 1 and report["nb_invalid"] == 2 + 2 + 1
+            assert [(mismatch["file"], mismatch["record"]) for mismatch in report["mismatches"]] == \
+                   [(paths[0], 1), (paths[0], 3), (paths[1], 1), (paths[1], 2), (paths[2], 0)]
+            assert report["mismatches"][2]["reason"] == "wrong score"
+            assert report["mismatches"][3]["reason"].startswith("corrupt")
+            assert report["mismatches"][4]["reason"].startswith("corrupt")
+        score.value += 3
+    except:
+        pass
+
+
+validator_test_functions = \
+    {
+        test_Validate_Record__Mismatches,
+        test_Validate_Record__Same_As_Replay,
+        test_Validate_Record__Unknown_Source_And_Block,
+
+        test_Validate_Records__Chunks_And_Processes,
+
+        test_Validate_Files__Corrupt_File,
+    }